@@ -0,0 +1,80 @@
+"""
+Compares title extraction through ebooklib (the old import path) with the
+OPF-only reader in epub_reader.metadata.
+
+    python benchmarks/bench_metadata.py [book.epub ...] [--repeat N]
+
+Without arguments a throwaway EPUB with large images is generated.
+"""
+import os
+import sys
+import time
+import zipfile
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ebooklib import epub
+from epub_reader.metadata import read_metadata
+
+def ebooklib_title(path):
+    book = epub.read_epub(path)
+    title = book.get_metadata('DC', 'title')
+    return title[0][0] if title else os.path.basename(path)
+
+def opf_title(path):
+    return read_metadata(path)['title']
+
+def make_sample(path, images=40, image_size=2 * 1024 * 1024):
+    opf_items = []
+    with zipfile.ZipFile(path, 'w') as zf:
+        zf.writestr("mimetype", "application/epub+zip", compress_type=zipfile.ZIP_STORED)
+        zf.writestr("META-INF/container.xml",
+                    '<?xml version="1.0"?><container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">'
+                    '<rootfiles><rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/></rootfiles></container>')
+        zf.writestr("OEBPS/ch1.xhtml", "<html><body><p>Hello</p></body></html>")
+        for i in range(images):
+            zf.writestr(f"OEBPS/img{i}.jpg", os.urandom(image_size))
+            opf_items.append(f'<item id="img{i}" href="img{i}.jpg" media-type="image/jpeg"/>')
+        zf.writestr("OEBPS/content.opf",
+                    '<?xml version="1.0"?><package xmlns="http://www.idpf.org/2007/opf" version="3.0" unique-identifier="id">'
+                    '<metadata xmlns:dc="http://purl.org/dc/elements/1.1/"><dc:title>Benchmark</dc:title>'
+                    '<dc:identifier id="id">bench</dc:identifier><dc:language>en</dc:language></metadata>'
+                    '<manifest><item id="ch1" href="ch1.xhtml" media-type="application/xhtml+xml"/>'
+                    + "".join(opf_items) + '</manifest><spine><itemref idref="ch1"/></spine></package>')
+
+def timed(fn, path, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('paths', nargs='*')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    paths = args.paths
+    tmpdir = None
+    if not paths:
+        tmpdir = tempfile.TemporaryDirectory()
+        sample = os.path.join(tmpdir.name, "sample.epub")
+        make_sample(sample)
+        paths = [sample]
+
+    print(f"{'file':<40} {'size MB':>8} {'ebooklib ms':>12} {'opf ms':>8} {'speedup':>8}")
+    for path in paths:
+        old = timed(ebooklib_title, path, args.repeat)
+        new = timed(opf_title, path, args.repeat)
+        size = os.path.getsize(path) / (1024 * 1024)
+        print(f"{os.path.basename(path)[:40]:<40} {size:>8.1f} {old * 1000:>12.1f} {new * 1000:>8.2f} {old / new:>7.0f}x")
+
+    if tmpdir:
+        tmpdir.cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Compares the streaming chapter transformer (epub_reader.utils) with the
+BeautifulSoup round trip it replaced, for speed and for equivalent output.
+
+    python benchmarks/bench_transform.py [book.epub ...] [--repeat N]
+
+Every chapter is first checked for equivalence: both outputs are parsed
+and their #book-content trees (tags, attributes, text, comments) compared.
+Without arguments a built-in corpus of tricky chapters plus a long
+synthetic chapter is used. Exits non-zero if any chapter differs.
+"""
+import os
+import sys
+import copy
+import time
+import zipfile
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup, Tag, Comment, NavigableString
+from epub_reader.utils import prepare_chapter_html, resolve_url, THEME_STYLESHEET
+
+BASE_URL = "epub://reader/0123456789abcdef/OEBPS/text/chapter.xhtml"
+THEME_HREF = "epub://reader/theme.css?v=bench"
+
+def legacy_prepare_chapter_html(raw_html, base_url, theme_href=None):
+    # The pre-streaming implementation, kept here as the reference output
+    soup = BeautifulSoup(raw_html, 'html.parser')
+
+    body_content = soup.body
+    if not body_content:
+        body_content = soup
+
+    for img in body_content.find_all('img'):
+        src = img.get('src')
+        if src:
+            img['src'] = resolve_url(base_url, src)
+
+    # Links point at their own chapter even inside the continuous document
+    for a in body_content.find_all('a'):
+        href = a.get('href')
+        if href:
+            a['href'] = base_url + href if href.startswith('#') else resolve_url(base_url, href)
+
+    new_soup = BeautifulSoup("<html><head></head><body><div id='book-content'></div></body></html>", 'xml')
+
+    if theme_href:
+        link_tag = new_soup.new_tag("link", rel="stylesheet", href=theme_href)
+        new_soup.head.append(link_tag)
+    else:
+        style_tag = new_soup.new_tag("style")
+        style_tag.string = THEME_STYLESHEET
+        new_soup.head.append(style_tag)
+
+    content_children = [copy.copy(c) for c in body_content.children]
+    for child in content_children:
+        new_soup.find(id="book-content").append(child)
+
+    return str(new_soup)
+
+CORPUS = {
+    "basic": '<?xml version="1.0" encoding="utf-8"?>\n<!DOCTYPE html>\n<html xmlns="http://www.w3.org/1999/xhtml">'
+             '<head><title>T</title><link href="../style.css" rel="stylesheet"/></head>'
+             '<body><h1 id="c1">Chapter One</h1><p>Hello <em>world</em>.</p></body></html>',
+    "entities": '<html><body><p>Fish &amp; chips &lt;3 &nbsp;&#8212;&#x2014; caf&eacute; "quoted" \'single\'</p></body></html>',
+    "images": '<html><body><p><img src="../images/a.png" alt="A &amp; B"/>'
+              '<img alt="no src"/><img src="data:image/png;base64,AAAA"/>'
+              '<img src="/abs/b.jpg"/><img src="c.gif#frag" class="x"/></p></body></html>',
+    "void_and_attrs": '<html><body><p>line<br/>break<br>again</p><hr/><input type="checkbox" checked="checked"/>'
+                      '<p class="a b" data-x=\'1 &gt; 0\' title="t">x</p></body></html>',
+    "comments": '<html><body><!-- a comment --><p>text<!--inline--> more</p></body></html>',
+    "nested": '<html><body><div><blockquote><p>One <a href="ch2.xhtml#n1" id="r1"><sup>1</sup></a></p>'
+              '<ul><li>a</li><li><b>b <i>c</i></b></li></ul></blockquote></div>'
+              '<table><tr><td>1</td><td>2</td></tr></table></body></html>',
+    "body_attrs_whitespace": '<html>\n<head/>\n<body class="calibre" id="top">\n  <p>  spaced   text  </p>\n\n</body>\n</html>\n',
+    "unicode": '<html><body><p>Ünïcödé — „quotes" 漢字 🙂</p></body></html>',
+    "svg_cover": '<html><body><div><svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 10 10">'
+                 '<image width="10" height="10" href="../images/cover.jpg"/></svg></div></body></html>',
+    "links": '<html><body><p><a href="#n1">fragment</a> <a href="ch2.xhtml">next</a> '
+             '<a href="../notes/n.xhtml#n1">note</a> <a href="/abs.xhtml#top">abs</a> '
+             '<a href="https://example.com/a?b=1&amp;c=2">web</a> <a href="mailto:x@example.com">mail</a> '
+             '<a name="anchor-only">named</a> <a href="">empty</a></p></body></html>',
+    "no_body": '<p>Fragment without html or body <img src="x.png"/></p><p>second</p>',
+}
+
+def long_chapter(paragraphs=4000):
+    paras = "".join(f'<p id="p{i}">Paragraph {i} with <em>emphasis</em>, &amp; entities &#8212; '
+                    f'and an <a href="#p{i + 1}">internal link</a>.</p>'
+                    + (f'<p><img src="../images/fig{i}.png" alt="Figure {i}"/></p>' if i % 50 == 0 else "")
+                    for i in range(paragraphs))
+    return f'<?xml version="1.0"?><html xmlns="http://www.w3.org/1999/xhtml"><head><title>Long</title></head><body>{paras}</body></html>'
+
+def chapters_from_epub(path):
+    # Resolved by the reader's own structure code (percent-encoding, ../);
+    # imported here because it sets up the data directory
+    from epub_reader.book_cache import build_structure, read_item
+    structure = build_structure(path)
+    with zipfile.ZipFile(path) as zf:
+        for item_id in structure['spine']:
+            try:
+                data = read_item(zf, structure, item_id)
+            except KeyError:
+                continue
+            if data is not None:
+                yield f"{os.path.basename(path)}:{structure['items'][item_id]['href']}", data.decode('utf-8', errors='replace')
+
+def dom_signature(markup):
+    """Flattened #book-content tree: tags with attributes, merged text, comments."""
+    root = BeautifulSoup(markup, 'html.parser').find(id='book-content')
+    out = []
+    def walk(node):
+        for child in node.children:
+            if isinstance(child, Comment):
+                out.append(('comment', str(child).strip()))
+            elif isinstance(child, Tag):
+                attrs = tuple(sorted((k.lower(), ' '.join(v) if isinstance(v, list) else (v or ''))
+                                     for k, v in child.attrs.items()))
+                out.append(('start', child.name.lower(), attrs))
+                walk(child)
+                out.append(('end', child.name.lower()))
+            elif isinstance(child, NavigableString):
+                if out and out[-1][0] == 'text':
+                    out[-1] = ('text', out[-1][1] + str(child))
+                else:
+                    out.append(('text', str(child)))
+    walk(root)
+    return out
+
+def head_signature(markup):
+    head = BeautifulSoup(markup, 'html.parser').head
+    return [(t.name, t.get('href'), t.string) for t in head.find_all(True)]
+
+def check(name, raw):
+    ok = True
+    for theme_href in (THEME_HREF, None):
+        old = legacy_prepare_chapter_html(raw, BASE_URL, theme_href)
+        new = prepare_chapter_html(raw, BASE_URL, theme_href)
+        if dom_signature(old) != dom_signature(new) or head_signature(old) != head_signature(new):
+            ok = False
+    print(f"  {'ok  ' if ok else 'DIFF'} {name}")
+    return ok
+
+def timed(fn, raw, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(raw, BASE_URL, THEME_HREF)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('paths', nargs='*')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.paths:
+        corpus = [c for path in args.paths for c in chapters_from_epub(path)]
+    else:
+        corpus = list(CORPUS.items()) + [("long_chapter", long_chapter())]
+
+    print("Equivalence:")
+    failures = sum(0 if check(name, raw) else 1 for name, raw in corpus)
+
+    total_bytes = sum(len(raw.encode('utf-8')) for _, raw in corpus)
+    old = sum(timed(legacy_prepare_chapter_html, raw, args.repeat) for _, raw in corpus)
+    new = sum(timed(prepare_chapter_html, raw, args.repeat) for _, raw in corpus)
+    mb = total_bytes / (1024 * 1024)
+    print(f"\n{'chapters':>8} {'MB':>6} {'soup ms':>9} {'stream ms':>10} {'soup MB/s':>10} {'stream MB/s':>12} {'speedup':>8}")
+    print(f"{len(corpus):>8} {mb:>6.2f} {old * 1000:>9.1f} {new * 1000:>10.1f} {mb / old:>10.1f} {mb / new:>12.1f} {old / new:>7.1f}x")
+
+    if failures:
+        print(f"\n{failures} chapter(s) differ")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,467 @@
+"""
+Headless benchmark suite. Generates synthetic books and a synthetic library
+in a throwaway data directory, times the hot paths, and writes the results
+as JSON so runs can be compared over time.
+
+    python benchmarks/run_benchmarks.py [--quick] [--only NAME ...]
+                                        [--output FILE] [--compare OLD.json]
+
+GUI cases run on the offscreen Qt platform; cases whose dependencies are
+missing (e.g. QtWebEngine) are reported as skipped rather than failing.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+import subprocess
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+# Must be set before anything from epub_reader is imported: all storage,
+# caches and databases go to a temporary data directory, never the real one.
+WORK_DIR = tempfile.mkdtemp(prefix="dorky-bench-")
+os.environ["DORKY_READER_HOME"] = os.path.join(WORK_DIR, "home")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from synth import make_epub, make_library
+
+PROFILES = {
+    'full':  {'chapters': 40, 'chapter_kb': 60, 'images': 30, 'image_kb': 150, 'toc_depth': 3,
+              'library_books': 200, 'import_books': 40, 'index_books': 10000, 'repeat': 5},
+    'quick': {'chapters': 10, 'chapter_kb': 30, 'images': 6, 'image_kb': 60, 'toc_depth': 2,
+              'library_books': 50, 'import_books': 8, 'index_books': 1000, 'repeat': 3},
+}
+
+BENCHMARKS = []
+
+class Skip(Exception):
+    pass
+
+def benchmark(name):
+    def register(fn):
+        BENCHMARKS.append((name, fn))
+        return fn
+    return register
+
+def measure(fn, repeat):
+    """Runs fn `repeat` times; returns min/median/max wall time in ms."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {'min_ms': round(min(samples), 3), 'median_ms': round(statistics.median(samples), 3),
+            'max_ms': round(max(samples), 3), 'runs': repeat}
+
+class Context:
+    def __init__(self, profile):
+        self.p = profile
+        self.repeat = profile['repeat']
+        self._book = None
+        self._app = None
+
+    @property
+    def book(self):
+        # One large synthetic book shared by the per-book cases
+        if self._book is None:
+            path = os.path.join(WORK_DIR, "book.epub")
+            self._book = make_epub(path, chapters=self.p['chapters'], chapter_kb=self.p['chapter_kb'],
+                                   images=self.p['images'], image_kb=self.p['image_kb'],
+                                   toc_depth=self.p['toc_depth'])
+        return self._book
+
+    def book_options(self):
+        return {k: self.p[k] for k in ('chapters', 'chapter_kb', 'images', 'image_kb', 'toc_depth')}
+
+    def qt_app(self):
+        if self._app is None:
+            try:
+                from PyQt6.QtWidgets import QApplication
+            except ImportError as e:
+                raise Skip(f"PyQt6 unavailable: {e}")
+            self._app = QApplication.instance() or QApplication(sys.argv[:1])
+        return self._app
+
+# --- BOOK LOADING ---
+@benchmark("book.build_structure")
+def bench_build_structure(ctx):
+    from epub_reader.book_cache import build_structure
+    path = ctx.book['path']
+    result = measure(lambda: build_structure(path), ctx.repeat)
+    # Peak Python allocation while building; should stay far below the book size
+    tracemalloc.start()
+    build_structure(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {**result, 'book_bytes': ctx.book['bytes'], 'peak_alloc_bytes': peak}
+
+@benchmark("book.load_structure_cached")
+def bench_load_structure_cached(ctx):
+    from epub_reader.book_cache import load_book_structure
+    path = ctx.book['path']
+    load_book_structure(path)  # prime the cache
+    return measure(lambda: load_book_structure(path), ctx.repeat)
+
+@benchmark("book.read_metadata")
+def bench_read_metadata(ctx):
+    from epub_reader.metadata import read_metadata
+    path = ctx.book['path']
+    return measure(lambda: read_metadata(path), ctx.repeat)
+
+# --- CHAPTERS ---
+def _spine_html(ctx):
+    from epub_reader.book_cache import load_book_structure, read_item
+    from epub_reader.archive import EpubArchive
+    structure = load_book_structure(ctx.book['path'])
+    archive = EpubArchive(ctx.book['path'])
+    try:
+        return structure, [(item_id, read_item(archive, structure, item_id).decode('utf-8'))
+                           for item_id in structure['spine']]
+    finally:
+        archive.close()
+
+@benchmark("chapter.prepare_chapter_html")
+def bench_prepare_chapter_html(ctx):
+    from epub_reader.utils import prepare_chapter_html
+    _, chapters = _spine_html(ctx)
+    base = "epub://reader/0123456789abcdef/OEBPS/text/ch.xhtml"
+    total = sum(len(html.encode('utf-8')) for _, html in chapters)
+
+    def run():
+        for _, html in chapters:
+            prepare_chapter_html(html, base, "epub://reader/theme.css?v=bench")
+    result = measure(run, ctx.repeat)
+    result['chapters'] = len(chapters)
+    result['mb_per_s'] = round(total / (1024 * 1024) / (result['min_ms'] / 1000), 2)
+    return result
+
+@benchmark("chapter.cache_hit")
+def bench_chapter_cache_hit(ctx):
+    from epub_reader.chapter_cache import ChapterCache, chapter_key
+    cache = ChapterCache(disk_dir=os.path.join(WORK_DIR, "chapters"))
+    structure, chapters = _spine_html(ctx)
+    keys = [chapter_key(structure['hash'], item_id, "bench") for item_id, _ in chapters]
+    for key, (_, html) in zip(keys, chapters):
+        cache.put(key, html)
+
+    def memory_hits():
+        for key in keys:
+            cache.get(key)
+
+    def disk_hits():
+        cache.clear_memory()
+        for key in keys:
+            cache.get(key)
+    return {'memory': measure(memory_hits, ctx.repeat), 'disk': measure(disk_hits, ctx.repeat),
+            'chapters': len(keys)}
+
+@benchmark("chapter.resources_from_archive")
+def bench_resources_from_archive(ctx):
+    # What extract_images_and_fix_html used to do up front: every image of
+    # the book. Resources are now read from the zip on demand.
+    from epub_reader.book_cache import load_book_structure
+    from epub_reader.archive import EpubArchive
+    structure = load_book_structure(ctx.book['path'])
+    images = [item['href'] for item in structure['items'].values() if item['media_type'].startswith('image/')]
+
+    def cold():
+        archive = EpubArchive(ctx.book['path'])
+        for href in images:
+            archive.read(href)
+        archive.close()
+
+    warm_archive = EpubArchive(ctx.book['path'])
+    for href in images:
+        warm_archive.read(href)
+    def warm():
+        for href in images:
+            warm_archive.read(href)
+    result = {'cold': measure(cold, ctx.repeat), 'warm': measure(warm, ctx.repeat), 'images': len(images)}
+    warm_archive.close()
+    return result
+
+# --- LIBRARY DATABASE ---
+def _library_data(count):
+    return {'theme': 'dark', 'books': {
+        f"book-{i:05d}": {'title': f"Book {i}", 'filename': f"objects/00/{i:064x}.epub",
+                          'last_chapter_index': i % 20, 'last_page_index': i % 7,
+                          'progress_percent': i % 100, 'last_opened': 1.7e9 + i,
+                          'authors': ["Benchmark Author"]}
+        for i in range(count)}}
+
+@benchmark("library.save_library")
+def bench_save_library(ctx):
+    from epub_reader.database import save_library
+    data = _library_data(ctx.p['library_books'])
+    return {**measure(lambda: save_library(data), ctx.repeat), 'books': ctx.p['library_books']}
+
+@benchmark("library.load_library")
+def bench_load_library(ctx):
+    from epub_reader.database import save_library, load_library
+    save_library(_library_data(ctx.p['library_books']))
+    return {**measure(load_library, ctx.repeat), 'books': ctx.p['library_books']}
+
+@benchmark("library.update_book")
+def bench_update_book(ctx):
+    from epub_reader.database import save_library, update_book
+    save_library(_library_data(ctx.p['library_books']))
+
+    def run():
+        for i in range(100):
+            update_book(f"book-{i:05d}", last_page_index=i, progress_percent=i)
+    result = measure(run, ctx.repeat)
+    result['updates_per_run'] = 100
+    return result
+
+@benchmark("library.import")
+def bench_import(ctx):
+    from epub_reader.importer import run_import, find_epubs, IMPORT_WORKERS
+    source = os.path.join(WORK_DIR, "import-src")
+    options = dict(ctx.book_options(), chapters=8, images=2)
+    make_library(source, ctx.p['import_books'], **options)
+    paths = find_epubs([source])
+
+    start = time.perf_counter()
+    imported, duplicates, failed = run_import(paths)
+    cold_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    _, again, _ = run_import(paths)
+    dup_ms = (time.perf_counter() - start) * 1000
+    return {'books': len(paths), 'workers': IMPORT_WORKERS, 'imported': imported, 'failed': failed,
+            'cold_ms': round(cold_ms, 3), 'duplicates_ms': round(dup_ms, 3), 'duplicates': again}
+
+# --- SEARCH ---
+@benchmark("search.index_and_query")
+def bench_search(ctx):
+    from epub_reader import search_index
+    from epub_reader.database import add_book
+    from epub_reader.storage import store_file
+    _, filename, _ = store_file(ctx.book['path'])
+    add_book("bench-book", {'title': "Bench Book", 'filename': filename})  # only library books are indexed
+
+    start = time.perf_counter()
+    passages = search_index.index_book("bench-book", filename)
+    index_ms = (time.perf_counter() - start) * 1000
+    query = measure(lambda: search_index.search("lorem dolor"), ctx.repeat * 4)
+    prefix = measure(lambda: search_index.search("consequ"), ctx.repeat * 4)
+    return {'passages': passages, 'index_ms': round(index_ms, 3), 'query': query, 'prefix_query': prefix}
+
+@benchmark("search.query_large_index")
+def bench_search_large(ctx):
+    # Queries against a whole library's worth of passages, written straight
+    # into a separate index file (no EPUBs needed)
+    import random
+    import itertools
+    from synth import WORDS
+    from epub_reader import search_index
+    books = ctx.p['index_books']
+    passages_per_book = 20
+    rng = random.Random(7)
+    # Compound words with Zipf-like frequencies, so common terms hit most
+    # passages and rare ones only a few (as in real text)
+    vocabulary = WORDS + [a + b for a in WORDS for b in WORDS if a != b]
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+
+    saved_db = search_index.SEARCH_DB
+    saved_conn = getattr(search_index._local, 'conn', None)
+    search_index.SEARCH_DB = os.path.join(WORK_DIR, "search-large.db")
+    search_index._local.conn = None
+    try:
+        conn = search_index.get_connection()
+        start = time.perf_counter()
+        with conn:
+            for b in range(books):
+                book_id = f"book-{b:05d}"
+                search_index.write_passages(conn, book_id, [
+                    (" ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=120)), p, 0)
+                    for p in range(passages_per_book)])
+        build_ms = (time.perf_counter() - start) * 1000
+
+        result = {'books': books, 'passages': books * passages_per_book, 'build_ms': round(build_ms, 3)}
+        for label, text in (('common_query', "lorem ipsum"), ('rare_query', "laborisnostrud"),
+                            ('prefix_query', "ullam"), ('short_prefix_query', "lorem ip"),
+                            ('multi_term_query', "magna veniam commodo")):
+            result[label] = measure(lambda: search_index.search(text), ctx.repeat * 4)
+        result['in_book_query'] = measure(lambda: search_index.search("dolor", book_id="book-00042"),
+                                          ctx.repeat * 4)
+        return result
+    finally:
+        conn.close()
+        search_index.SEARCH_DB = saved_db
+        search_index._local.conn = saved_conn
+
+@benchmark("search.in_book_find_all")
+def bench_in_book_find(ctx):
+    from epub_reader.book_cache import load_book_structure
+    from epub_reader.archive import EpubArchive
+    from epub_reader.book_text import BookText
+    structure = load_book_structure(ctx.book['path'])
+    archive = EpubArchive(ctx.book['path'])
+    cached = os.path.join(os.environ["DORKY_READER_HOME"], "cache", "text", f"{structure['hash']}.json")
+    if os.path.exists(cached):
+        os.remove(cached)  # measure extraction, not the text cache
+    text = BookText(structure, archive)
+    start = time.perf_counter()
+    text.load_all()
+    extract_ms = (time.perf_counter() - start) * 1000
+    result = {'extract_ms': round(extract_ms, 3), 'find_all': measure(lambda: text.find_all("dolore"), ctx.repeat),
+              'hits': len(text.find_all("dolore"))}
+    archive.close()
+    return result
+
+# --- GUI (offscreen) ---
+@benchmark("gui.library_list_paint")
+def bench_library_paint(ctx):
+    app = ctx.qt_app()
+    from epub_reader.library_view import BookListModel, BookCardDelegate, BookListView
+    model = BookListModel()
+    delegate = BookCardDelegate(True)
+    view = BookListView(model, delegate)
+    view.resize(900, 700)
+    view.show()
+    books = _library_data(ctx.p['library_books'])['books']
+
+    def populate():
+        model.set_books(books)
+        app.processEvents()
+
+    def paint():
+        view.grab()
+    result = {'populate': measure(populate, ctx.repeat), 'paint_viewport': measure(paint, ctx.repeat),
+              'books': len(books)}
+    view.close()
+    return result
+
+@benchmark("gui.cover_thumbnail")
+def bench_cover_thumbnail(ctx):
+    ctx.qt_app()
+    from epub_reader.thumbnails import _decode_cover
+    path = ctx.book['path']
+    return measure(lambda: _decode_cover(path), ctx.repeat)
+
+@benchmark("gui.reader_load_book")
+def bench_reader_load_book(ctx):
+    app = ctx.qt_app()
+    try:
+        from epub_reader.resources import register_scheme
+        from epub_reader.reader import ReaderWindow
+    except ImportError as e:
+        raise Skip(f"QtWebEngine unavailable: {e}")
+    from epub_reader.storage import store_file
+    _, filename, _ = store_file(ctx.book['path'])
+    register_scheme()
+
+    book = {'title': "Bench", 'filename': filename}
+
+    def open_and_close(window):
+        window.bind_book("bench-book", book)
+        app.processEvents()
+        window.is_returning_to_library = True
+        window.close()
+        app.processEvents()
+
+    def cold():
+        window = ReaderWindow(lambda: None)
+        open_and_close(window)
+        window.shutdown()
+        window.deleteLater()
+        app.processEvents()
+
+    # The library keeps one window and rebinds it (see LibraryWindow.open_book)
+    pooled = ReaderWindow(lambda: None)
+    result = {'cold': measure(cold, ctx.repeat), 'reopen': measure(lambda: open_and_close(pooled), ctx.repeat)}
+    pooled.shutdown()
+    pooled.deleteLater()
+    app.processEvents()
+    return result
+
+# --- RUNNER ---
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+def headline(result):
+    # The single number shown in the console table
+    for key in ('min_ms', 'cold_ms', 'index_ms', 'extract_ms'):
+        if key in result:
+            return result[key]
+    for value in result.values():
+        if isinstance(value, dict) and 'min_ms' in value:
+            return value['min_ms']
+    return None
+
+def compare(current, previous_path):
+    with open(previous_path, 'r', encoding='utf-8') as f:
+        previous = json.load(f)['results']
+    print(f"\nCompared with {os.path.basename(previous_path)}:")
+    for name, result in current.items():
+        old, new = headline(previous.get(name, {})), headline(result)
+        if old and new:
+            print(f"  {name:<34} {old:>10.2f} -> {new:>10.2f} ms  ({(new - old) / old * 100:+.0f}%)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help="smaller books, fewer runs")
+    parser.add_argument('--only', nargs='*', default=[], help="benchmark names or prefixes (e.g. chapter.)")
+    parser.add_argument('--output', help=f"JSON file (default: {os.path.relpath(RESULTS_DIR, REPO_DIR)}/<timestamp>.json)")
+    parser.add_argument('--compare', help="previous JSON result to compare against")
+    args = parser.parse_args()
+
+    profile_name = 'quick' if args.quick else 'full'
+    ctx = Context(PROFILES[profile_name])
+    results = {}
+    try:
+        for name, fn in BENCHMARKS:
+            if args.only and not any(name == o or name.startswith(o) for o in args.only):
+                continue
+            try:
+                results[name] = fn(ctx)
+            except Skip as e:
+                results[name] = {'skipped': str(e)}
+            except Exception as e:
+                results[name] = {'error': f"{type(e).__name__}: {e}"}
+            value = headline(results[name])
+            status = f"{value:>10.2f} ms" if value is not None else f"  {next(iter(results[name].values()))}"
+            print(f"{name:<34} {status}")
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+    report = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'profile': profile_name,
+        'params': PROFILES[profile_name],
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': results,
+    }
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, datetime.now().strftime("bench-%Y%m%d-%H%M%S.json"))
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Synthetic EPUB and library generator for the benchmarks.
+
+    python benchmarks/synth.py book.epub [--chapters N] [--chapter-kb K]
+                               [--images N] [--image-kb K] [--toc-depth D]
+    python benchmarks/synth.py --library DIR --books N [same options]
+
+Books are written directly as zip files (no ebooklib), with an EPUB 3
+nav document, an NCX for older readers, a PNG cover and real PNG images
+so the thumbnail and image paths have something to decode.
+"""
+import os
+import sys
+import zlib
+import random
+import struct
+import zipfile
+import argparse
+from html import escape
+
+WORDS = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+         "incididunt ut labore et dolore magna aliqua enim ad minim veniam quis nostrud "
+         "exercitation ullamco laboris nisi aliquip ex ea commodo consequat").split()
+
+CONTAINER_XML = ('<?xml version="1.0"?><container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">'
+                 '<rootfiles><rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/>'
+                 '</rootfiles></container>')
+
+def make_png(width, height, rng, noise=True):
+    """A valid RGB PNG. Noise keeps it close to width*height*3 bytes on disk."""
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xffffffff)
+    row_bytes = width * 3
+    if noise:
+        raw = b"".join(b"\x00" + rng.randbytes(row_bytes) for _ in range(height))
+    else:
+        color = bytes(rng.randrange(256) for _ in range(3))
+        raw = (b"\x00" + color * width) * height
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw, 1))
+            + chunk(b"IEND", b""))
+
+def _png_side(image_kb):
+    return max(8, int((image_kb * 1024 / 3) ** 0.5))
+
+def _paragraph(rng, words=80):
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    # Some inline markup and entities, like real books
+    first, _, rest = text.partition(" ")
+    return f"<p><em>{first.capitalize()}</em> {rest} &amp; more &#8212; end.</p>"
+
+def _chapter(index, title, chapter_kb, image_hrefs, rng):
+    parts = [f'<?xml version="1.0" encoding="utf-8"?>\n<!DOCTYPE html>\n'
+             f'<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops">'
+             f'<head><title>{escape(title)}</title></head><body>'
+             f'<h1 id="ch{index}">{escape(title)}</h1>']
+    size = sum(len(p) for p in parts)
+    target = chapter_kb * 1024
+    para = 0
+    while size < target:
+        p = _paragraph(rng)
+        if para % 10 == 0:
+            p = p.replace("<p>", f'<p id="ch{index}-p{para}">', 1)
+        parts.append(p)
+        size += len(p)
+        para += 1
+        if image_hrefs and para == 3:
+            for href in image_hrefs:
+                parts.append(f'<p><img src="{href}" alt="figure"/></p>')
+    parts.append("</body></html>")
+    return "".join(parts)
+
+def _toc_levels(chapters, depth):
+    # Chapter i sits at level i % depth: a valid nesting that reaches `depth`
+    return [i % max(1, depth) for i in range(chapters)]
+
+def _nav(titles, levels):
+    out = ['<?xml version="1.0" encoding="utf-8"?>\n<!DOCTYPE html>\n'
+           '<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops">'
+           '<head><title>Contents</title></head><body><nav epub:type="toc" id="toc"><ol>']
+    current = 0
+    for i, (title, level) in enumerate(zip(titles, levels)):
+        if i > 0:
+            if level > current:
+                out.append("<ol>")
+            else:
+                out.append("</li>" + "</ol></li>" * (current - level))
+        current = level
+        out.append(f'<li><a href="text/ch{i}.xhtml">{escape(title)}</a>')
+    out.append("</li>" + "</ol></li>" * current + "</ol></nav></body></html>")
+    return "".join(out)
+
+def _ncx(uid, book_title, titles, levels):
+    out = ['<?xml version="1.0" encoding="utf-8"?>'
+           '<ncx xmlns="http://www.daisy.org/z3986/2005/ncx/" version="2005-1">'
+           f'<head><meta name="dtb:uid" content="{escape(uid)}"/></head>'
+           f'<docTitle><text>{escape(book_title)}</text></docTitle><navMap>']
+    open_points = 0
+    for i, (title, level) in enumerate(zip(titles, levels)):
+        if i > 0:
+            close = open_points - level
+            out.append("</navPoint>" * close)
+            open_points = level
+        out.append(f'<navPoint id="np{i}" playOrder="{i + 1}"><navLabel><text>{escape(title)}</text></navLabel>'
+                   f'<content src="text/ch{i}.xhtml"/>')
+        open_points += 1
+    out.append("</navPoint>" * open_points + "</navMap></ncx>")
+    return "".join(out)
+
+def make_epub(path, chapters=20, chapter_kb=40, images=10, image_kb=100, toc_depth=2,
+              title=None, seed=0, cover=True):
+    """
+    Writes a synthetic EPUB 3 to `path` and returns its parameters.
+    Images are spread over the chapters; the TOC nests `toc_depth` levels.
+    """
+    rng = random.Random(seed)
+    title = title or f"Synthetic Book {seed}"
+    uid = f"urn:uuid:synthetic-{seed}"
+    titles = [f"Chapter {i + 1}: {rng.choice(WORDS).capitalize()}" for i in range(chapters)]
+    levels = _toc_levels(chapters, toc_depth)
+
+    manifest = ['<item id="nav" href="nav.xhtml" media-type="application/xhtml+xml" properties="nav"/>',
+                '<item id="ncx" href="toc.ncx" media-type="application/x-dtbncx+xml"/>']
+    spine = []
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("mimetype", "application/epub+zip", compress_type=zipfile.ZIP_STORED)
+        zf.writestr("META-INF/container.xml", CONTAINER_XML)
+
+        if cover:
+            zf.writestr("OEBPS/images/cover.png", make_png(600, 900, rng, noise=False), compress_type=zipfile.ZIP_STORED)
+            manifest.append('<item id="cover-image" href="images/cover.png" media-type="image/png" properties="cover-image"/>')
+
+        side = _png_side(image_kb)
+        per_chapter = [[] for _ in range(chapters)]
+        for i in range(images):
+            href = f"images/img{i}.png"
+            # Images are stored, not deflated, as in most real EPUBs
+            zf.writestr(f"OEBPS/{href}", make_png(side, side, rng), compress_type=zipfile.ZIP_STORED)
+            manifest.append(f'<item id="img{i}" href="{href}" media-type="image/png"/>')
+            if chapters:
+                per_chapter[i % chapters].append(f"../{href}")
+
+        for i in range(chapters):
+            zf.writestr(f"OEBPS/text/ch{i}.xhtml", _chapter(i, titles[i], chapter_kb, per_chapter[i], rng))
+            manifest.append(f'<item id="ch{i}" href="text/ch{i}.xhtml" media-type="application/xhtml+xml"/>')
+            spine.append(f'<itemref idref="ch{i}"/>')
+
+        zf.writestr("OEBPS/nav.xhtml", _nav(titles, levels))
+        zf.writestr("OEBPS/toc.ncx", _ncx(uid, title, titles, levels))
+        cover_meta = '<meta name="cover" content="cover-image"/>' if cover else ""
+        zf.writestr("OEBPS/content.opf",
+                    '<?xml version="1.0" encoding="utf-8"?>'
+                    '<package xmlns="http://www.idpf.org/2007/opf" version="3.0" unique-identifier="uid">'
+                    '<metadata xmlns:dc="http://purl.org/dc/elements/1.1/">'
+                    f'<dc:identifier id="uid">{escape(uid)}</dc:identifier><dc:title>{escape(title)}</dc:title>'
+                    f'<dc:creator>Benchmark Author</dc:creator><dc:language>en</dc:language>{cover_meta}</metadata>'
+                    f'<manifest>{"".join(manifest)}</manifest>'
+                    f'<spine toc="ncx">{"".join(spine)}</spine></package>')
+
+    return {'path': path, 'chapters': chapters, 'chapter_kb': chapter_kb, 'images': images,
+            'image_kb': image_kb, 'toc_depth': toc_depth, 'bytes': os.path.getsize(path)}
+
+def make_library(directory, books=50, **book_options):
+    """Writes `books` distinct synthetic EPUBs into `directory`; returns their paths."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(books):
+        path = os.path.join(directory, f"book-{i:05d}.epub")
+        make_epub(path, title=f"Synthetic Book {i:05d}", seed=i, **book_options)
+        paths.append(path)
+    return paths
+
+def add_book_options(parser):
+    parser.add_argument('--chapters', type=int, default=20)
+    parser.add_argument('--chapter-kb', type=int, default=40)
+    parser.add_argument('--images', type=int, default=10)
+    parser.add_argument('--image-kb', type=int, default=100)
+    parser.add_argument('--toc-depth', type=int, default=2)
+
+def book_options(args):
+    return {'chapters': args.chapters, 'chapter_kb': args.chapter_kb, 'images': args.images,
+            'image_kb': args.image_kb, 'toc_depth': args.toc_depth}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('path', nargs='?', help="output .epub (single book)")
+    parser.add_argument('--library', help="output directory for a library of books")
+    parser.add_argument('--books', type=int, default=50)
+    add_book_options(parser)
+    args = parser.parse_args()
+
+    if args.library:
+        paths = make_library(args.library, args.books, **book_options(args))
+        print(f"Wrote {len(paths)} books to {args.library}")
+    elif args.path:
+        info = make_epub(args.path, **book_options(args))
+        print(f"Wrote {info['path']} ({info['bytes'] / 1024:.0f} KB)")
+    else:
+        parser.error("give an output path or --library DIR")
+        sys.exit(2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import threading
+import zipfile
+from collections import OrderedDict
+
+# --- ARCHIVE READ CACHE ---
+READ_CACHE_BUDGET = 16 * 1024 * 1024   # bytes kept across all cached entries
+READ_CACHE_MAX_ENTRY = 2 * 1024 * 1024  # larger entries are never cached
+
+class EpubArchive:
+    """
+    Keeps one open handle on an EPUB zip and serves member bytes on demand,
+    with a small LRU so resources requested repeatedly (CSS, fonts, the
+    same illustration on neighbouring pages) are only inflated once.
+    Safe to share between the GUI thread and worker threads.
+    """
+    def __init__(self, path, cache_budget=READ_CACHE_BUDGET, max_entry=READ_CACHE_MAX_ENTRY):
+        self.path = path
+        self.cache_budget = cache_budget
+        self.max_entry = max_entry
+        self._zip = zipfile.ZipFile(path)
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._cache_bytes = 0
+
+    def read(self, name):
+        with self._lock:
+            data = self._cache.get(name)
+            if data is not None:
+                self._cache.move_to_end(name)
+                return data
+
+        # Inflate outside the lock: ZipFile reads are thread-safe, and a
+        # large image should not hold up chapter reads on other threads.
+        data = self._zip.read(name)
+        if len(data) <= self.max_entry:
+            with self._lock:
+                if name not in self._cache:
+                    self._cache[name] = data
+                    self._cache_bytes += len(data)
+                    while self._cache_bytes > self.cache_budget:
+                        _, old = self._cache.popitem(last=False)
+                        self._cache_bytes -= len(old)
+        return data
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._cache), 'bytes': self._cache_bytes, 'budget': self.cache_budget}
+
+    def exists(self, name):
+        try:
+            self._zip.getinfo(name)
+            return True
+        except KeyError:
+            return False
+
+    def close(self):
+        with self._lock:
+            self._cache.clear()
+            self._cache_bytes = 0
+            self._zip.close()
@@ -0,0 +1,249 @@
+import os
+import json
+import posixpath
+import tempfile
+import zipfile
+from html.parser import HTMLParser
+from urllib.parse import unquote
+import xml.etree.ElementTree as ET
+from .database import CACHE_DIR
+from .archive import EpubArchive, READ_CACHE_BUDGET
+from .metadata import read_package, OPF_NS
+from .storage import object_hash, hash_file
+from .tracing import traced
+
+# --- STRUCTURE CACHE ---
+# The only things the reader needs up front are the manifest, spine and TOC.
+# They are read from the package document (plus the NCX or nav document)
+# without inflating any other item, and kept on disk keyed by the file's
+# content hash and mtime.
+STRUCTURE_DIR = os.path.join(CACHE_DIR, "structure")
+INDEX_FILE = os.path.join(STRUCTURE_DIR, "index.json")
+STRUCTURE_VERSION = 2
+XHTML_MEDIA_TYPE = "application/xhtml+xml"
+NCX_NS = "{http://www.daisy.org/z3986/2005/ncx/}"
+
+if not os.path.exists(STRUCTURE_DIR):
+    os.makedirs(STRUCTURE_DIR)
+
+def read_json(path):
+    try:
+        with open(path, 'r', encoding="utf-8") as f:
+            return json.load(f)
+    except:
+        return None
+
+def write_json(path, data):
+    fd, tmp = tempfile.mkstemp(prefix="cache-", dir=os.path.dirname(path), text=True)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            try: os.remove(tmp)
+            except: pass
+
+def file_fingerprint(path):
+    """
+    Returns (content_hash, mtime) for a stored book. The hash is only
+    recomputed when the file's size or mtime no longer match the index.
+    """
+    st = os.stat(path)
+    stored_hash = object_hash(path)
+    if stored_hash:
+        # Object-store files are named after their hash already
+        return stored_hash, st.st_mtime_ns
+
+    key = os.path.abspath(path)
+    index = read_json(INDEX_FILE) or {}
+    entry = index.get(key)
+    if entry and entry.get('size') == st.st_size and entry.get('mtime') == st.st_mtime_ns:
+        return entry['hash'], st.st_mtime_ns
+
+    content_hash = hash_file(path)
+    index[key] = {'size': st.st_size, 'mtime': st.st_mtime_ns, 'hash': content_hash}
+    write_json(INDEX_FILE, index)
+    return content_hash, st.st_mtime_ns
+
+def _resolve(base_dir, href):
+    # Zip path for an href relative to `base_dir`, keeping any #fragment
+    path, sep, fragment = href.partition('#')
+    if not path:
+        return href
+    return posixpath.normpath(posixpath.join(base_dir, unquote(path))) + sep + fragment
+
+def _clean_title(text):
+    return " ".join(text.split())
+
+# --- TABLE OF CONTENTS ---
+def _parse_ncx(data, base_dir):
+    root = ET.fromstring(data)
+    entries = []
+    nav_map = root.find(f"{NCX_NS}navMap")
+    if nav_map is None:
+        return entries
+    # Document order flattens the nesting the same way the TOC list shows it
+    for point in nav_map.iter(f"{NCX_NS}navPoint"):
+        label = point.find(f"{NCX_NS}navLabel/{NCX_NS}text")
+        content = point.find(f"{NCX_NS}content")
+        src = content.get('src', '') if content is not None else ''
+        entries.append([_clean_title(label.text or '') if label is not None else '', _resolve(base_dir, src)])
+    return entries
+
+class _NavTocParser(HTMLParser):
+    """Collects [title, href] for every link inside the EPUB 3 toc <nav>."""
+    def __init__(self, base_dir):
+        super().__init__(convert_charrefs=True)
+        self.base_dir = base_dir
+        self.entries = []
+        self._nav_depth = 0  # > 0 while inside the toc nav
+        self._link = None    # (text parts, href) of the open <a>
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'nav':
+            if self._nav_depth or 'toc' in (attrs.get('epub:type') or '').split() or 'toc' in attrs.values():
+                self._nav_depth += 1
+        elif tag == 'a' and self._nav_depth and attrs.get('href'):
+            self._link = ([], attrs['href'])
+
+    def handle_endtag(self, tag):
+        if tag == 'nav' and self._nav_depth:
+            self._nav_depth -= 1
+        elif tag == 'a' and self._link:
+            parts, href = self._link
+            self.entries.append([_clean_title("".join(parts)), _resolve(self.base_dir, href)])
+            self._link = None
+
+    def handle_data(self, data):
+        if self._link:
+            self._link[0].append(data)
+
+def _parse_nav(data, base_dir):
+    parser = _NavTocParser(base_dir)
+    parser.feed(data.decode('utf-8', errors='replace'))
+    parser.close()
+    return parser.entries
+
+def _read_toc(zf, items, ncx_id, nav_id):
+    # The NCX wins when the spine names one, as it did with ebooklib
+    sources = []
+    if ncx_id in items:
+        sources.append((_parse_ncx, items[ncx_id]['href']))
+    if nav_id in items:
+        sources.append((_parse_nav, items[nav_id]['href']))
+    for parse, href in sources:
+        try:
+            entries = parse(zf.read(href), posixpath.dirname(href))
+        except (KeyError, ET.ParseError) as e:
+            print(f"DEBUG: Unreadable TOC '{href}': {e}")
+            continue
+        if entries:
+            return entries
+    return []
+
+@traced("book_cache.build_structure")
+def build_structure(path):
+    with zipfile.ZipFile(path) as zf:
+        opf_path, package = read_package(zf)
+        opf_dir = posixpath.dirname(opf_path)
+
+        items = {}
+        html_map = {}
+        nav_id = None
+        for item in package.iterfind(f"{OPF_NS}manifest/{OPF_NS}item"):
+            item_id, href = item.get('id'), item.get('href')
+            if not item_id or not href:
+                continue
+            media_type = item.get('media-type') or ''
+            if media_type == "image/jpg":
+                media_type = "image/jpeg"  # common mislabel
+            items[item_id] = {'href': _resolve(opf_dir, href), 'media_type': media_type}
+            if media_type == XHTML_MEDIA_TYPE:
+                html_map[posixpath.basename(items[item_id]['href'])] = item_id
+                if 'nav' in (item.get('properties') or '').split():
+                    nav_id = item_id
+
+        spine_el = package.find(f"{OPF_NS}spine")
+        spine = []
+        ncx_id = None
+        if spine_el is not None:
+            spine = [ref.get('idref') for ref in spine_el.iterfind(f"{OPF_NS}itemref")]
+            ncx_id = spine_el.get('toc')
+        toc = _read_toc(zf, items, ncx_id, nav_id)
+
+    spine_map = {}
+    for idx, item_id in enumerate(spine):
+        if item_id in items:
+            spine_map[os.path.basename(items[item_id]['href'])] = idx
+
+    return {
+        'version': STRUCTURE_VERSION,
+        'items': items,
+        'spine': spine,
+        'spine_map': spine_map,
+        'html_map': html_map,
+        'toc': toc,
+    }
+
+@traced("book_cache.load_book_structure")
+def load_book_structure(path):
+    content_hash, mtime = file_fingerprint(path)
+    cache_file = os.path.join(STRUCTURE_DIR, f"{content_hash}.json")
+
+    structure = read_json(cache_file)
+    if structure and structure.get('version') == STRUCTURE_VERSION and structure.get('mtime') == mtime:
+        return structure
+
+    structure = build_structure(path)
+    structure['hash'] = content_hash
+    structure['mtime'] = mtime
+    write_json(cache_file, structure)
+    return structure
+
+def read_item(zf, structure, item_id):
+    entry = structure['items'].get(item_id)
+    if not entry:
+        return None
+    return zf.read(entry['href'])
+
+# --- LAZY BOOK ---
+class LazyBook:
+    """
+    An open book as the reader holds it: the cached structure (manifest,
+    spine, TOC) stays in memory, item bytes are inflated from the zip only
+    when asked for and at most `cache_budget` bytes of them are kept.
+    """
+    def __init__(self, path, cache_budget=READ_CACHE_BUDGET):
+        self.path = path
+        self.structure = load_book_structure(path)
+        self.archive = EpubArchive(path, cache_budget=cache_budget)
+
+    @property
+    def spine(self):
+        return self.structure['spine']
+
+    @property
+    def spine_map(self):
+        return self.structure['spine_map']
+
+    @property
+    def html_map(self):
+        return self.structure['html_map']
+
+    @property
+    def toc(self):
+        return self.structure['toc']
+
+    def has_item(self, item_id):
+        return item_id in self.structure['items']
+
+    def href(self, item_id):
+        return self.structure['items'][item_id]['href']
+
+    def read(self, item_id):
+        return read_item(self.archive, self.structure, item_id)
+
+    def close(self):
+        self.archive.close()
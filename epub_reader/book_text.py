@@ -0,0 +1,93 @@
+import os
+import re
+import threading
+from .database import CACHE_DIR
+from .book_cache import read_json, write_json, read_item
+from .utils import extract_text
+
+# --- CHAPTER TEXT CACHE ---
+# Plain text of every spine item plus the offset of each element id, kept
+# on disk per book. In-book search runs over this text in Python, and hits
+# are turned into pages with the reader's page map instead of asking the
+# web view for every match.
+TEXT_DIR = os.path.join(CACHE_DIR, "text")
+TEXT_VERSION = 1
+MAX_HITS = 5000
+
+if not os.path.exists(TEXT_DIR):
+    os.makedirs(TEXT_DIR)
+
+class BookText:
+    """
+    Chapter texts for one book, in spine order. Chapters are extracted on
+    demand; once every chapter is known the set is written to TEXT_DIR so
+    the next open (or the library indexer) skips the parsing entirely.
+    """
+    def __init__(self, structure, archive):
+        self.structure = structure
+        self.archive = archive
+        self.path = os.path.join(TEXT_DIR, f"{structure['hash']}.json")
+        self._chapters = [None] * len(structure['spine'])
+        self._lock = threading.Lock()
+        self._thread = None
+
+        cached = read_json(self.path)
+        if cached and cached.get('version') == TEXT_VERSION and len(cached['chapters']) == len(self._chapters):
+            self._chapters = cached['chapters']
+
+    def is_complete(self):
+        return all(c is not None for c in self._chapters)
+
+    def cached_chapter(self, spine_idx):
+        # Never parses; None when the chapter has not been extracted yet
+        if 0 <= spine_idx < len(self._chapters):
+            return self._chapters[spine_idx]
+        return None
+
+    def chapter(self, spine_idx):
+        entry = self._chapters[spine_idx]
+        if entry is None:
+            content = read_item(self.archive, self.structure, self.structure['spine'][spine_idx])
+            text, anchors = ("", {}) if content is None else extract_text(content.decode('utf-8', errors='replace'))
+            entry = {'text': text, 'anchors': anchors}
+            self._chapters[spine_idx] = entry
+        return entry
+
+    def load_all(self):
+        with self._lock:
+            if self.is_complete():
+                return
+            for i in range(len(self._chapters)):
+                self.chapter(i)
+            write_json(self.path, {'version': TEXT_VERSION, 'chapters': self._chapters})
+
+    def load_async(self, on_done):
+        # `on_done` runs on the worker thread
+        if self._thread is not None and self._thread.is_alive():
+            return
+        def run():
+            try:
+                self.load_all()
+            except Exception as e:
+                print(f"DEBUG: Text extraction failed: {e}")
+            on_done()
+        self._thread = threading.Thread(target=run, name="book-text", daemon=True)
+        self._thread.start()
+
+    def find_all(self, query, limit=MAX_HITS):
+        """
+        Case-insensitive matches of `query` as (spine_idx, start, length),
+        in reading order. Chapters that are not extracted yet are skipped.
+        """
+        if not query:
+            return []
+        pattern = re.compile(re.escape(query), re.IGNORECASE)
+        hits = []
+        for spine_idx, entry in enumerate(self._chapters):
+            if entry is None:
+                continue
+            for m in pattern.finditer(entry['text']):
+                hits.append((spine_idx, m.start(), m.end() - m.start()))
+                if len(hits) >= limit:
+                    return hits
+        return hits
@@ -0,0 +1,159 @@
+import os
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import Future
+from collections import OrderedDict
+from .database import CACHE_DIR
+from .disk_cache import DiskBudget
+
+# --- CHAPTER CACHE ---
+# Preparing a chapter inflates it and runs it through the streaming
+# transformer in utils (a full HTML parse and re-serialisation), so the
+# result is kept in a byte-bounded in-memory LRU backed by an on-disk tier.
+CHAPTER_DIR = os.path.join(CACHE_DIR, "chapters")
+MEMORY_BUDGET = 32 * 1024 * 1024   # bytes of HTML kept in RAM
+DISK_BUDGET = 256 * 1024 * 1024    # bytes of HTML kept under CHAPTER_DIR
+
+def chapter_key(book_hash, item_id, *variant):
+    """
+    Builds a cache key for one spine item. `variant` should hold everything
+    the prepared HTML depends on besides the source (CSS/theme version,
+    resource base paths, ...).
+    """
+    parts = "\0".join(str(p) for p in (item_id,) + variant)
+    return (book_hash, hashlib.sha1(parts.encode('utf-8')).hexdigest())
+
+class ChapterCache:
+    def __init__(self, memory_budget=MEMORY_BUDGET, disk_budget=DISK_BUDGET, disk_dir=CHAPTER_DIR):
+        self.memory_budget = memory_budget
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self._memory_bytes = 0
+        self._disk = DiskBudget(disk_dir, disk_budget)
+        self._lock = threading.RLock()  # prefetch workers share this cache
+        self._inflight = {}  # key -> Future of a prepare() in progress
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _disk_path(self, key):
+        book_hash, digest = key
+        return os.path.join(self.disk_dir, book_hash, f"{digest}.html")
+
+    def contains(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key):
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return html
+
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r', encoding="utf-8") as f:
+                html = f.read()
+            os.utime(path)  # mark as recently used for disk eviction
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, html)
+        return html
+
+    def put(self, key, html):
+        with self._lock:
+            self._remember(key, html)
+        self._write_disk(key, html)
+
+    def get_or_prepare(self, key, prepare):
+        """
+        Single-flight: while one caller prepares a key, others asking for it
+        (the reader, prefetch and chapter workers) wait for that result.
+        """
+        html = self.get(key)
+        if html is not None:
+            return html
+        with self._lock:
+            html = self._entries.get(key)  # put() by a flight that just ended
+            if html is not None:
+                return html
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = Future()
+        if not leader:
+            return flight.result()
+
+        try:
+            html = prepare()
+            if html is not None:
+                self.put(key, html)
+            flight.set_result(html)
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return html
+
+    def _remember(self, key, html):
+        if key in self._entries:
+            self._memory_bytes -= len(self._entries.pop(key))
+        size = len(html)
+        if size > self.memory_budget:
+            return
+        self._entries[key] = html
+        self._memory_bytes += size
+        while self._memory_bytes > self.memory_budget:
+            _, old = self._entries.popitem(last=False)
+            self._memory_bytes -= len(old)
+            self.evictions += 1
+
+    def _write_disk(self, key, html):
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix="chapter-", dir=os.path.dirname(path), text=True)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(html)
+            os.replace(tmp, path)
+        except OSError:
+            if os.path.exists(tmp):
+                try: os.remove(tmp)
+                except: pass
+            return
+
+        self._disk.account(len(html))
+
+    def clear_memory(self):
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'disk_evictions': self._disk.evictions,
+                'memory_entries': len(self._entries),
+                'memory_bytes': self._memory_bytes,
+                'memory_budget': self.memory_budget,
+                'disk_bytes': self._disk.bytes,
+                'disk_budget': self._disk.budget,
+            }
+
+# Shared across reader windows so reopening a book keeps its warm chapters
+chapter_cache = ChapterCache()
@@ -0,0 +1,322 @@
+"""
+Library maintenance without the GUI. Nothing here imports Qt, and each
+command only imports the modules it needs, so scripted calls start fast.
+
+    python -m epub_reader.cli import PATH... [-j N]
+    python -m epub_reader.cli reindex [BOOK_ID...] [--missing] [-j N]
+    python -m epub_reader.cli verify [--quick] [-j N]
+    python -m epub_reader.cli export-progress [-o FILE] [--format json|csv]
+    python -m epub_reader.cli prune [--dry-run]
+    python -m epub_reader.cli list
+
+Set DORKY_READER_HOME to work on a library other than the default one.
+"""
+import os
+import sys
+import argparse
+import contextlib
+
+DEFAULT_JOBS = max(1, (os.cpu_count() or 2) - 1)
+
+def _log(message):
+    print(message, file=sys.stderr)
+
+def _progress(label):
+    def report(done, total):
+        if done == total or done % 25 == 0:
+            _log(f"{label} {done} / {total}")
+    return report
+
+def _books(book_ids=None):
+    from .database import load_library
+    books = load_library().get('books', {})
+    if book_ids:
+        missing = [b for b in book_ids if b not in books]
+        if missing:
+            raise SystemExit(f"Unknown book id(s): {', '.join(missing)}")
+        books = {b: books[b] for b in book_ids}
+    return books
+
+def _map_parallel(fn, jobs, items, label):
+    # (item, result or exception) pairs, in completion order
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    items = list(items)
+    if not items:
+        return
+    report = _progress(label)
+    with ProcessPoolExecutor(max_workers=max(1, min(jobs, len(items)))) as pool:
+        futures = {pool.submit(fn, *item): item for item in items}
+        for done, future in enumerate(as_completed(futures), 1):
+            try:
+                yield futures[future], future.result()
+            except Exception as e:
+                yield futures[future], e
+            report(done, len(items))
+
+# --- IMPORT ---
+def cmd_import(args):
+    from .importer import run_import
+    imported, duplicates, failed = run_import(args.paths, workers=args.jobs, on_progress=_progress("Imported"))
+    print(f"Imported {imported} book(s), {duplicates} already in library, {failed} failed")
+    if args.index and imported:
+        # Newly imported books are the ones missing from the index
+        args.book_ids, args.missing = [], True
+        cmd_reindex(args)
+    return 1 if failed else 0
+
+# --- SEARCH INDEX ---
+def _extract_book_text(book_id, filename):
+    # Worker process: fills the on-disk text cache so indexing is I/O only
+    from .archive import EpubArchive
+    from .book_cache import load_book_structure
+    from .book_text import BookText
+    from .storage import resolve_path
+    path = resolve_path(filename)
+    archive = EpubArchive(path)
+    try:
+        BookText(load_book_structure(path), archive).load_all()
+    finally:
+        archive.close()
+    return True
+
+def cmd_reindex(args):
+    from . import search_index
+    books = _books(args.book_ids)
+    if args.missing:
+        indexed = search_index.indexed_book_ids()
+        books = {b: d for b, d in books.items() if b not in indexed}
+
+    jobs = [(b_id, data['filename']) for b_id, data in books.items()]
+    failed = 0
+    passages = 0
+    # Text extraction is the expensive part and runs in parallel; the
+    # index itself has a single writer.
+    for (b_id, filename), result in _map_parallel(_extract_book_text, args.jobs, jobs, "Extracted"):
+        if isinstance(result, Exception):
+            failed += 1
+            _log(f"{b_id}: {result}")
+            continue
+        passages += search_index.index_book(b_id, filename)
+    print(f"Indexed {len(jobs) - failed} book(s), {passages} passage(s), {failed} failed")
+    return 1 if failed else 0
+
+# --- VERIFY ---
+def _verify_book(book_id, filename, quick):
+    import zipfile
+    from .book_cache import build_structure
+    from .storage import resolve_path, object_hash, hash_file
+    path = resolve_path(filename)
+    if not os.path.exists(path):
+        return ["file missing"]
+
+    problems = []
+    expected = object_hash(filename)
+    if expected and not quick and hash_file(path) != expected:
+        problems.append("content does not match its hash")
+    try:
+        with zipfile.ZipFile(path) as zf:
+            if not quick:
+                bad = zf.testzip()
+                if bad:
+                    problems.append(f"corrupt zip member {bad}")
+            names = set(zf.namelist())
+        # Member names resolved exactly as the reader resolves them
+        structure = build_structure(path)
+        for item_id in structure['spine']:
+            entry = structure['items'].get(item_id)
+            if not entry or entry['href'] not in names:
+                problems.append(f"spine item '{item_id}' missing")
+    except Exception as e:
+        problems.append(f"unreadable: {e}")
+    return problems
+
+def cmd_verify(args):
+    books = _books()
+    jobs = [(b_id, data['filename'], args.quick) for b_id, data in books.items()]
+    broken = 0
+    for (b_id, _, _), problems in _map_parallel(_verify_book, args.jobs, jobs, "Verified"):
+        if isinstance(problems, Exception):
+            problems = [f"check failed: {problems}"]
+        if problems:
+            broken += 1
+            title = books[b_id].get('title', b_id)
+            for problem in problems:
+                print(f"{b_id}\t{title}\t{problem}")
+    print(f"Verified {len(jobs)} book(s), {broken} with problems", file=sys.stderr)
+    return 1 if broken else 0
+
+# --- EXPORT PROGRESS ---
+PROGRESS_FIELDS = ('id', 'title', 'authors', 'progress_percent', 'last_chapter_index',
+                   'last_page_index', 'last_opened')
+
+def cmd_export_progress(args):
+    import json
+    from datetime import datetime, timezone
+    from .journal import progress_journal
+    with contextlib.redirect_stdout(sys.stderr):
+        progress_journal.replay()  # fold in progress from a session that did not exit cleanly
+
+    rows = []
+    for b_id, data in _books().items():
+        opened = data.get('last_opened')
+        rows.append({
+            'id': b_id,
+            'title': data.get('title', b_id),
+            'authors': data.get('authors', []),
+            'progress_percent': data.get('progress_percent', 0),
+            'last_chapter_index': data.get('last_chapter_index', 0),
+            'last_page_index': data.get('last_page_index', 0),
+            'last_opened': datetime.fromtimestamp(opened, timezone.utc).isoformat(timespec='seconds') if opened else None,
+        })
+
+    out = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    try:
+        if args.format == 'csv':
+            import csv
+            writer = csv.DictWriter(out, fieldnames=PROGRESS_FIELDS)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(dict(row, authors="; ".join(row['authors'])))
+        else:
+            json.dump(rows, out, indent=2, ensure_ascii=False)
+            out.write("\n")
+    finally:
+        if args.output:
+            out.close()
+    return 0
+
+# --- PRUNE ---
+def _size(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(root, n)) for root, _, names in os.walk(path) for n in names)
+    return os.path.getsize(path)
+
+def cmd_prune(args):
+    import shutil
+    from .database import STORAGE_DIR
+    from .book_cache import STRUCTURE_DIR, INDEX_FILE, file_fingerprint, read_json, write_json
+    from .book_text import TEXT_DIR
+    from .chapter_cache import CHAPTER_DIR
+    from .disk_cache import (THUMB_DIR, PAGES_DIR, IMAGE_DIR, book_key, thumbnail_key,
+                             derivative_book_key)
+    from .storage import resolve_path
+    from . import search_index
+
+    books = _books()
+    referenced = {os.path.normcase(os.path.abspath(resolve_path(d['filename']))) for d in books.values()}
+    live_hashes = set()
+    for data in books.values():
+        path = resolve_path(data['filename'])
+        if os.path.exists(path):
+            live_hashes.add(file_fingerprint(path)[0])
+    live_thumbs = {thumbnail_key(d['filename']) for d in books.values()}
+
+    doomed = []
+    for root, _, names in os.walk(STORAGE_DIR):
+        for name in names:
+            path = os.path.join(root, name)
+            if os.path.normcase(os.path.abspath(path)) not in referenced:
+                doomed.append(path)  # orphaned books and interrupted imports
+    for directory in (STRUCTURE_DIR, TEXT_DIR, PAGES_DIR):
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                stem, ext = os.path.splitext(name)
+                if ext == '.json' and name != os.path.basename(INDEX_FILE) and stem not in live_hashes:
+                    doomed.append(os.path.join(directory, name))
+    if os.path.isdir(CHAPTER_DIR):
+        doomed.extend(os.path.join(CHAPTER_DIR, n) for n in os.listdir(CHAPTER_DIR) if n not in live_hashes)
+    if os.path.isdir(IMAGE_DIR):
+        live_keys = {book_key(h) for h in live_hashes}
+        doomed.extend(os.path.join(IMAGE_DIR, n) for n in os.listdir(IMAGE_DIR)
+                      if derivative_book_key(n) not in live_keys)
+    if os.path.isdir(THUMB_DIR):
+        doomed.extend(os.path.join(THUMB_DIR, n) for n in os.listdir(THUMB_DIR)
+                      if os.path.splitext(n)[0] not in live_thumbs)
+
+    freed = 0
+    for path in doomed:
+        try:
+            freed += _size(path)
+            if args.dry_run:
+                print(f"would remove {path}")
+            elif os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+        except OSError as e:
+            _log(f"{path}: {e}")
+
+    index = read_json(INDEX_FILE) or {}
+    stale_index = [key for key in index if not os.path.exists(key)]
+    stale_search = search_index.indexed_book_ids() - set(books)
+    if not args.dry_run:
+        if stale_index:
+            write_json(INDEX_FILE, {k: v for k, v in index.items() if k not in stale_index})
+        for b_id in stale_search:
+            search_index.remove_book(b_id)
+        # Empty object shards left behind
+        for root, dirs, names in os.walk(STORAGE_DIR, topdown=False):
+            if root != STORAGE_DIR and not dirs and not names:
+                try: os.rmdir(root)
+                except OSError: pass
+
+    verb = "Would free" if args.dry_run else "Freed"
+    print(f"{verb} {freed / (1024 * 1024):.1f} MB in {len(doomed)} file(s); "
+          f"{len(stale_index)} stale hash entries, {len(stale_search)} stale search entries")
+    return 0
+
+# --- LIST ---
+def cmd_list(args):
+    for b_id, data in _books().items():
+        print(f"{b_id}\t{data.get('progress_percent', 0)}%\t{data.get('title', b_id)}")
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m epub_reader.cli",
+                                     description="Dorky EPUB Reader library maintenance (no GUI).")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    def jobs(p):
+        p.add_argument('-j', '--jobs', type=int, default=DEFAULT_JOBS, help=f"worker processes (default {DEFAULT_JOBS})")
+
+    p = sub.add_parser('import', help="import EPUB files or folders")
+    p.add_argument('paths', nargs='+')
+    p.add_argument('--index', action='store_true', help="add the imported books to the search index")
+    jobs(p)
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser('reindex', help="rebuild the full-text search index")
+    p.add_argument('book_ids', nargs='*', help="only these books (default: all)")
+    p.add_argument('--missing', action='store_true', help="only books not indexed yet")
+    jobs(p)
+    p.set_defaults(func=cmd_reindex)
+
+    p = sub.add_parser('verify', help="check stored books for missing or corrupt files")
+    p.add_argument('--quick', action='store_true', help="skip content hashing and CRC checks")
+    jobs(p)
+    p.set_defaults(func=cmd_verify)
+
+    p = sub.add_parser('export-progress', help="write reading progress as JSON or CSV")
+    p.add_argument('-o', '--output', help="file to write (default: stdout)")
+    p.add_argument('--format', choices=('json', 'csv'), default='json')
+    p.set_defaults(func=cmd_export_progress)
+
+    p = sub.add_parser('prune', help="remove unreferenced books and stale cache entries")
+    p.add_argument('--dry-run', action='store_true')
+    p.set_defaults(func=cmd_prune)
+
+    p = sub.add_parser('list', help="list books with their progress")
+    p.set_defaults(func=cmd_list)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except BrokenPipeError:
+        # Output piped into `head` and friends
+        sys.stdout = open(os.devnull, 'w')
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,16 @@
 import os
 import json
-import tempfile
-from ebooklib import epub
+import sqlite3
+import threading
 import sys
 from pathlib import Path
+from .tracing import traced
 
 # Detect if we are running as an EXE (frozen) or script
-if getattr(sys, 'frozen', False):
+if os.environ.get("DORKY_READER_HOME"):
+    # Explicit data directory (benchmarks, tools, a second profile)
+    ROOT_DIR = os.path.abspath(os.environ["DORKY_READER_HOME"])
+elif getattr(sys, 'frozen', False):
     # We are running as an EXE
     # Save data in: C:\Users\You\Documents\DorkyReader
     ROOT_DIR = os.path.join(Path.home(), "Documents", "DorkyReader")
@@ -16,45 +20,174 @@ else:
     ROOT_DIR = os.path.dirname(PACKAGE_DIR)
     
 STORAGE_DIR = os.path.join(ROOT_DIR, "library_storage")
-DB_FILE = os.path.join(ROOT_DIR, "library.json")
+CACHE_DIR = os.path.join(ROOT_DIR, "cache")
+DB_FILE = os.path.join(ROOT_DIR, "library.db")
+LEGACY_DB_FILE = os.path.join(ROOT_DIR, "library.json")  # migrated on first open
 
-if not os.path.exists(STORAGE_DIR):
-    os.makedirs(STORAGE_DIR)
+for _dir in (STORAGE_DIR, CACHE_DIR):
+    if not os.path.exists(_dir):
+        os.makedirs(_dir)
 
-def load_library():
-    if not os.path.exists(DB_FILE):
-        return {'books': {}, 'theme': 'dark'} # Default structure
+DEFAULT_THEME = 'dark'
+BOOK_COLUMNS = ('title', 'filename', 'last_chapter_index', 'last_page_index',
+                'progress_percent', 'last_opened')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    last_chapter_index INTEGER NOT NULL DEFAULT 0,
+    last_page_index INTEGER NOT NULL DEFAULT 0,
+    progress_percent INTEGER NOT NULL DEFAULT 0,
+    last_opened REAL,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_books_title ON books(title COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_books_last_opened ON books(last_opened);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_conn = None
+_lock = threading.RLock()  # one shared connection, used from worker threads too
+
+def get_connection():
+    global _conn
+    with _lock:
+        if _conn is None:
+            conn = sqlite3.connect(DB_FILE, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            _migrate_legacy_json(conn)
+            _conn = conn
+        return _conn
+
+def _migrate_legacy_json(conn):
+    if not os.path.exists(LEGACY_DB_FILE):
+        return
+    if conn.execute("SELECT 1 FROM books LIMIT 1").fetchone():
+        return
     try:
-        with open(DB_FILE, 'r') as f:
+        with open(LEGACY_DB_FILE, 'r') as f:
             data = json.load(f)
-            return data
     except:
-        return {'books': {}, 'theme': 'dark'}
+        return
+
+    with conn:
+        for book_id, book in data.get('books', {}).items():
+            _upsert_book(conn, book_id, book)
+        if 'theme' in data:
+            conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('theme', ?)", (data['theme'],))
+    os.replace(LEGACY_DB_FILE, LEGACY_DB_FILE + ".migrated")
+    print(f"DEBUG: Migrated {len(data.get('books', {}))} books from {LEGACY_DB_FILE}")
+
+def _split_book(data):
+    # Known fields get their own columns; anything else rides along as JSON
+    columns = {k: data[k] for k in BOOK_COLUMNS if k in data}
+    extra = {k: v for k, v in data.items() if k not in BOOK_COLUMNS}
+    return columns, extra
+
+def _row_to_book(row):
+    book = {k: row[k] for k in BOOK_COLUMNS if row[k] is not None}
+    if row['extra']:
+        book.update(json.loads(row['extra']))
+    return book
+
+def _upsert_book(conn, book_id, data):
+    columns, extra = _split_book(data)
+    columns.setdefault('title', book_id)
+    columns.setdefault('filename', book_id)
+    columns['extra'] = json.dumps(extra, ensure_ascii=False) if extra else None
+    names = ", ".join(columns)
+    marks = ", ".join("?" for _ in columns)
+    updates = ", ".join(f"{k}=excluded.{k}" for k in columns)
+    conn.execute(f"INSERT INTO books (id, {names}) VALUES (?, {marks}) "
+                 f"ON CONFLICT(id) DO UPDATE SET {updates}",
+                 (book_id, *columns.values()))
+
+@traced("database.load_library")
+def load_library():
+    conn = get_connection()
+    with _lock:
+        rows = conn.execute("SELECT * FROM books ORDER BY rowid").fetchall()
+        theme = get_setting('theme', DEFAULT_THEME)
+    return {'books': {row['id']: _row_to_book(row) for row in rows}, 'theme': theme}
 
+@traced("database.save_library")
 def save_library(data):
-    dirpath = os.path.dirname(DB_FILE) or "."
-    fd, tmp = tempfile.mkstemp(prefix="library-", dir=dirpath, text=True)
-    try:
-        with os.fdopen(fd, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4)
-            f.flush()
-            os.fsync(f.fileno())
-        os.replace(tmp, DB_FILE)
-    finally:
-        if os.path.exists(tmp):
-            try: os.remove(tmp)
-            except: pass
-
-def get_epub_meta(path):
-    try:
-        book = epub.read_epub(path)
-        title = book.get_metadata('DC', 'title')
-        title = title[0][0] if title else os.path.basename(path)
-        return title
-    except:
-        return os.path.basename(path)
+    # Full-document save, kept for callers that still edit the whole dict.
+    # Prefer add_book / update_book / set_setting for single changes.
+    conn = get_connection()
+    books = data.get('books', {})
+    with _lock, conn:
+        existing = {row['id'] for row in conn.execute("SELECT id FROM books")}
+        for book_id in existing - set(books):
+            conn.execute("DELETE FROM books WHERE id = ?", (book_id,))
+        for book_id, book in books.items():
+            _upsert_book(conn, book_id, book)
+        if 'theme' in data:
+            conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('theme', ?)", (data['theme'],))
+
+@traced("database.get_book")
+def get_book(book_id):
+    conn = get_connection()
+    with _lock:
+        row = conn.execute("SELECT * FROM books WHERE id = ?", (book_id,)).fetchone()
+    return _row_to_book(row) if row else None
+
+def add_book(book_id, data):
+    conn = get_connection()
+    with _lock, conn:
+        _upsert_book(conn, book_id, data)
+
+@traced("database.add_books")
+def add_books(books):
+    # Bulk insert of (book_id, data) pairs in one transaction
+    conn = get_connection()
+    with _lock, conn:
+        for book_id, data in books:
+            _upsert_book(conn, book_id, data)
+
+@traced("database.update_book")
+def update_book(book_id, **fields):
+    conn = get_connection()
+    with _lock, conn:
+        row = conn.execute("SELECT extra FROM books WHERE id = ?", (book_id,)).fetchone()
+        if not row:
+            return False
+        columns, extra = _split_book(fields)
+        if extra:
+            merged = json.loads(row['extra']) if row['extra'] else {}
+            merged.update(extra)
+            columns['extra'] = json.dumps(merged, ensure_ascii=False)
+        if columns:
+            assignments = ", ".join(f"{k} = ?" for k in columns)
+            conn.execute(f"UPDATE books SET {assignments} WHERE id = ?", (*columns.values(), book_id))
+    return True
+
+def remove_book(book_id):
+    conn = get_connection()
+    with _lock, conn:
+        conn.execute("DELETE FROM books WHERE id = ?", (book_id,))
+
+def get_setting(key, default=None):
+    conn = get_connection()
+    with _lock:
+        row = conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+    return row['value'] if row else default
+
+def set_setting(key, value):
+    conn = get_connection()
+    with _lock, conn:
+        conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, value))
 
 def delete_book_files(filename):
-    path = os.path.join(STORAGE_DIR, filename)
+    # `filename` is relative to STORAGE_DIR ("objects/ab/<hash>.epub" or a legacy basename)
+    path = os.path.join(STORAGE_DIR, *filename.split('/'))
     if os.path.exists(path):
         os.remove(path)
\ No newline at end of file
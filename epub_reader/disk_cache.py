@@ -0,0 +1,86 @@
+import os
+import hashlib
+import threading
+from .database import CACHE_DIR
+
+# --- CACHE LAYOUT ---
+# Where the caches owned by Qt modules (thumbnails, page counts, image
+# derivatives) live and how their files are named. Kept free of Qt so the
+# CLI can find and prune them without importing the GUI. The size budget
+# shared by the file caches lives here too.
+THUMB_DIR = os.path.join(CACHE_DIR, "thumbnails")
+PAGES_DIR = os.path.join(CACHE_DIR, "pages")
+IMAGE_DIR = os.path.join(CACHE_DIR, "images")
+BOOK_KEY_CHARS = 32  # epub:// host labels are limited to 63 characters
+
+def book_key(content_hash):
+    # Names a book on the epub:// scheme and prefixes its image derivatives
+    return content_hash[:BOOK_KEY_CHARS]
+
+def thumbnail_key(filename):
+    # Thumbnail files are <key> plus a suffix
+    return hashlib.sha1(filename.encode('utf-8')).hexdigest()
+
+def derivative_key(book_key, href, spec):
+    # Derivative files are <key> plus a suffix
+    digest = hashlib.sha1(f"{href}\0{spec}".encode('utf-8')).hexdigest()
+    return f"{book_key}-{digest}"
+
+def derivative_book_key(name):
+    return name.split('-', 1)[0]
+
+# --- DISK BUDGET ---
+EVICT_TO = 0.9  # eviction trims a cache to this fraction of its budget
+
+class DiskBudget:
+    """
+    Size bookkeeping for a directory of cache files (searched recursively).
+    `account()` each file written; once the total passes `budget`, the least
+    recently used files (oldest mtime) are removed. Readers mark a hit with
+    os.utime(). Safe to call from worker threads.
+    """
+    def __init__(self, directory, budget):
+        self.directory = directory
+        self.budget = budget
+        self.evictions = 0
+        self._bytes = None  # computed lazily on the first write
+        self._lock = threading.Lock()
+
+    @property
+    def bytes(self):
+        return self._bytes
+
+    def account(self, size):
+        with self._lock:
+            if self._bytes is None:
+                # The scan already includes the file just written
+                self._bytes = sum(size for _, _, size in self._scan())
+            else:
+                self._bytes += size
+            if self._bytes > self.budget:
+                self._evict()
+
+    def _scan(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                yield path, st.st_mtime, st.st_size
+
+    def _evict(self):
+        target = int(self.budget * EVICT_TO)
+        files = sorted(self._scan(), key=lambda f: f[1])
+        total = sum(size for _, _, size in files)
+        for path, _, size in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                self.evictions += 1
+            except OSError:
+                pass
+        self._bytes = total
@@ -0,0 +1,148 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QCoreApplication, QObject, QSize, QBuffer, QByteArray, QIODevice, Qt, pyqtSignal
+from PyQt6.QtGui import QImageReader
+from .disk_cache import IMAGE_DIR, DiskBudget, derivative_key
+from .tracing import traced
+
+# --- IMAGE DERIVATIVES ---
+# Chapter images are referenced as <src>?fit=WxH (device pixels). The scheme
+# handler answers those with a copy scaled down to that box, built on a
+# worker pool and kept on disk, so a page turn into an illustrated chapter
+# does not decode and upload a 4000px scan. The unscaled original is only
+# requested when an image is zoomed.
+IMAGE_DISK_BUDGET = 256 * 1024 * 1024  # bytes of derivatives kept on disk
+IMAGE_WORKERS = 2
+FIT_STEP = 256          # box sides are rounded up, so small resizes reuse derivatives
+JPEG_QUALITY = 85
+ORIGINAL_SUFFIX = ".orig"  # marker: the original already fits, serve it as-is
+# Vector and animated formats are always served as they are
+SCALABLE_TYPES = ('image/jpeg', 'image/png', 'image/webp', 'image/bmp')
+
+if not os.path.exists(IMAGE_DIR):
+    os.makedirs(IMAGE_DIR)
+
+def fit_box(width, height, device_pixel_ratio):
+    """
+    The `fit` spec for a viewport of width x height logical pixels. Mirrors
+    the img rule in THEME_CSS (100vw - 80px wide, 85vh high).
+    """
+    def step(value):
+        return max(FIT_STEP, -(-int(value * device_pixel_ratio) // FIT_STEP) * FIT_STEP)
+    return f"{step(width - 80)}x{step(height * 0.85)}"
+
+def parse_fit(spec):
+    try:
+        w, h = (int(v) for v in spec.lower().split('x'))
+    except (AttributeError, ValueError):
+        return None
+    return QSize(w, h) if w > 0 and h > 0 else None
+
+def can_derive(media_type):
+    return media_type in SCALABLE_TYPES
+
+def _base_path(book_key, href, spec):
+    return os.path.join(IMAGE_DIR, derivative_key(book_key, href, spec))
+
+@traced("images.make_derivative")
+def make_derivative(data, box):
+    """
+    Returns (bytes, mime) for `data` scaled to fit `box`, or None when the
+    original is no larger than the box (or cannot be decoded).
+    """
+    buf = QBuffer()
+    buf.setData(QByteArray(data))
+    buf.open(QIODevice.OpenModeFlag.ReadOnly)
+    reader = QImageReader(buf)
+    size = reader.size()
+    if not size.isValid() or (size.width() <= box.width() and size.height() <= box.height()):
+        return None
+    # Let the decoder downsample (JPEG can decode at 1/2, 1/4, 1/8 scale)
+    reader.setScaledSize(size.scaled(box, Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        return None
+
+    out = QBuffer()
+    out.open(QIODevice.OpenModeFlag.WriteOnly)
+    if image.hasAlphaChannel():
+        image.save(out, "PNG")
+        return bytes(out.data()), "image/png"
+    image.save(out, "JPEG", JPEG_QUALITY)
+    return bytes(out.data()), "image/jpeg"
+
+class ImageDerivatives(QObject):
+    """
+    Disk-cached, viewport-sized copies of book images. `request()` never
+    blocks the GUI thread: its callback runs there once the derivative is
+    ready, with (None, None) when the original should be served instead.
+    """
+    _done = pyqtSignal(str, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pool = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="images")
+        self._lock = threading.Lock()
+        self._pending = {}  # base path -> callbacks waiting for it
+        self._disk = DiskBudget(IMAGE_DIR, IMAGE_DISK_BUDGET)
+        self._done.connect(self._on_done)
+        app = QCoreApplication.instance()
+        if app:
+            app.aboutToQuit.connect(self.shutdown)
+
+    def request(self, book_key, href, spec, archive, callback=None):
+        """`callback(data, mime)` on the GUI thread; None only warms the cache."""
+        base = _base_path(book_key, href, spec)
+        with self._lock:
+            waiting = self._pending.get(base)
+            if waiting is not None:
+                if callback:
+                    waiting.append(callback)
+                return
+            self._pending[base] = [callback] if callback else []
+        self._pool.submit(self._build, base, href, spec, archive)
+
+    def _cached(self, base):
+        for suffix, mime in ((".jpg", "image/jpeg"), (".png", "image/png")):
+            path = base + suffix
+            if os.path.exists(path):
+                os.utime(path)  # recently used, for eviction
+                with open(path, 'rb') as f:
+                    return f.read(), mime
+        if os.path.exists(base + ORIGINAL_SUFFIX):
+            return None, None
+        return False
+
+    def _build(self, base, href, spec, archive):
+        # Worker thread
+        result = (None, None)
+        try:
+            cached = self._cached(base)
+            if cached is not False:
+                result = cached
+            else:
+                derived = make_derivative(archive.read(href), parse_fit(spec))
+                if derived is None:
+                    open(base + ORIGINAL_SUFFIX, 'w').close()
+                else:
+                    data, mime = derived
+                    path = base + (".png" if mime == "image/png" else ".jpg")
+                    tmp = path + ".tmp"
+                    with open(tmp, 'wb') as f:
+                        f.write(data)
+                    os.replace(tmp, path)
+                    self._disk.account(len(data))
+                    result = derived
+        except Exception as e:
+            print(f"DEBUG: Image derivative for '{href}' failed: {e}")
+        self._done.emit(base, result)
+
+    def _on_done(self, base, result):
+        with self._lock:
+            callbacks = self._pending.pop(base, [])
+        for callback in callbacks:
+            callback(*result)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
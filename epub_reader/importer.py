@@ -0,0 +1,94 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from .database import add_books, get_book
+from .metadata import read_metadata
+from .storage import store_file, resolve_path
+
+# --- BULK IMPORT ---
+# Copying and metadata extraction run on a process pool; results are
+# committed to the library in batches. No Qt here, so the same code
+# drives the GUI import and batch jobs. Workers are spawned, never forked:
+# the GUI runs imports from a QThread of a multithreaded Qt process.
+IMPORT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+COMMIT_BATCH = 50
+
+def find_epubs(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, n) for n in sorted(names) if n.lower().endswith('.epub'))
+        elif path.lower().endswith('.epub'):
+            files.append(path)
+    return files
+
+def import_file(src):
+    # Runs in a worker process. Books are keyed by content hash, so the
+    # same file imported twice (under any name) maps to the same id.
+    original_name = os.path.basename(src)
+    content_hash, filename, _ = store_file(src)
+    try:
+        # Stored objects are named by hash, so untitled books fall back to the source name
+        meta = read_metadata(resolve_path(filename), default_title=original_name)
+    except Exception:
+        meta = {'title': original_name, 'authors': []}
+    return content_hash, {
+        'title': meta['title'],
+        'authors': meta['authors'],
+        'filename': filename,
+        'original_name': original_name,
+        'last_chapter_index': 0,
+        'last_page_index': 0,
+        'progress_percent': 0
+    }
+
+def run_import(paths, workers=IMPORT_WORKERS, batch_size=COMMIT_BATCH,
+               on_progress=None, on_batch=None, is_cancelled=None):
+    """
+    Imports every EPUB under `paths`. `on_progress(done, total)` is called
+    after each file and `on_batch(books)` after each committed batch of
+    (book_id, data) pairs. Returns (imported, duplicates, failed) counts.
+    """
+    files = find_epubs(paths)
+    total = len(files)
+    imported = duplicates = failed = done = 0
+    batch = []
+    seen = set()
+
+    def commit():
+        nonlocal imported
+        if batch:
+            add_books(batch)
+            imported += len(batch)
+            if on_batch: on_batch(list(batch))
+            batch.clear()
+
+    if not files:
+        return 0, 0, 0
+
+    with ProcessPoolExecutor(max_workers=min(workers, total),
+                             mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = {pool.submit(import_file, f): f for f in files}
+        for future in as_completed(futures):
+            done += 1
+            try:
+                book_id, data = future.result()
+                if book_id in seen or get_book(book_id):
+                    duplicates += 1  # keeps the existing entry and its progress
+                else:
+                    seen.add(book_id)
+                    batch.append((book_id, data))
+            except Exception as e:
+                failed += 1
+                print(f"DEBUG: Import of '{futures[future]}' failed: {e}")
+            if len(batch) >= batch_size:
+                commit()
+            if on_progress: on_progress(done, total)
+            if is_cancelled and is_cancelled():
+                for f in futures:
+                    f.cancel()
+                break
+        commit()
+
+    return imported, duplicates, failed
@@ -0,0 +1,118 @@
+import os
+import json
+import time
+import threading
+from .database import ROOT_DIR, update_book
+from . import tracing
+
+# --- PROGRESS JOURNAL ---
+# Page turns only update an in-memory dict. A writer thread appends the
+# latest position per book to an append-only journal every FLUSH_INTERVAL
+# and periodically folds it into the library store. A journal left behind
+# by an unclean exit is replayed on the next start.
+JOURNAL_FILE = os.path.join(ROOT_DIR, "progress.journal")
+FLUSH_INTERVAL = 1.0   # seconds; bounds how much progress a crash can lose
+COMPACT_EVERY = 200    # journal records appended before compacting
+
+class ProgressJournal:
+    def __init__(self, path=JOURNAL_FILE, flush_interval=FLUSH_INTERVAL, compact_every=COMPACT_EVERY):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.compact_every = compact_every
+        self._pending = {}  # book_id -> latest fields, coalesced between flushes
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._appended = 0
+        self._thread = None
+        self._stopping = False
+
+    def record(self, book_id, **fields):
+        # Never touches the disk; safe to call on every page turn
+        with self._cond:
+            self._pending[book_id] = fields
+            if self._thread is None:
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="progress-journal", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._stopping:
+                    self._cond.wait(self.flush_interval)
+                stopping = self._stopping
+            self.flush()
+            if self._appended >= self.compact_every:
+                self.compact()
+            if stopping:
+                return
+
+    def flush(self):
+        # The swap and the append happen under one _io_lock hold, so a
+        # compact() (e.g. from commit()) never runs while taken-but-unwritten
+        # progress exists only in this thread
+        with self._io_lock:
+            with self._cond:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
+
+            now = time.time()
+            lines = "".join(json.dumps({'book_id': book_id, 'ts': now, **fields}) + "\n"
+                            for book_id, fields in pending.items())
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            self._appended += len(pending)
+
+    def _read_latest(self):
+        latest = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn write from a crash
+                    book_id = entry.pop('book_id', None)
+                    entry.pop('ts', None)
+                    if book_id:
+                        latest[book_id] = entry
+        except OSError:
+            pass
+        return latest
+
+    def compact(self):
+        with self._io_lock:
+            latest = self._read_latest()
+            for book_id, fields in latest.items():
+                update_book(book_id, **fields)
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self._appended = 0
+        return len(latest)
+
+    def commit(self):
+        # Synchronous flush + compact, for when the library must be current
+        self.flush()
+        self.compact()
+
+    def replay(self):
+        # A journal on disk at startup means the last session did not exit cleanly
+        if os.path.exists(self.path):
+            count = self.compact()
+            if tracing.is_enabled():
+                print(f"DEBUG: Replayed progress for {count} book(s) from journal")
+
+    def close(self):
+        with self._cond:
+            thread = self._thread
+            self._thread = None
+            self._stopping = True
+            self._cond.notify_all()
+        if thread:
+            thread.join()
+        self.commit()
+
+progress_journal = ProgressJournal()
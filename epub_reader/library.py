@@ -1,15 +1,47 @@
 import json
 import os
-import shutil
 import tempfile
+import time
 from PyQt6.QtWidgets import (QMainWindow, QVBoxLayout, QWidget, QFileDialog, 
-                             QPushButton, QLabel, QMenu, QScrollArea, QHBoxLayout, 
-                             QFrame)
-from PyQt6.QtCore import Qt, pyqtSignal
-from ebooklib import epub
-from .database import load_library, save_library, STORAGE_DIR, delete_book_files
-from .reader import ReaderWindow
-from .ui_components import ThemeToggleButton, ImportButton
+                             QLabel, QHBoxLayout, QMenu)
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal
+from PyQt6.QtGui import QShortcut, QKeySequence
+from .database import (load_library, update_book, remove_book, get_book,
+                       get_setting, set_setting, delete_book_files)
+from .importer import run_import
+from .journal import progress_journal
+from .library_view import BookListModel, BookCardDelegate, BookListView
+from .thumbnails import ThumbnailService
+from .search_index import SearchIndexer, remove_book as remove_from_index
+from . import startup
+from .ui_components import ThemeToggleButton, ImportButton, SearchButton
+
+# --- STARTUP ---
+# The reader stack (QtWebEngine, the chapter pipeline) is imported on first
+# use. Once the library is up, it is imported and Chromium's processes are
+# started in the background so the first book opens without that cost.
+PREWARM_DELAY_MS = 300
+WARM_VIEW_RELEASE_MS = 5000
+
+class ImportWorker(QThread):
+    progress = pyqtSignal(int, int)
+    batch_imported = pyqtSignal(list)
+    import_finished = pyqtSignal(int, int, int)
+
+    def __init__(self, paths, parent=None):
+        super().__init__(parent)
+        self.paths = paths
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        imported, duplicates, failed = run_import(self.paths,
+                                                  on_progress=self.progress.emit,
+                                                  on_batch=self.batch_imported.emit,
+                                                  is_cancelled=lambda: self._cancelled)
+        self.import_finished.emit(imported, duplicates, failed)
 
 class LibraryWindow(QMainWindow):
     def __init__(self):
@@ -17,6 +49,7 @@ class LibraryWindow(QMainWindow):
         self.setWindowTitle("Dorky Reader")
         self.resize(800, 600)
         
+        progress_journal.replay()
         self.lib_data = load_library()
         self.is_dark = (self.lib_data.get('theme', 'light') == 'dark')
 
@@ -36,39 +69,89 @@ class LibraryWindow(QMainWindow):
         self.lbl_title.setStyleSheet("font-size: 24px; font-weight: bold;")
         
         self.btn_import = ImportButton(self.is_dark)
-        self.btn_import.clicked.connect(self.import_book)
+        self.btn_import.clicked.connect(self.show_import_menu)
+        self.import_worker = None
+
+        self.btn_search = SearchButton(self.is_dark)
+        self.btn_search.clicked.connect(self.show_search)
+        QShortcut(QKeySequence.StandardKey.Find, self, activated=self.show_search)
+
+        self.lbl_import = QLabel("")
+        self.lbl_import.setStyleSheet("color: #888; font-size: 13px;")
 
         self.btn_theme = ThemeToggleButton(self.is_dark, size=30)
         self.btn_theme.clicked.connect(self.toggle_theme)
 
         header_layout.addWidget(self.lbl_title)
         header_layout.addStretch()
+        header_layout.addWidget(self.lbl_import)
+        header_layout.addSpacing(15)
+        header_layout.addWidget(self.btn_search)
+        header_layout.addSpacing(15)
         header_layout.addWidget(self.btn_import)
         header_layout.addSpacing(15)
         header_layout.addWidget(self.btn_theme)
         
         self.main_layout.addWidget(self.top_bar)
 
-        # SCROLL AREA
-        self.scroll = QScrollArea()
-        self.scroll.setWidgetResizable(True)
-        self.scroll.setFrameShape(QFrame.Shape.NoFrame)
-        
-        self.scroll_content = QWidget()
-        self.books_layout = QVBoxLayout(self.scroll_content)
-        self.books_layout.setContentsMargins(30, 20, 30, 20)
-        self.books_layout.setSpacing(15)
-        self.books_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-        
-        self.scroll.setWidget(self.scroll_content)
-        self.main_layout.addWidget(self.scroll)
+        # BOOK LIST (only visible rows are painted)
+        self.book_model = BookListModel(self)
+        self.thumbnails = ThumbnailService(self)
+        self.thumbnails.thumbnail_ready.connect(self.book_model.refresh_row)
+        self.book_delegate = BookCardDelegate(self.is_dark, self, thumbnails=self.thumbnails)
+        self.book_list = BookListView(self.book_model, self.book_delegate)
+        self.book_list.book_clicked.connect(self.open_book)
+        self.book_list.delete_requested.connect(self.delete_book)
+        self.main_layout.addWidget(self.book_list)
+
+        self.lbl_empty = QLabel("No books yet. Click Import to start reading!")
+        self.lbl_empty.setAlignment(Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignTop)
+        self.lbl_empty.setStyleSheet("color: #888; font-size: 16px; margin-top: 50px;")
+        self.main_layout.addWidget(self.lbl_empty)
 
         self.apply_theme()
         self.refresh_list()
 
+        # Books imported before the index existed are picked up in the background
+        self.indexer = SearchIndexer()
+        self.indexer.index_missing(self.lib_data.get('books', {}))
+
+        self.reader = None
+        self._warm_view = None
+        QTimer.singleShot(PREWARM_DELAY_MS, self.prewarm_reader)
+
+    def prewarm_reader(self):
+        if self.reader is not None or self._warm_view is not None:
+            return
+        try:
+            from .reader import ReaderWindow  # noqa: F401 (pays the import cost now)
+            from .resources import resource_handler, reader_profile
+            from PyQt6.QtWebEngineWidgets import QWebEngineView
+            from PyQt6.QtWebEngineCore import QWebEnginePage
+        except ImportError as e:
+            print(f"DEBUG: Reader pre-warm skipped: {e}")
+            return
+        startup.mark("reader imported")
+
+        # A hidden page on the reader's profile brings up the browser, GPU
+        # and renderer processes; the reader's page reuses them.
+        resource_handler()
+        self._warm_view = QWebEngineView()
+        self._warm_view.setPage(QWebEnginePage(reader_profile(), self._warm_view))
+        self._warm_view.setAttribute(Qt.WidgetAttribute.WA_DontShowOnScreen, True)
+        self._warm_view.loadFinished.connect(lambda _: startup.mark("webengine warm"))
+        self._warm_view.show()
+        self._warm_view.setHtml("<html><body></body></html>")
+
+    def _release_warm_view(self):
+        if self._warm_view is not None:
+            self._warm_view.deleteLater()
+            self._warm_view = None
+
     def apply_theme(self):
         self.btn_theme.refresh_icon(self.is_dark)
         self.btn_import.refresh_style(self.is_dark)
+        self.btn_search.refresh_style(self.is_dark)
 
         if self.is_dark:
             bg_main = "#1e1e1e"
@@ -79,85 +162,129 @@ class LibraryWindow(QMainWindow):
 
         self.setStyleSheet(f"""
             QMainWindow, QWidget {{ background-color: {bg_main}; color: {text}; }}
-            QScrollArea {{ border: none; background-color: {bg_main}; }}
+            QListView {{ border: none; background-color: {bg_main}; }}
         """)
         
         self.top_bar.setStyleSheet(f"background-color: {bg_main}; border-bottom: 1px solid #333;" if self.is_dark 
                                    else f"background-color: {bg_main}; border-bottom: 1px solid #ddd;")
-        self.refresh_list()
+        # Cards are painted by the delegate, so a theme switch is just a repaint
+        self.book_delegate.set_dark(self.is_dark)
+        self.book_list.viewport().update()
 
     def toggle_theme(self):
         self.is_dark = not self.is_dark
-        self.lib_data = load_library()
-        self.lib_data['theme'] = 'dark' if self.is_dark else 'light'
-        save_library(self.lib_data)
+        set_setting('theme', 'dark' if self.is_dark else 'light')
         self.apply_theme()
 
     def refresh_list(self):
-        while self.books_layout.count():
-            child = self.books_layout.takeAt(0)
-            if child.widget(): child.widget().deleteLater()
-
         self.lib_data = load_library()
-        books = self.lib_data.get('books', {})
-        
-        if not books:
-            lbl = QLabel("No books yet. Click Import to start reading!")
-            lbl.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            lbl.setStyleSheet("color: #888; font-size: 16px; margin-top: 50px;")
-            self.books_layout.addWidget(lbl)
+        self.book_model.set_books(self.lib_data.get('books', {}))
+        self._update_empty_state()
+
+    def refresh_book(self, book_id):
+        book = get_book(book_id)
+        if book:
+            self.book_model.update_book(book_id, book)
+        else:
+            self.book_model.remove_book(book_id)
+        self._update_empty_state()
+
+    def _update_empty_state(self):
+        has_books = self.book_model.rowCount() > 0
+        self.book_list.setVisible(has_books)
+        self.lbl_empty.setVisible(not has_books)
+
+    def show_import_menu(self):
+        menu = QMenu(self)
+        files_action = menu.addAction("Import Books...")
+        folder_action = menu.addAction("Import Folder...")
+        action = menu.exec(self.btn_import.mapToGlobal(self.btn_import.rect().bottomLeft()))
+        if action == files_action:
+            fnames, _ = QFileDialog.getOpenFileNames(self, 'Import', filter="EPUB (*.epub)")
+            self.import_paths(fnames)
+        elif action == folder_action:
+            folder = QFileDialog.getExistingDirectory(self, 'Import Folder')
+            if folder:
+                self.import_paths([folder])
+
+    def import_paths(self, paths):
+        if not paths:
             return
+        if self.import_worker and self.import_worker.isRunning():
+            self.lbl_import.setText("Import already running")
+            return
+        # Copy + metadata run on a process pool; the GUI (and reader) stay responsive
+        self.import_worker = ImportWorker(paths, self)
+        self.import_worker.progress.connect(self.on_import_progress)
+        self.import_worker.batch_imported.connect(self.on_import_batch)
+        self.import_worker.import_finished.connect(self.on_import_finished)
+        self.lbl_import.setText("Importing...")
+        self.import_worker.start()
+
+    def on_import_progress(self, done, total):
+        self.lbl_import.setText(f"Importing {done} / {total}")
 
-        for b_id, data in books.items():
-            card = BookCard(b_id, data, self.is_dark)
-            card.clicked.connect(self.open_book)
-            card.delete_requested.connect(self.delete_book)
-            self.books_layout.addWidget(card)
-
-    def import_book(self):
-        fname, _ = QFileDialog.getOpenFileName(self, 'Import', filter="EPUB (*.epub)")
-        if fname:
-            filename = os.path.basename(fname)
-            dest = os.path.join(STORAGE_DIR, filename)
-            shutil.copyfile(fname, dest)
-            try:
-                book = epub.read_epub(dest)
-                title = book.get_metadata('DC', 'title')[0][0] if book.get_metadata('DC', 'title') else filename
-            except:
-                title = filename
-
-            self.lib_data = load_library()
-            self.lib_data.setdefault('books', {})[filename] = {
-                'title': title, 
-                'filename': filename, 
-                'last_chapter_index': 0, 
-                'last_page_index': 0,
-                'progress_percent': 0 
-            }
-            save_library(self.lib_data)
-            self.refresh_list()
+    def on_import_batch(self, books):
+        for book_id, data in books:
+            self.book_model.update_book(book_id, data)
+            self.indexer.enqueue(book_id, data['filename'])
+        self._update_empty_state()
+
+    def on_import_finished(self, imported, duplicates, failed):
+        text = f"Imported {imported} book(s)"
+        if duplicates:
+            text += f", {duplicates} already in library"
+        if failed:
+            text += f", {failed} failed"
+        self.lbl_import.setText(text)
+
+    def shutdown(self):
+        if self.import_worker and self.import_worker.isRunning():
+            self.import_worker.cancel()
+            self.import_worker.wait()
+        self.thumbnails.shutdown()
+        self.indexer.stop()
+        self._release_warm_view()
+        if self.reader is not None:
+            self.reader.unbind_book()
+            self.reader.shutdown()
 
     def delete_book(self, book_id):
-        self.lib_data = load_library()
-        if book_id in self.lib_data['books']:
-            filename = self.lib_data['books'][book_id]['filename']
-            delete_book_files(filename) 
-            del self.lib_data['books'][book_id]            
-            save_library(self.lib_data)
-            self.refresh_list()
-
-    def open_book(self, book_id):
-        books = self.lib_data.get('books', {})
-        if book_id in books:
+        book = get_book(book_id)
+        if book:
+            delete_book_files(book['filename']) 
+            remove_book(book_id)
+            remove_from_index(book_id)
+            self.thumbnails.forget(book_id)
+            self.refresh_book(book_id)
+
+    def show_search(self):
+        from .search_ui import SearchDialog
+        dialog = SearchDialog(self.book_model.books(), self.is_dark, self)
+        dialog.result_chosen.connect(lambda b_id, spine_idx, offset: self.open_book(b_id, (spine_idx, offset)))
+        dialog.exec()
+
+    def open_book(self, book_id, target=None):
+        # `target` is an optional (spine index, character offset) locator
+        book = get_book(book_id)
+        if book:
+            from .reader import ReaderWindow
+            startup.mark("book opened")
+            update_book(book_id, last_opened=time.time())
             self.hide()
-            self.reader = ReaderWindow(book_id, books[book_id], self.show_library, is_dark=self.is_dark)
+            if self.reader is None:
+                # Created once; later books are bound to the same window and view
+                self.reader = ReaderWindow(self.show_library)
+            self.reader.bind_book(book_id, book, is_dark=self.is_dark, target=target)
             self.reader.show()
+            # The reader's own page holds the processes from here on
+            QTimer.singleShot(WARM_VIEW_RELEASE_MS, self._release_warm_view)
 
     def show_library(self):
-        self.lib_data = load_library()
-        self.is_dark = (self.lib_data.get('theme', 'light') == 'dark')
+        self.is_dark = (get_setting('theme', 'light') == 'dark')
         self.apply_theme()
-        self.refresh_list()
+        # Only the book that was just read can have changed
+        self.refresh_book(self.reader.book_id)
         self.show()
 
     def save(self):
@@ -175,74 +302,3 @@ class LibraryWindow(QMainWindow):
                 try: os.remove(tmp)
                 except: pass
 
-
-class BookCard(QFrame):
-    clicked = pyqtSignal(str)
-    delete_requested = pyqtSignal(str)
-
-    def __init__(self, b_id, data, is_dark=False):
-        super().__init__()
-        self.b_id = b_id
-        self.data = data
-        self.setCursor(Qt.CursorShape.PointingHandCursor)
-        self.setFixedHeight(100)
-        self.update_style(is_dark)
-
-        layout = QHBoxLayout(self)
-        layout.setContentsMargins(20, 15, 20, 15)
-        
-        icon = QLabel("📖")
-        icon.setStyleSheet("font-size: 30px; background: transparent; border: none;")
-        layout.addWidget(icon)
-        layout.addSpacing(15)
-
-        info_layout = QVBoxLayout()
-        info_layout.setSpacing(5)
-        
-        title = QLabel(data['title'])
-        title.setStyleSheet("font-size: 16px; font-weight: bold; background: transparent; border: none;")
-        info_layout.addWidget(title)
-
-        # We now use the calculated percentage from the Reader if available.
-        # Fallback to chapter math only if it's a fresh book.
-        percent = data.get('progress_percent', 0)
-        
-        progress = QLabel(f"{percent}% Complete")
-        progress.setStyleSheet("font-size: 12px; color: #888; background: transparent; border: none;")
-        info_layout.addWidget(progress)
-        
-        layout.addLayout(info_layout)
-        layout.addStretch()
-        
-        self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
-        self.customContextMenuRequested.connect(self.show_context)
-
-    def update_style(self, is_dark):
-        if is_dark:
-            bg = "#2d2d2d"
-            border = "#3d3d3d"
-            text = "#fff"
-            hover = "#383838"
-        else:
-            bg = "#ffffff"
-            border = "#e0e0e0"
-            text = "#000"
-            hover = "#f9f9f9"
-
-        self.setStyleSheet(f"""
-            BookCard {{ background-color: {bg}; border: 1px solid {border}; border-radius: 8px; color: {text}; }}
-            BookCard:hover {{ background-color: {hover}; border-color: #bbb; }}
-            QLabel {{ color: {text}; }}
-        """)
-
-    def mousePressEvent(self, event):
-        if event.button() == Qt.MouseButton.LeftButton:
-            self.clicked.emit(self.b_id)
-        super().mousePressEvent(event)
-
-    def show_context(self, pos):
-        menu = QMenu()
-        delete_action = menu.addAction("Delete")
-        action = menu.exec(self.mapToGlobal(pos))
-        if action == delete_action:
-            self.delete_requested.emit(self.b_id)
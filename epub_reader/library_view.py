@@ -0,0 +1,214 @@
+from PyQt6.QtWidgets import QListView, QStyledItemDelegate, QStyle, QMenu, QAbstractItemView
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QRectF, pyqtSignal
+from PyQt6.QtGui import QColor, QFont, QPen
+
+# --- CARD LAYOUT ---
+CARD_HEIGHT = 100
+CARD_SPACING = 15
+CARD_MARGIN_H = 30
+CARD_PADDING = 20
+CARD_RADIUS = 8
+ICON_SIZE = 30
+THUMB_WIDTH = 48   # cover column; the emoji placeholder is centred in it
+
+class BookListModel(QAbstractListModel):
+    """
+    Flat list of library books. Rows are looked up by book id so a single
+    changed book only repaints its own row.
+    """
+    BookIdRole = Qt.ItemDataRole.UserRole + 1
+    BookDataRole = Qt.ItemDataRole.UserRole + 2
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._ids = []
+        self._books = {}
+        self._rows = {}
+
+    def set_books(self, books):
+        self.beginResetModel()
+        self._ids = list(books.keys())
+        self._books = dict(books)
+        self._rows = {b_id: row for row, b_id in enumerate(self._ids)}
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._ids)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._ids):
+            return None
+        b_id = self._ids[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._books[b_id].get('title', b_id)
+        if role == self.BookIdRole:
+            return b_id
+        if role == self.BookDataRole:
+            return self._books[b_id]
+        return None
+
+    def book_id(self, index):
+        return self.data(index, self.BookIdRole)
+
+    def books(self):
+        return self._books
+
+    def index_of(self, b_id):
+        row = self._rows.get(b_id)
+        return self.index(row) if row is not None else QModelIndex()
+
+    def update_book(self, b_id, data):
+        row = self._rows.get(b_id)
+        if row is None:
+            self.add_book(b_id, data)
+            return
+        self._books[b_id] = data
+        idx = self.index(row)
+        self.dataChanged.emit(idx, idx)
+
+    def add_book(self, b_id, data):
+        if b_id in self._rows:
+            self.update_book(b_id, data)
+            return
+        row = len(self._ids)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._ids.append(b_id)
+        self._books[b_id] = data
+        self._rows[b_id] = row
+        self.endInsertRows()
+
+    def refresh_row(self, b_id):
+        idx = self.index_of(b_id)
+        if idx.isValid():
+            self.dataChanged.emit(idx, idx)
+
+    def remove_book(self, b_id):
+        row = self._rows.get(b_id)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._ids[row]
+        del self._books[b_id]
+        self._rows = {bid: r for r, bid in enumerate(self._ids)}
+        self.endRemoveRows()
+
+
+class BookCardDelegate(QStyledItemDelegate):
+    """
+    Paints the card look of the old BookCard widget directly, so only
+    visible rows cost anything. Covers come from an optional
+    ThumbnailService; until one is ready the emoji placeholder is shown.
+    """
+    def __init__(self, is_dark=False, parent=None, thumbnails=None):
+        super().__init__(parent)
+        self.thumbnails = thumbnails
+        self.title_font = QFont()
+        self.title_font.setPixelSize(16)
+        self.title_font.setBold(True)
+        self.progress_font = QFont()
+        self.progress_font.setPixelSize(12)
+        self.icon_font = QFont()
+        self.icon_font.setPixelSize(ICON_SIZE)
+        self.set_dark(is_dark)
+
+    def set_dark(self, is_dark):
+        if is_dark:
+            self.bg = QColor("#2d2d2d")
+            self.border = QColor("#3d3d3d")
+            self.text = QColor("#fff")
+            self.hover = QColor("#383838")
+        else:
+            self.bg = QColor("#ffffff")
+            self.border = QColor("#e0e0e0")
+            self.text = QColor("#000")
+            self.hover = QColor("#f9f9f9")
+        self.hover_border = QColor("#bbb")
+        self.muted = QColor("#888")
+
+    def sizeHint(self, option, index):
+        # Width follows the viewport; only the height matters to the view
+        return QSize(0, CARD_HEIGHT + CARD_SPACING)
+
+    def paint(self, painter, option, index):
+        data = index.data(BookListModel.BookDataRole) or {}
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+
+        painter.save()
+        painter.setRenderHint(painter.RenderHint.Antialiasing)
+
+        card = QRectF(option.rect.adjusted(CARD_MARGIN_H, 0, -CARD_MARGIN_H, -CARD_SPACING))
+        card.adjust(0.5, 0.5, -0.5, -0.5)
+        painter.setPen(QPen(self.hover_border if hovered else self.border, 1))
+        painter.setBrush(self.hover if hovered else self.bg)
+        painter.drawRoundedRect(card, CARD_RADIUS, CARD_RADIUS)
+
+        content = card.adjusted(CARD_PADDING, 10, -CARD_PADDING, -10)
+        icon_rect = QRectF(content.left(), content.top(), THUMB_WIDTH, content.height())
+        painter.setPen(self.text)
+        pix = None
+        if self.thumbnails and data.get('filename'):
+            pix = self.thumbnails.pixmap(index.data(BookListModel.BookIdRole), data['filename'])
+        if pix is not None:
+            size = pix.size().scaled(icon_rect.size().toSize(), Qt.AspectRatioMode.KeepAspectRatio)
+            target = QRectF(0, 0, size.width(), size.height())
+            target.moveCenter(icon_rect.center())
+            painter.setRenderHint(painter.RenderHint.SmoothPixmapTransform)
+            painter.drawPixmap(target, pix, QRectF(pix.rect()))
+        else:
+            painter.setFont(self.icon_font)
+            painter.drawText(icon_rect, Qt.AlignmentFlag.AlignCenter, "📖")
+        content.adjust(0, 5, 0, -5)
+
+        text_left = icon_rect.right() + 15
+        text_width = content.right() - text_left
+        mid = content.center().y()
+
+        painter.setFont(self.title_font)
+        title = painter.fontMetrics().elidedText(data.get('title', ''), Qt.TextElideMode.ElideRight, int(text_width))
+        painter.drawText(QRectF(text_left, content.top(), text_width, mid - content.top() + 2),
+                         Qt.AlignmentFlag.AlignBottom | Qt.AlignmentFlag.AlignLeft, title)
+
+        painter.setFont(self.progress_font)
+        painter.setPen(self.muted)
+        percent = data.get('progress_percent', 0)
+        painter.drawText(QRectF(text_left, mid + 5, text_width, content.bottom() - mid - 5),
+                         Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft, f"{percent}% Complete")
+        painter.restore()
+
+
+class BookListView(QListView):
+    book_clicked = pyqtSignal(str)
+    delete_requested = pyqtSignal(str)
+
+    def __init__(self, model, delegate, parent=None):
+        super().__init__(parent)
+        self.setModel(model)
+        self.setItemDelegate(delegate)
+        self.setUniformItemSizes(True)
+        self.setMouseTracking(True)  # hover highlight
+        self.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.verticalScrollBar().setSingleStep(20)
+        self.setFrameShape(QListView.Shape.NoFrame)
+        self.setViewportMargins(0, 20, 0, 5)
+        self.viewport().setCursor(Qt.CursorShape.PointingHandCursor)
+
+        self.clicked.connect(self._on_clicked)
+        self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.customContextMenuRequested.connect(self.show_context)
+
+    def _on_clicked(self, index):
+        b_id = self.model().book_id(index)
+        if b_id:
+            self.book_clicked.emit(b_id)
+
+    def show_context(self, pos):
+        b_id = self.model().book_id(self.indexAt(pos))
+        if not b_id:
+            return
+        menu = QMenu()
+        delete_action = menu.addAction("Delete")
+        action = menu.exec(self.viewport().mapToGlobal(pos))
+        if action == delete_action:
+            self.delete_requested.emit(b_id)
@@ -0,0 +1,80 @@
+import os
+import posixpath
+import zipfile
+from urllib.parse import unquote
+import xml.etree.ElementTree as ET
+
+# --- OPF-ONLY METADATA ---
+# Reads container.xml and the package document straight from the zip, so
+# getting a title touches a few kilobytes instead of inflating every item.
+CONTAINER_PATH = "META-INF/container.xml"
+CONTAINER_NS = "{urn:oasis:names:tc:opendocument:xmlns:container}"
+OPF_NS = "{http://www.idpf.org/2007/opf}"
+DC_NS = "{http://purl.org/dc/elements/1.1/}"
+
+def find_opf_path(zf):
+    root = ET.fromstring(zf.read(CONTAINER_PATH))
+    rootfile = root.find(f".//{CONTAINER_NS}rootfile")
+    return rootfile.get('full-path')
+
+def read_package(zf):
+    """
+    Returns (opf_path, package root element) for an open EPUB zip.
+    """
+    opf_path = find_opf_path(zf)
+    return opf_path, ET.fromstring(zf.read(opf_path))
+
+def _texts(metadata, tag):
+    return [el.text.strip() for el in metadata.findall(f"{DC_NS}{tag}") if el.text and el.text.strip()]
+
+def _find_cover(package, manifest):
+    # EPUB 3: manifest item flagged as the cover image
+    for item in manifest:
+        if 'cover-image' in (item.get('properties') or '').split():
+            return item.get('href')
+
+    # EPUB 2: <meta name="cover" content="<manifest id>"/>
+    by_id = {item.get('id'): item for item in manifest}
+    for meta in package.iter(f"{OPF_NS}meta"):
+        if meta.get('name') == 'cover':
+            item = by_id.get(meta.get('content'))
+            if item is not None:
+                return item.get('href')
+
+    # Last resort: an image whose id or href says "cover"
+    for item in manifest:
+        if (item.get('media-type') or '').startswith('image/'):
+            if 'cover' in (item.get('id') or '').lower() or 'cover' in (item.get('href') or '').lower():
+                return item.get('href')
+    return None
+
+def read_metadata(path, default_title=None):
+    """
+    Returns title, authors, language, identifiers, cover (zip path or None)
+    and spine_length for the EPUB at `path`. Without a title in the OPF the
+    title is `default_title`, or the file's basename.
+    """
+    with zipfile.ZipFile(path) as zf:
+        opf_path, package = read_package(zf)
+
+    opf_dir = posixpath.dirname(opf_path)
+    metadata = package.find(f"{OPF_NS}metadata")
+    if metadata is None:
+        metadata = ET.Element("metadata")
+    manifest = package.findall(f"{OPF_NS}manifest/{OPF_NS}item")
+    spine = package.findall(f"{OPF_NS}spine/{OPF_NS}itemref")
+
+    titles = _texts(metadata, 'title')
+    languages = _texts(metadata, 'language')
+    cover = _find_cover(package, manifest)
+    if cover:
+        cover = posixpath.normpath(posixpath.join(opf_dir, unquote(cover)))
+
+    return {
+        'title': titles[0] if titles else (default_title or os.path.basename(path)),
+        'authors': _texts(metadata, 'creator'),
+        'language': languages[0] if languages else None,
+        'identifiers': _texts(metadata, 'identifier'),
+        'cover': cover,
+        'spine_length': len(spine),
+    }
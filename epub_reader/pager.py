@@ -0,0 +1,408 @@
+import json
+from PyQt6.QtCore import QObject, QFile, QIODevice, pyqtSignal, pyqtSlot
+from PyQt6.QtWebChannel import QWebChannel
+from PyQt6.QtWebEngineCore import QWebEngineScript
+
+# --- IN-PAGE PAGER ---
+# Pagination runs inside the page: keys and the wheel turn pages locally,
+# resizes re-measure locally, and the resulting state is pushed to Python
+# over a QWebChannel, coalesced to at most one message per REPORT_DELAY_MS.
+# Python only sends commands (show a page, an anchor) and never waits for
+# a reply, so input never queues behind a Python <-> JS round trip.
+PAGER_WORLD = QWebEngineScript.ScriptWorldId.ApplicationWorld  # isolated from book scripts
+BRIDGE_NAME = "pager"
+REPORT_DELAY_MS = 60
+RESIZE_DELAY_MS = 100
+WHEEL_STEP = 60  # accumulated wheel delta (CSS px) per page turn
+WINDOW_RADIUS = 1  # continuous mode keeps the previous, current and next spine items
+
+# Same text nodes as utils.extract_text: <script>/<style> contents are skipped
+TEXT_FILTER_JS = """{ acceptNode: function(n) {
+    var tag = n.parentNode && n.parentNode.nodeName;
+    return (tag === 'SCRIPT' || tag === 'STYLE') ? NodeFilter.FILTER_REJECT : NodeFilter.FILTER_ACCEPT;
+} }"""
+
+# Text offset of the first character on every page of a section (page
+# numbers relative to the section). With it any text offset (search hit,
+# element anchor) maps to a page in Python, without asking the page per hit.
+MEASURE_JS = """function measureStarts(sec) {
+    var elem = content(), range = document.createRange();
+    function pageAt(node, i) {
+        range.setStart(node, i); range.setEnd(node, i + 1);
+        var rects = range.getClientRects();
+        if (!rects.length || (rects[0].width === 0 && rects[0].height === 0)) return -1;
+        return Math.max(0, Math.floor((elem.scrollLeft + rects[0].left) / stride) - sec.first);
+    }
+    function firstPage(node, i) {
+        for (var j = i; j < node.nodeValue.length; j++) { var p = pageAt(node, j); if (p >= 0) return p; }
+        return -1;
+    }
+    function lastPage(node) {
+        for (var j = node.nodeValue.length - 1; j >= 0; j--) { var p = pageAt(node, j); if (p >= 0) return p; }
+        return -1;
+    }
+
+    var starts = [0];
+    var walker = document.createTreeWalker(sec.el, NodeFilter.SHOW_TEXT, TEXT_FILTER);
+    var offset = 0, node;
+    while ((node = walker.nextNode())) {
+        var len = node.nodeValue.length;
+        var last = len ? Math.min(lastPage(node), sec.pages - 1) : -1;
+        while (last >= starts.length) {
+            // First character of page `want` inside this node
+            var want = starts.length, lo = 0, hi = len - 1;
+            while (lo < hi) {
+                var mid = (lo + hi) >> 1, p = firstPage(node, mid);
+                if (p < 0 || p >= want) hi = mid; else lo = mid + 1;
+            }
+            starts.push(offset + lo);
+        }
+        offset += len;
+    }
+    while (starts.length < sec.pages) starts.push(offset);
+    sec.starts = starts;
+}"""
+
+# The page is a list of sections: in chapter mode the one #book-content
+# element, in continuous mode a <section> per spine item around the
+# current one. `page` is relative to the current section.
+PAGER_JS = """(function() {
+    if (window.pager) return;
+    var bridge = null, stride = 0, totalPages = 1;
+    var sections = [], current = null, page = 0;
+    var spineUrls = null, loading = {}, failed = {}, pendingTarget = null, pendingTurn = 0;
+    var layoutDirty = false, layoutMs = 0, arrived = false, reportTimer = null, leaving = false;
+    var wheelAcc = 0, wheelTimer = null, resizeTimer = null;
+
+    function content() { return document.getElementById('book-content'); }
+
+    MEASURE
+
+    // --- layout ---
+    function pageOf(left) {
+        return Math.floor((content().scrollLeft + left + 1) / stride);
+    }
+
+    function place() {
+        // Stride, plus first page and page count of every section
+        var elem = content();
+        var gap = parseFloat(window.getComputedStyle(elem).columnGap) || 0;
+        stride = window.innerWidth + gap; if (stride < 100) stride = window.innerWidth;
+        totalPages = Math.max(1, Math.ceil((elem.scrollWidth - 10) / stride));
+        sections.forEach(function(sec, i) {
+            sec.first = (sec.el === elem) ? 0 : pageOf(sec.el.getBoundingClientRect().left);
+        });
+        sections.forEach(function(sec, i) {
+            var next = i + 1 < sections.length ? sections[i + 1].first : totalPages;
+            sec.pages = Math.max(1, next - sec.first);
+        });
+    }
+
+    function relayout() {
+        // Keeps the first character of the current page in view
+        var offset = current && current.starts ? (current.starts[page] || 0) : 0;
+        var t0 = performance.now();
+        place();
+        sections.forEach(measureStarts);
+        layoutMs = performance.now() - t0;
+        layoutDirty = true;
+        if (current) showIn(current, pageForOffset(current, offset));
+    }
+
+    function pageForOffset(sec, offset) {
+        var lo = 0, hi = sec.starts.length - 1;
+        while (lo < hi) {
+            var mid = (lo + hi + 1) >> 1;
+            if (sec.starts[mid] <= offset) lo = mid; else hi = mid - 1;
+        }
+        // Pages without text share a start; prefer the first of them
+        while (lo > 0 && sec.starts[lo - 1] === sec.starts[lo]) lo--;
+        return lo;
+    }
+
+    function findId(sec, id) {
+        var el = document.getElementById(id);
+        if (el && sec.el.contains(el)) return el;
+        return sec.el.querySelector('[id="' + CSS.escape(id) + '"]');
+    }
+
+    function resolve(sec, target) {
+        if (target === 'end') return sec.pages - 1;
+        if (typeof target === 'string' && target.charAt(0) === '@') {
+            return pageForOffset(sec, parseInt(target.slice(1), 10) || 0);
+        }
+        if (typeof target === 'string' && target.charAt(0) === '#') {
+            var el = findId(sec, target.slice(1));
+            return el ? pageOf(el.getBoundingClientRect().left) - sec.first : 0;
+        }
+        return parseInt(target, 10) || 0;
+    }
+
+    // --- reporting ---
+    function flush() {
+        if (reportTimer) { clearTimeout(reportTimer); reportTimer = null; }
+        if (!bridge || !current) return;
+        var state = { page: page, offset: current.starts[page] || 0 };
+        if (spineUrls) state.spine = current.spine;
+        if (arrived) { state.arrived = true; arrived = false; }
+        if (layoutDirty) {
+            state.pages = current.pages; state.stride = stride;
+            state.starts = current.starts; state.layout_ms = layoutMs;
+            state.sections = sections.map(function(s) { return [s.spine, s.pages]; });
+            layoutDirty = false; layoutMs = 0;
+        }
+        bridge.report(JSON.stringify(state));
+    }
+
+    function schedule() {
+        if (!reportTimer) reportTimer = setTimeout(flush, REPORT_DELAY);
+    }
+
+    // --- navigation ---
+    function showIn(sec, p) {
+        if (sec !== current) layoutDirty = true;  // Python needs the new section's pages
+        current = sec;
+        page = Math.max(0, Math.min(p, sec.pages - 1));
+        content().scrollLeft = Math.round((sec.first + page) * stride);
+        schedule();
+        if (spineUrls) maintain();
+    }
+
+    function show(p) {
+        if (current) showIn(current, p);
+    }
+
+    function arrive(sec, target) {
+        arrived = true;
+        leaving = false;
+        showIn(sec, resolve(sec, target));
+    }
+
+    function turn(dir) {
+        if (!current || leaving) return;
+        var p = page + dir;
+        if (p >= 0 && p < current.pages) { showIn(current, p); return; }
+        var next = sections[sections.indexOf(current) + dir];
+        if (next) { showIn(next, dir > 0 ? 0 : next.pages - 1); return; }
+        if (spineUrls && spineUrls[current.spine + dir]) {
+            pendingTurn = dir;  // neighbour still loading; turn once it is in
+            maintain();
+            return;
+        }
+        // First or last page of the document: Python decides what is next
+        if (bridge) { leaving = true; flush(); bridge.turn_past_end(dir); }
+    }
+
+    // --- continuous window ---
+    function sectionFor(spine) {
+        for (var i = 0; i < sections.length; i++) if (sections[i].spine === spine) return sections[i];
+        return null;
+    }
+
+    function fetchSection(spine) {
+        if (loading[spine] || failed[spine] || !spineUrls[spine]) return;
+        loading[spine] = true;
+        fetch(spineUrls[spine]).then(function(r) {
+            if (!r.ok) throw new Error('HTTP ' + r.status);
+            return r.text();
+        }).then(function(html) {
+            delete loading[spine];
+            var centre = pendingTarget ? pendingTarget[0] : (current ? current.spine : -1);
+            if (Math.abs(spine - centre) <= WINDOW_RADIUS && !sectionFor(spine)) insertSection(spine, html);
+        }, function(err) {
+            // Never shown as an empty section: Python falls back to loading chapters
+            delete loading[spine];
+            failed[spine] = true;
+            if (bridge) bridge.fetch_failed(spine, String(err));
+        });
+    }
+
+    function insertSection(spine, html) {
+        var el = document.createElement('section');
+        el.className = 'book-section';
+        el.setAttribute('data-spine', spine);
+        el.innerHTML = html;
+        var after = null;
+        for (var i = 0; i < sections.length; i++) if (sections[i].spine > spine) { after = sections[i]; break; }
+        content().insertBefore(el, after ? after.el : null);
+        // Images still loading change the layout once they arrive
+        el.querySelectorAll('img').forEach(function(img) {
+            if (!img.complete) img.addEventListener('load', scheduleRelayout);
+        });
+        sections.splice(after ? sections.indexOf(after) : sections.length, 0, {spine: spine, el: el, starts: null});
+
+        var t0 = performance.now();
+        place();
+        sections.forEach(function(sec) { if (!sec.starts || sec.spine === spine) measureStarts(sec); });
+        layoutMs = performance.now() - t0;
+        layoutDirty = true;
+
+        if (pendingTarget && pendingTarget[0] === spine) {
+            var target = pendingTarget[1];
+            pendingTarget = null;
+            arrive(sectionFor(spine), target);
+        } else if (current) {
+            // Sections inserted before the current one move it to the right
+            showIn(current, page);
+            if (pendingTurn && sections[sections.indexOf(current) + pendingTurn]) {
+                var dir = pendingTurn;
+                pendingTurn = 0;
+                turn(dir);
+            }
+        }
+    }
+
+    function maintain() {
+        // Keeps spine items within WINDOW_RADIUS of the current one
+        if (!current) return;
+        var centre = current.spine, evicted = false;
+        for (var i = sections.length - 1; i >= 0; i--) {
+            if (Math.abs(sections[i].spine - centre) > WINDOW_RADIUS) {
+                sections[i].el.remove();
+                sections.splice(i, 1);
+                evicted = true;
+            }
+        }
+        if (evicted) {
+            place();
+            layoutDirty = true;
+            content().scrollLeft = Math.round((current.first + page) * stride);
+        }
+        for (var s = centre - WINDOW_RADIUS; s <= centre + WINDOW_RADIUS; s++) {
+            if (s >= 0 && s < spineUrls.length && !sectionFor(s)) fetchSection(s);
+        }
+    }
+
+    function goTo(spine, target) {
+        var sec = sectionFor(spine);
+        if (sec) { arrive(sec, target); return; }
+        // Outside the window: start a new one around `spine`
+        sections.forEach(function(s) { s.el.remove(); });
+        sections = [];
+        current = null;
+        pendingTurn = 0;
+        pendingTarget = [spine, target];
+        fetchSection(spine);
+    }
+
+    // --- input ---
+    function zoomed() { return document.getElementById('image-zoom'); }
+
+    window.addEventListener('keydown', function(e) {
+        if (e.ctrlKey && ['+', '-', '=', '0'].includes(e.key)) { e.preventDefault(); return; }
+        if (e.ctrlKey || e.altKey || e.metaKey) return;
+        var overlay = zoomed();
+        if (overlay) { if (e.key === 'Escape') overlay.remove(); return; }
+        if (e.key === 'ArrowRight' || e.key === 'l' || e.key === 'L') { e.preventDefault(); turn(1); }
+        else if (e.key === 'ArrowLeft' || e.key === 'j' || e.key === 'J') { e.preventDefault(); turn(-1); }
+    });
+
+    window.addEventListener('wheel', function(e) {
+        e.preventDefault();
+        if (e.ctrlKey || zoomed()) return;
+        // Trackpads send many small deltas; a mouse notch is one turn
+        wheelAcc += e.deltaMode ? e.deltaY * 40 : e.deltaY;
+        clearTimeout(wheelTimer);
+        wheelTimer = setTimeout(function() { wheelAcc = 0; }, 200);
+        if (Math.abs(wheelAcc) >= WHEEL_STEP) {
+            turn(wheelAcc > 0 ? 1 : -1);
+            wheelAcc = 0;
+        }
+    }, { passive: false });
+
+    function scheduleRelayout() {
+        if (!current) return;
+        clearTimeout(resizeTimer);
+        resizeTimer = setTimeout(relayout, RESIZE_DELAY);
+    }
+
+    window.addEventListener('resize', scheduleRelayout);
+
+    new QWebChannel(qt.webChannelTransport, function(channel) {
+        bridge = channel.objects.BRIDGE;
+        flush();
+    });
+
+    window.pager = {
+        // Chapter mode, once the document has loaded. `cached` is the
+        // geometry measured earlier at this size, or null to measure now.
+        init: function(cached, target) {
+            var sec = {spine: null, el: content(), first: 0, starts: null};
+            if (!sec.el) return;
+            sections = [sec];
+            if (cached) {
+                stride = cached.stride; totalPages = sec.pages = cached.pages;
+                sec.starts = cached.starts;
+                layoutDirty = true;
+            } else {
+                relayout();
+            }
+            arrive(sec, target);
+        },
+        // Continuous mode: `urls` holds the section URL of every spine item
+        initWindow: function(urls, spine, target) {
+            spineUrls = urls;
+            goTo(spine, target);
+        },
+        goTo: goTo,
+        show: show,
+        turn: turn,
+        stay: function() { leaving = false; },
+        showAnchor: function(id) {
+            if (current) showIn(current, resolve(current, '#' + id));
+        }
+    };
+})();"""
+PAGER_JS = (PAGER_JS.replace("MEASURE", MEASURE_JS.replace("TEXT_FILTER", TEXT_FILTER_JS))
+            .replace("REPORT_DELAY", str(REPORT_DELAY_MS)).replace("RESIZE_DELAY", str(RESIZE_DELAY_MS))
+            .replace("WHEEL_STEP", str(WHEEL_STEP)).replace("WINDOW_RADIUS", str(WINDOW_RADIUS))
+            .replace("BRIDGE", BRIDGE_NAME))
+
+def _webchannel_js():
+    f = QFile(":/qtwebchannel/qwebchannel.js")
+    if not f.open(QIODevice.OpenModeFlag.ReadOnly):
+        raise RuntimeError("qwebchannel.js is not available")
+    try:
+        return bytes(f.readAll()).decode('utf-8')
+    finally:
+        f.close()
+
+class PagerBridge(QObject):
+    """Python end of the channel; the page calls these slots."""
+    state_changed = pyqtSignal(dict)
+    turned_past_end = pyqtSignal(int)
+    section_failed = pyqtSignal(int, str)  # continuous mode: spine index, error
+
+    @pyqtSlot(str)
+    def report(self, payload):
+        try:
+            self.state_changed.emit(json.loads(payload))
+        except ValueError:
+            print(f"DEBUG: Bad pager report: {payload[:80]}")
+
+    @pyqtSlot(int)
+    def turn_past_end(self, direction):
+        self.turned_past_end.emit(direction)
+
+    @pyqtSlot(int, str)
+    def fetch_failed(self, spine_idx, error):
+        self.section_failed.emit(spine_idx, error)
+
+def install_pager(page, bridge):
+    """Injects the pager into every document `page` loads from now on."""
+    channel = QWebChannel(page)
+    channel.registerObject(BRIDGE_NAME, bridge)
+    page.setWebChannel(channel, PAGER_WORLD)
+
+    script = QWebEngineScript()
+    script.setName("dorky-pager")
+    script.setSourceCode(_webchannel_js() + "\n" + PAGER_JS)
+    script.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentReady)
+    script.setWorldId(PAGER_WORLD)
+    script.setRunsOnSubFrames(False)
+    page.scripts().insert(script)
+    return channel
+
+def pager_call(page, command):
+    """Runs `window.pager.<command>` without waiting for a result."""
+    page.runJavaScript(f"window.pager && window.pager.{command};", PAGER_WORLD)
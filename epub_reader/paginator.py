@@ -0,0 +1,165 @@
+import os
+from PyQt6.QtCore import QObject, QUrl, QSize, QTimer, Qt, pyqtSignal
+from PyQt6.QtWebEngineWidgets import QWebEngineView
+from PyQt6.QtWebEngineCore import QWebEnginePage
+from .book_cache import read_json, write_json
+from .disk_cache import PAGES_DIR
+from .resources import chapter_view_url, reader_profile
+from .utils import THEME_VERSION, TRANSFORM_VERSION
+
+# --- BACKGROUND PAGINATION ---
+# Every spine item is laid out once in a hidden view of the reader's size,
+# so the reader knows the page count of chapters it has not shown yet.
+# Counts are stored per book and layout, and survive restarts.
+PAGES_VERSION = 1
+MAX_LAYOUTS = 4  # window sizes remembered per book
+# A size has to hold this long before the whole book is laid out at it, so
+# the find bar or a briefly toggled TOC do not restart pagination. Going
+# back to a size reuses its remembered counts.
+SETTLE_DELAY_MS = 2000
+
+# Same page arithmetic as the reader's geometry pass
+PAGE_COUNT_JS = """(function() {
+    var elem = document.getElementById('book-content');
+    if (!elem) return 1;
+    var winW = window.innerWidth;
+    var gap = parseFloat(window.getComputedStyle(elem).columnGap) || 0;
+    var stride = winW + gap; if (stride < 100) stride = winW;
+    return Math.max(1, Math.ceil((elem.scrollWidth - 10) / stride));
+})();"""
+
+if not os.path.exists(PAGES_DIR):
+    os.makedirs(PAGES_DIR)
+
+def layout_key(size):
+    # Viewport plus everything that changes typography
+    return f"{size.width()}x{size.height()}-{THEME_VERSION}-{TRANSFORM_VERSION}"
+
+class Paginator(QObject):
+    """
+    Counts pages of every spine item for a given viewport size, one chapter
+    at a time in an offscreen view. `counts_changed` fires as counts arrive.
+    """
+    counts_changed = pyqtSignal()
+
+    def __init__(self, structure, book_key, parent=None):
+        super().__init__(parent)
+        self.structure = structure
+        self.book_key = book_key
+        self.path = os.path.join(PAGES_DIR, f"{structure['hash']}.json")
+        cached = read_json(self.path)
+        self._layouts = cached['layouts'] if cached and cached.get('version') == PAGES_VERSION else {}
+        self._view = None
+        self._key = None
+        self._queue = []
+        self._current = None
+        self._dirty = False
+        self._settled_size = None
+        self._settle_timer = QTimer(self)
+        self._settle_timer.setSingleShot(True)
+        self._settle_timer.setInterval(SETTLE_DELAY_MS)
+        self._settle_timer.timeout.connect(lambda: self._begin(self._settled_size))
+
+    def counts(self, size):
+        return self._layouts.get(layout_key(size), {})
+
+    def is_complete(self, size):
+        counts = self.counts(size)
+        return all(item_id in counts for item_id in self.structure['spine'])
+
+    def global_position(self, size, spine_idx, page_idx):
+        """
+        (global page index, total pages) or None while the book is not fully
+        paginated for this size.
+        """
+        counts = self.counts(size)
+        spine = self.structure['spine']
+        if not all(item_id in counts for item_id in spine):
+            return None
+        before = sum(counts[item_id] for item_id in spine[:spine_idx])
+        return before + page_idx, sum(counts[item_id] for item_id in spine)
+
+    def record(self, size, item_id, pages):
+        # Counts measured by the visible reader are as good as our own
+        key = layout_key(size)
+        counts = self._layouts.setdefault(key, {})
+        if counts.get(item_id) != pages:
+            counts[item_id] = pages
+            self._dirty = True
+            self.counts_changed.emit()
+
+    def start(self, size):
+        if layout_key(size) == self._key and self._current is not None:
+            self._settle_timer.stop()
+            return  # already paginating this layout
+        self._settled_size = QSize(size)
+        self._settle_timer.start()
+
+    def _begin(self, size):
+        key = layout_key(size)
+
+        self._layouts[key] = self._layouts.pop(key, {})  # most recently used last
+        while len(self._layouts) > MAX_LAYOUTS:
+            self._layouts.pop(next(iter(self._layouts)))
+
+        counts = self._layouts[key]
+        self._key = key
+        self._queue = [item_id for item_id in self.structure['spine'] if item_id not in counts]
+        if not self._queue:
+            self._current = None
+            self.save()
+            return
+
+        if self._view is None:
+            self._view = QWebEngineView()
+            self._view.setPage(QWebEnginePage(reader_profile(), self._view))
+            self._view.setAttribute(Qt.WidgetAttribute.WA_DontShowOnScreen, True)
+            self._view.loadFinished.connect(self._on_loaded)
+            self._view.show()
+        self._view.resize(size)
+        self._load_next()
+
+    def _load_next(self):
+        if not self._queue:
+            self._current = None
+            self.save()
+            return
+        self._current = self._queue.pop(0)
+        href = self.structure['items'][self._current]['href']
+        self._view.load(QUrl(chapter_view_url(self.book_key, href, False)))
+
+    def _on_loaded(self, ok):
+        item_id, key = self._current, self._key
+        if item_id is None:
+            return
+        if not ok:
+            self._load_next()
+            return
+        self._view.page().runJavaScript(PAGE_COUNT_JS, lambda result: self._on_counted(key, item_id, result))
+
+    def _on_counted(self, key, item_id, result):
+        if key != self._key or item_id != self._current:
+            return  # layout changed while this chapter was loading
+        try:
+            pages = max(1, int(result))
+        except (TypeError, ValueError):
+            pages = 1
+        self._layouts.setdefault(key, {})[item_id] = pages
+        self._dirty = True
+        self.counts_changed.emit()
+        self._load_next()
+
+    def save(self):
+        if self._dirty:
+            write_json(self.path, {'version': PAGES_VERSION, 'layouts': self._layouts})
+            self._dirty = False
+
+    def stop(self):
+        self._settle_timer.stop()
+        self._queue = []
+        self._current = None
+        if self._view is not None:
+            self._view.stop()
+            self._view.deleteLater()
+            self._view = None
+        self.save()
@@ -0,0 +1,56 @@
+from concurrent.futures import ThreadPoolExecutor
+
+# --- PREFETCH CONFIGURATION ---
+PREFETCH_RADIUS = 2    # spine items prepared on each side of the current one
+PREFETCH_WORKERS = 2
+
+class ChapterPrefetcher:
+    """
+    Prepares chapters on a worker pool so crossing a chapter boundary only
+    costs the WebEngine render. Jobs are grouped (e.g. 'around', 'hover') and
+    scheduling a group cancels that group's jobs that are no longer wanted.
+    `prepare_cb(item_id, context)` gets the context the job was scheduled
+    with, so a running job never sees state that changed after scheduling.
+    """
+    def __init__(self, prepare_cb, workers=PREFETCH_WORKERS):
+        self.prepare_cb = prepare_cb
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._jobs = {}  # group -> {item_id: future}
+
+    def schedule(self, item_ids, group='around', context=None):
+        jobs = self._jobs.setdefault(group, {})
+        wanted = set(item_ids)
+
+        for item_id, future in list(jobs.items()):
+            if future.done() or item_id not in wanted:
+                future.cancel()  # no-op for jobs that already started
+                del jobs[item_id]
+
+        for item_id in item_ids:
+            if item_id not in jobs:
+                jobs[item_id] = self._pool.submit(self._run, item_id, context)
+
+    def schedule_around(self, spine_order, index, radius=PREFETCH_RADIUS, context=None):
+        # Nearest chapters first, forward before backward
+        item_ids = []
+        for dist in range(1, radius + 1):
+            for idx in (index + dist, index - dist):
+                if 0 <= idx < len(spine_order):
+                    item_ids.append(spine_order[idx])
+        self.schedule(item_ids, 'around', context)
+
+    def _run(self, item_id, context):
+        try:
+            self.prepare_cb(item_id, context)
+        except Exception as e:
+            print(f"DEBUG: Prefetch of '{item_id}' failed: {e}")
+
+    def cancel_all(self):
+        for jobs in self._jobs.values():
+            for future in jobs.values():
+                future.cancel()
+        self._jobs.clear()
+
+    def shutdown(self):
+        self.cancel_all()
+        self._pool.shutdown(wait=True)
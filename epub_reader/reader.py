@@ -1,38 +1,184 @@
 import os
-import shutil
-import tempfile
+import re
+import json
+import html as html_lib
+from urllib.parse import unquote
+from bisect import bisect_left, bisect_right
 from PyQt6.QtWidgets import (QMainWindow, QApplication, QListWidgetItem)
-from PyQt6.QtCore import Qt, QUrl, QTimer, QEvent
-from PyQt6.QtGui import QCursor
-from ebooklib import epub
-from .database import load_library, save_library, STORAGE_DIR
-from .utils import extract_images_and_fix_html, prepare_chapter_html
+from PyQt6.QtCore import Qt, QUrl, QTimer, QEvent, QSize, pyqtSignal
+from PyQt6.QtGui import QCursor, QShortcut, QKeySequence
+from .database import set_setting, CACHE_DIR
+from .storage import resolve_path
+from .journal import progress_journal
+from .book_cache import LazyBook
+from .book_text import BookText
+from .resources import (resource_handler, book_key, book_url,
+                        chapter_view_url, theme_url, fetch_supported)
+from .images import fit_box
+from .chapter_cache import chapter_cache, chapter_key
+from .prefetch import ChapterPrefetcher
+from .paginator import Paginator
+from .pager import PagerBridge, install_pager, pager_call, TEXT_FILTER_JS
+from .utils import (prepare_chapter_html, chapter_body, THEME_STYLESHEET, THEME_VERSION,
+                    TRANSFORM_VERSION)
 from .reader_ui import ReaderUI
+from .trace_overlay import TraceOverlay
+from . import startup, tracing
+
+# --- READER CONFIGURATION ---
+# "url": chapters are served from the epub:// scheme with a shared, cacheable
+#        theme stylesheet (no size ceiling).
+# "html": chapters are pushed through setHtml with the theme CSS inlined.
+CHAPTER_LOAD_MODE = "url"
+# "continuous": the previous, current and next spine items are sections of
+#               one live document, so crossing a chapter is an ordinary page
+#               turn (needs the "url" load mode and Qt 6.6+; falls back to
+#               "chapter" otherwise, or when a section fails to load).
+# "chapter": one document per spine item, reloaded at chapter boundaries.
+READING_MODE = "continuous"
+FIND_DELAY_MS = 250
+BLANK_URL = "about:blank"  # shown by the pooled view between books
+TRACE_DIR = os.path.join(CACHE_DIR, "traces")
+PROFILE_DIR = os.path.join(CACHE_DIR, "profiles")
+
+# Wraps every [start, end) text range of the chapter under `selector` in
+# <mark> in one pass (marks elsewhere in the document are removed).
+HIGHLIGHT_JS = """(function(selector, ranges, current) {
+    var root = document.querySelector(selector);
+    var old = document.querySelectorAll('mark.search-hit'), parents = new Set();
+    for (var i = 0; i < old.length; i++) {
+        var m = old[i], parent = m.parentNode;
+        while (m.firstChild) parent.insertBefore(m.firstChild, m);
+        parent.removeChild(m);
+        parents.add(parent);
+    }
+    parents.forEach(function(p) { p.normalize(); });
+    if (!root) return 0;
+
+    var walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT, TEXT_FILTER);
+    var segments = [], offset = 0, r = 0, node;
+    while (r < ranges.length && (node = walker.nextNode())) {
+        var end = offset + node.nodeValue.length;
+        while (r < ranges.length && ranges[r][0] < end) {
+            var s = Math.max(ranges[r][0], offset) - offset, e = Math.min(ranges[r][1], end) - offset;
+            if (e > s) segments.push([node, s, e, r]);
+            if (ranges[r][1] > end) break;
+            r++;
+        }
+        offset = end;
+    }
+    // Back to front, so splitting a text node keeps earlier offsets valid
+    for (var i = segments.length - 1; i >= 0; i--) {
+        var seg = segments[i], range = document.createRange();
+        range.setStart(seg[0], seg[1]); range.setEnd(seg[0], seg[2]);
+        var mark = document.createElement('mark');
+        mark.className = seg[3] === current ? 'search-hit current' : 'search-hit';
+        mark.setAttribute('data-hit', seg[3]);
+        range.surroundContents(mark);
+    }
+    return segments.length;
+})"""
+
+# Double-click an image to see the original (not the viewport-sized
+# derivative); click to toggle natural size, panned with the mouse.
+IMAGE_ZOOM_JS = """(function() {
+    if (window.__imageZoom) return;
+    window.__imageZoom = true;
+    document.addEventListener('dblclick', function(e) {
+        var img = e.target;
+        if (img.tagName !== 'IMG' || !img.getAttribute('data-original')) return;
+        var overlay = document.createElement('div');
+        overlay.id = 'image-zoom';
+        var full = document.createElement('img');
+        full.src = img.getAttribute('data-original');
+        overlay.appendChild(full);
+        overlay.addEventListener('click', function() {
+            if (overlay.classList.contains('natural')) overlay.remove();
+            else overlay.classList.add('natural');
+        });
+        overlay.addEventListener('mousemove', function(ev) {
+            overlay.scrollLeft = (ev.clientX / window.innerWidth) * (overlay.scrollWidth - overlay.clientWidth);
+            overlay.scrollTop = (ev.clientY / window.innerHeight) * (overlay.scrollHeight - overlay.clientHeight);
+        });
+        document.body.appendChild(overlay);
+    });
+})();"""
+
+# Book images of a prepared chapter (see utils._ChapterTransformer)
+ORIGINAL_IMAGE_RE = re.compile(r'data-original="[a-z]+://[^/"]+/([^"]+)"')
+
+HIGHLIGHT_JS = HIGHLIGHT_JS.replace("TEXT_FILTER", TEXT_FILTER_JS)
 
 class ReaderWindow(QMainWindow):
-    def __init__(self, book_id, book_data, on_close_callback, is_dark=False):
+    """
+    One reader window (and its web view, page and renderer process) is kept
+    for the session: bind_book() shows a book in it, and going back to the
+    library unbinds the book instead of destroying the window.
+    """
+    text_ready = pyqtSignal(object)  # BookText whose chapters were extracted (from a worker thread)
+
+    def __init__(self, on_close_callback):
         super().__init__()
-        self.book_id = book_id
-        self.book_data = book_data
         self.on_close_callback = on_close_callback
-        self.is_dark = is_dark
+        self.book_id = None
+        self.book_data = {}
+        self.is_dark = False
         self.is_returning_to_library = False
         self.is_ready_to_save = False
+        self.open_target = None
+        self._shut_down = False  # quitting from here, then the library, both call shutdown()
         
         self.setMinimumSize(1200, 900) 
-        self.setWindowTitle(f"Reading: {book_data.get('title', 'Book')}")
         
         self.ui = ReaderUI(self)
         
         self.ui.web_view.loadFinished.connect(self.on_chapter_loaded)
+        # Page turns, wheel and resize are handled by the in-page pager,
+        # which reports its state back through this bridge
+        self.pager_bridge = PagerBridge(self)
+        self.pager_bridge.state_changed.connect(self.on_pager_state)
+        self.pager_bridge.turned_past_end.connect(self.on_turned_past_end)
+        self.pager_bridge.section_failed.connect(self.on_section_failed)
+        self.pager_channel = install_pager(self.ui.web_view.page(), self.pager_bridge)
         self.ui.toc_list.itemClicked.connect(self.on_toc_chapter_clicked)
+        self.ui.toc_list.itemEntered.connect(self.on_toc_item_hovered)
+        self.ui.find_input.textChanged.connect(lambda _: self.find_timer.start())
+        self.ui.find_input.returnPressed.connect(self.on_find_return)
+        self.text_ready.connect(self.on_text_ready)
+        QShortcut(QKeySequence.StandardKey.Find, self, activated=self.open_find_bar)
+        QShortcut(QKeySequence(Qt.Key.Key_Escape), self, activated=self.close_find_bar)
+
+        # Performance overlay, profile capture and trace export
+        self.overlay = TraceOverlay(self.ui.content_container)
+        QShortcut(QKeySequence("Ctrl+Shift+T"), self, activated=self.overlay.toggle)
+        QShortcut(QKeySequence("Ctrl+Shift+P"), self, activated=self.toggle_profile)
+        QShortcut(QKeySequence("Ctrl+Shift+E"), self, activated=self.export_trace)
         
         QApplication.instance().installEventFilter(self)
         self.ui.web_view.installEventFilter(self)
 
-        self._apply_theme_logic()
+        self.find_timer = QTimer()
+        self.find_timer.setSingleShot(True)
+        self.find_timer.setInterval(FIND_DELAY_MS)
+        self.find_timer.timeout.connect(self.run_book_search)
+        
+        self.resize_timer = QTimer()
+        self.resize_timer.setSingleShot(True)
+        self.resize_timer.setInterval(150)
+        self.resize_timer.timeout.connect(self.handle_resize_finished)
 
-        self.book = None
+        self.prefetcher = ChapterPrefetcher(self.prefetch_item)
+        self._reset_book_state()
+
+    def _reset_book_state(self):
+        self.book = None  # LazyBook: structure in memory, items read on demand
+        self.archive = None
+        self.structure = None
+        self.book_key = None
+        self.image_fit = None  # derivative box for chapter images, see images.fit_box
+        self.book_text = None
+        self.paginator = None
+        self.current_item_id = None
         self.spine_order = [] 
         self.spine_map = {} 
         self.all_html_map = {} 
@@ -41,17 +187,67 @@ class ReaderWindow(QMainWindow):
         self.total_pages_in_chapter = 1
         self.scroll_stride = 0     
         self._pending_target_page = 0 
-        
-        self.resize_timer = QTimer()
-        self.resize_timer.setSingleShot(True)
-        self.resize_timer.setInterval(150)
-        self.resize_timer.timeout.connect(self.handle_resize_finished)
+        self._pager_ready = False  # the loaded document has reported its layout
+        self._window_state = None  # continuous document: None, 'loading' or 'ready'
+        self._window_failed = False  # a section failed to load: chapter by chapter from now on
+        self._open_trace = None  # chapter request -> first page shown
+        self._load_trace = None  # navigation -> loadFinished
+        self._show_trace = None  # show command -> pager report
+
+        # Per-chapter page geometry keyed by (item_id, view width, view height)
+        self.page_geometry = {}
+        self.page_starts = [0]
+
+        # In-book search state
+        self.search_query = ""
+        self.search_hits = []  # (spine_idx, start, length) in reading order
+        self.hit_idx = -1
+        self._text_pending = False
+        self._highlighted = None  # (item_id, query) currently marked in the page
+
+    def bind_book(self, book_id, book_data, is_dark=False, target=None):
+        # `target` is an optional (spine index, character offset) locator
+        if self.book is not None:
+            self.unbind_book()
+        self.book_id = book_id
+        self.book_data = book_data
+        self.is_dark = is_dark
+        self.is_returning_to_library = False
+        self.is_ready_to_save = False
+        self.open_target = target
+        self.setWindowTitle(f"Reading: {book_data.get('title', 'Book')}")
+
+        # The find bar and its query belong to the previous book
+        self.ui.find_input.blockSignals(True)
+        self.ui.find_input.clear()
+        self.ui.find_input.blockSignals(False)
+        self.ui.find_bar.hide()
+        self.ui.lbl_find.setText("")
+        self._apply_theme_logic()
 
-        self.temp_dir = os.path.join(tempfile.gettempdir(), "epub_reader", book_id)
         fname = book_data.get('filename', book_id)
-        full_path = os.path.join(STORAGE_DIR, fname)
-        
-        self.load_book(full_path)
+        self.load_book(resolve_path(fname))
+
+    def unbind_book(self):
+        # Releases everything tied to the current book; the window, view
+        # and page stay alive for the next bind_book()
+        if self.book is None:
+            return
+        self.save_progress()
+        self.find_timer.stop()
+        self.prefetcher.cancel_all()
+        if self.paginator:
+            self.paginator.stop()
+            self.paginator.deleteLater()
+        resource_handler().unregister_book(self.book_key)
+        if tracing.is_enabled():
+            print(f"DEBUG: Archive read cache {self.archive.stats()}")
+        self.book.close()
+        # Drops the book's document; the renderer process is kept
+        self.ui.web_view.stop()
+        self.ui.web_view.load(QUrl(BLANK_URL))
+        self.ui.toc_list.clear()
+        self._reset_book_state()
 
     def toggle_toc_panel(self):
         if self.ui.side_panel.isVisible():
@@ -61,7 +257,15 @@ class ReaderWindow(QMainWindow):
         self.resize_timer.start()
 
     def handle_resize_finished(self):
-        self.calculate_layout_geometry()
+        # Chapters prepared from now on ask for images at the new size; the
+        # one on screen keeps its derivatives (the CSS still scales them).
+        # The pager re-measures the page on its own resize event.
+        self._update_image_fit()
+
+    def _update_image_fit(self):
+        # Before the window is shown its own (minimum) size bounds the view
+        view = self.ui.web_view if self.isVisible() else self
+        self.image_fit = fit_box(view.width(), view.height(), self.devicePixelRatioF())
 
     def handle_internal_link(self, qurl):
         path = qurl.path() 
@@ -73,16 +277,16 @@ class ReaderWindow(QMainWindow):
         if filename in self.spine_map:
             new_idx = self.spine_map[filename]
             
-            if new_idx != self.chapter_idx:
+            if new_idx != self._current_spine_idx():
                 self.chapter_idx = new_idx
                 target = f"#{anchor}" if anchor else 0
                 self.load_chapter_content(target_page=target)
             elif anchor:
-                self.scroll_to_anchor(anchor)
+                self.go_to_anchor(anchor)
 
         elif filename in self.all_html_map:
             item_id = self.all_html_map[filename]
-            self.load_custom_item(item_id, anchor)
+            self.load_custom_item(item_id, f"#{anchor}" if anchor else 0)
             
         else:
             print(f"DEBUG: Filename '{filename}' NOT found in spine or item maps.")
@@ -97,33 +301,35 @@ class ReaderWindow(QMainWindow):
 
     def toggle_theme(self):
         self.is_dark = not self.is_dark
-        lib = load_library()
-        lib['theme'] = 'dark' if self.is_dark else 'light'
-        save_library(lib)
+        set_setting('theme', 'dark' if self.is_dark else 'light')
         self._apply_theme_logic()
 
     def load_book(self, path):
         try:
-            self.book = epub.read_epub(path)
-            self.spine_order = [x[0] for x in self.book.spine]
-            
-            self.spine_map = {}
-            for idx, item_id in enumerate(self.spine_order):
-                item = self.book.get_item_with_id(item_id)
-                if item:
-                    fname = os.path.basename(item.file_name)
-                    self.spine_map[fname] = idx
-
-            self.all_html_map = {}
-            for item in self.book.get_items():
-                if item.get_type() == 9:
-                    fname = os.path.basename(item.file_name)
-                    self.all_html_map[fname] = item.get_id()
+            # Spine, href maps and TOC come from the structure cache, so a
+            # reopened book only inflates the chapters it actually shows.
+            self.book = LazyBook(path)
+            self.structure = self.book.structure
+            self.archive = self.book.archive
+            self.book_key = book_key(self.structure)
+            self._update_image_fit()
+            handler = resource_handler()
+            handler.set_theme(THEME_STYLESHEET)
+            handler.register_book(self.book_key, self.archive, self.structure, self.serve_chapter)
+            self.spine_order = self.book.spine
+            self.spine_map = self.book.spine_map
+            self.all_html_map = self.book.html_map
+            self.book_text = BookText(self.structure, self.archive)
+            self.paginator = Paginator(self.structure, self.book_key, self)
+            self.paginator.counts_changed.connect(self.update_page_label)
 
             self.chapter_idx = self.book_data.get('last_chapter_index', 0)
             saved_page = self.book_data.get('last_page_index', 0)
+            if self.open_target:
+                # Opened from a search hit: (spine index, char offset)
+                self.chapter_idx = self.open_target[0]
+                saved_page = f"@{self.open_target[1]}"
             
-            extract_images_and_fix_html(self.book, self.temp_dir)
             self.populate_toc() 
             self.load_chapter_content(target_page=saved_page)
             
@@ -133,16 +339,7 @@ class ReaderWindow(QMainWindow):
     def populate_toc(self):
         self.ui.toc_list.clear()
         
-        def flatten_toc(toc_list):
-            items = []
-            for item in toc_list:
-                if isinstance(item, (list, tuple)):
-                    items.extend(flatten_toc(item))
-                elif hasattr(item, 'href') and hasattr(item, 'title'):
-                    items.append(item)
-            return items
-
-        flat_toc = flatten_toc(self.book.toc)
+        flat_toc = self.book.toc
 
         if not flat_toc:
             for i in range(len(self.spine_order)):
@@ -150,13 +347,13 @@ class ReaderWindow(QMainWindow):
                 self.ui.toc_list.item(i).setData(Qt.ItemDataRole.UserRole, i)
             return
 
-        for link in flat_toc:
-            href_clean = link.href.split('#')[0]
+        for title, href in flat_toc:
+            href_clean = href.split('#')[0]
             fname = os.path.basename(href_clean)
             
             if fname in self.spine_map:
                 spine_idx = self.spine_map[fname]
-                list_item = QListWidgetItem(link.title)
+                list_item = QListWidgetItem(title)
                 list_item.setData(Qt.ItemDataRole.UserRole, spine_idx)
                 self.ui.toc_list.addItem(list_item)
 
@@ -169,174 +366,501 @@ class ReaderWindow(QMainWindow):
             self.chapter_idx = target_idx
             self.load_chapter_content(target_page=0)
 
-    def load_chapter_content(self, target_page=0):
-        if not self.spine_order: return
-        self.chapter_idx = max(0, min(self.chapter_idx, len(self.spine_order) - 1))
-        
+    def on_toc_item_hovered(self, item):
+        target_idx = item.data(Qt.ItemDataRole.UserRole)
+        if target_idx is not None and 0 <= target_idx < len(self.spine_order):
+            self.prefetcher.schedule([self.spine_order[target_idx]], 'hover', self._snapshot())
+
+    def _select_toc_row(self):
         for i in range(self.ui.toc_list.count()):
             if self.ui.toc_list.item(i).data(Qt.ItemDataRole.UserRole) == self.chapter_idx:
                 self.ui.toc_list.setCurrentRow(i)
                 break
 
+    def load_chapter_content(self, target_page=0):
+        if not self.spine_order: return
+        self.chapter_idx = max(0, min(self.chapter_idx, len(self.spine_order) - 1))
+        self._select_toc_row()
+
+        # Neighbours of the old position are stale now; they are
+        # rescheduled around the new chapter once it has loaded.
+        self.prefetcher.schedule([], 'around')
+
         item_id = self.spine_order[self.chapter_idx]
-        self.load_custom_item(item_id, target_page)
+        self._open_trace = tracing.begin("reader.chapter_open", spine=self.chapter_idx)
+        if self._continuous():
+            self.show_in_window(target_page)
+        else:
+            self.load_custom_item(item_id, target_page)
+
+    def _continuous(self):
+        return (READING_MODE == "continuous" and CHAPTER_LOAD_MODE == "url"
+                and fetch_supported() and not self._window_failed)
+
+    def show_in_window(self, target_page=0):
+        # Continuous mode: chapter_idx becomes the current section of the
+        # live document, which fetches it (and its neighbours) if needed
+        self._pending_target_page = target_page
+        if self._window_state == 'ready':
+            self._pager(f"goTo({self.chapter_idx}, {json.dumps(target_page)})")
+            return
+        if self._window_state == 'loading':
+            return  # on_chapter_loaded opens the window at the pending target
+
+        self._window_state = 'loading'
+        self.current_item_id = self.spine_order[self.chapter_idx]
+        self._pager_ready = False
+        self._load_trace = tracing.begin("web.load")
+        href = self.book.href(self.current_item_id)
+        self.ui.web_view.load(QUrl(chapter_view_url(self.book_key, href, self.is_dark, view='shell')))
+
+    def _item_url(self, item_id):
+        return book_url(self.book_key, self.book.href(item_id))
+
+    def _theme_href(self):
+        return theme_url(THEME_VERSION) if CHAPTER_LOAD_MODE == "url" else None
+
+    def _snapshot(self):
+        # The bound book as worker threads see it, taken on the GUI thread:
+        # bind_book()/unbind_book() and resizes swap these fields under them
+        return (self.book, self.structure['hash'], self.book_key, self.image_fit)
+
+    def _chapter_key(self, snapshot, item_id):
+        _, book_hash, key, image_fit = snapshot
+        return chapter_key(book_hash, item_id, THEME_VERSION, TRANSFORM_VERSION,
+                           key, self._theme_href(), image_fit)
+
+    def prepare_item(self, item_id, snapshot=None):
+        book, _, key, image_fit = snapshot = snapshot or self._snapshot()
+
+        def prepare():
+            with tracing.span("epub.read_item"):
+                content = book.read(item_id)
+            if content is None:
+                return None
+            return prepare_chapter_html(content.decode('utf-8'), book_url(key, book.href(item_id)),
+                                        self._theme_href(), image_fit)
+
+        with tracing.span("reader.prepare_item"):
+            return chapter_cache.get_or_prepare(self._chapter_key(snapshot, item_id), prepare)
+
+    def prefetch_item(self, item_id, snapshot):
+        # Runs on a prefetch worker thread, with the snapshot taken when the
+        # job was scheduled. Image derivatives are queued as well, so turning
+        # into the chapter finds them on disk.
+        if chapter_cache.contains(self._chapter_key(snapshot, item_id)):
+            return
+        html = self.prepare_item(item_id, snapshot)
+        if html:
+            _, _, key, image_fit = snapshot
+            hrefs = {unquote(html_lib.unescape(m).split('#')[0]) for m in ORIGINAL_IMAGE_RE.findall(html)}
+            resource_handler().prefetch_images(key, hrefs, image_fit)
+
+    def serve_chapter(self, item_id, is_dark, view='chapter'):
+        # Called by the epub:// handler for chapter_view_url requests, on the
+        # GUI thread; the returned function runs on the handler's workers
+        snapshot = self._snapshot()
+        url = self._item_url(item_id)
+
+        def build():
+            if view == 'shell':
+                return prepare_chapter_html("", url, self._theme_href())
+            html = self.prepare_item(item_id, snapshot)
+            if html is not None and view == 'section':
+                return chapter_body(html)
+            if html is not None and is_dark:
+                html = html.replace("<body>", "<body class='dark-mode'>")
+            return html
+        return build
 
     def load_custom_item(self, item_id, target_page=0):
-        item = self.book.get_item_with_id(item_id)
-        if item:
-            self._pending_target_page = target_page
-            raw = item.get_content().decode('utf-8')
-            html = prepare_chapter_html(raw, self.temp_dir)
-            
-            if self.is_dark:
-                html = html.replace("<body>", "<body class='dark-mode'>")
+        if not self.book.has_item(item_id):
+            return
+        self._pending_target_page = target_page
+        self.current_item_id = item_id
+        self._pager_ready = False
+        self._window_state = None
+
+        self._load_trace = tracing.begin("web.load" if CHAPTER_LOAD_MODE == "url" else "web.setHtml")
+        if CHAPTER_LOAD_MODE == "url":
+            href = self.book.href(item_id)
+            self.ui.web_view.load(QUrl(chapter_view_url(self.book_key, href, self.is_dark)))
+            return
 
-            self.ui.web_view.setHtml(html, QUrl.fromLocalFile(self.temp_dir + os.sep))
-
-    def scroll_to_anchor(self, anchor_id):
-        js = f"""
-        (function() {{
-            var el = document.getElementById('{anchor_id}');
-            if (el) {{
-                var rect = el.getBoundingClientRect();
-                var container = document.getElementById('book-content');
-                var totalLeft = container.scrollLeft + rect.left;
-                return totalLeft;
-            }}
-            return -1;
-        }})();
-        """
-        self.ui.web_view.page().runJavaScript(js, self._handle_anchor_result)
-
-    def _handle_anchor_result(self, result):
-        if result != -1 and self.scroll_stride > 0:
-            page_idx = int(result / self.scroll_stride)
-            self.current_page_idx = max(0, min(page_idx, self.total_pages_in_chapter - 1))
-            self.update_view_position()
+        html = self.serve_chapter(item_id, self.is_dark)()
+        if html is not None:
+            self.ui.web_view.setHtml(html, QUrl(self._item_url(item_id)))
+
+    def _pager(self, command):
+        pager_call(self.ui.web_view.page(), command)
+
+    def _current_spine_idx(self):
+        # -1 while showing an item that is not part of the spine
+        if self.spine_order and self.spine_order[self.chapter_idx] == self.current_item_id:
+            return self.chapter_idx
+        return -1
+
+    def _anchor_offset(self, anchor_id):
+        entry = self.book_text.cached_chapter(self._current_spine_idx()) if self.book_text else None
+        return entry['anchors'].get(anchor_id) if entry else None
+
+    def page_for_offset(self, offset):
+        page_idx = bisect_right(self.page_starts, offset) - 1
+        # Pages without text share a start; prefer the first of them (as the pager does)
+        while page_idx > 0 and self.page_starts[page_idx - 1] == self.page_starts[page_idx]:
+            page_idx -= 1
+        return max(0, min(page_idx, self.total_pages_in_chapter - 1))
+
+    def go_to_anchor(self, anchor_id):
+        offset = self._anchor_offset(anchor_id)
+        if offset is None:
+            # Not in the text cache yet: the pager locates the element itself
+            self._pager(f"showAnchor({json.dumps(anchor_id)})")
+            return
+        self.current_page_idx = self.page_for_offset(offset)
+        self.update_view_position()
 
     def on_chapter_loaded(self, success):
-        if not success: return
+        tracing.end(self._load_trace)
+        self._load_trace = None
+        if self.book is None or self.ui.web_view.url() == QUrl(BLANK_URL):
+            return  # the blank page of an unbound reader
+        if not success:
+            self._window_state = None
+            return
         
         # Safe Theme Application
         action = "add" if self.is_dark else "remove"
         js_theme = f"if (document && document.body) document.body.classList.{action}('dark-mode');"
         self.ui.web_view.page().runJavaScript(js_theme)
         
-        js_block = """
-        window.addEventListener('wheel', function(e) { if(e.ctrlKey) e.preventDefault(); }, { passive: false });
-        window.addEventListener('keydown', function(e) { if (e.ctrlKey && ['+', '-', '=', '0'].includes(e.key)) e.preventDefault(); });
-        """
-        self.ui.web_view.page().runJavaScript(js_block)
+        self.ui.web_view.page().runJavaScript(IMAGE_ZOOM_JS)
         self.ui.web_view.setZoomFactor(1.0)
-        self.calculate_layout_geometry()
-
-    def calculate_layout_geometry(self):
-        js = """(function() {
-            var elem = document.getElementById('book-content');
-            if (!elem) return {pages: 1, stride: 0};
-            var totalW = elem.scrollWidth;
-            var winW = window.innerWidth;
-            var gap = parseFloat(window.getComputedStyle(elem).columnGap) || 0;
-            var stride = winW + gap; if (stride < 100) stride = winW;
-            var pages = Math.ceil((totalW - 10) / stride);
-            return { pages: pages, stride: stride };
-        })();"""
-        self.ui.web_view.page().runJavaScript(js, self._handle_page_count_result)
-
-    def _handle_page_count_result(self, result):
-        if isinstance(result, dict):
-            self.total_pages_in_chapter = int(result.get('pages', 1))
-            self.scroll_stride = float(result.get('stride', 0))
-        else:
-            self.total_pages_in_chapter = 1
-            self.scroll_stride = float(self.ui.web_view.width())
-        
-        target = self._pending_target_page
-        
-        if isinstance(target, str) and target.startswith("#"):
-            self.is_ready_to_save = True
-            self.scroll_to_anchor(target[1:]) 
-            self._pending_target_page = 'current'
+        self._highlighted = None
+        target = json.dumps(self._pending_target_page)
+        if self._window_state == 'loading':
+            self._window_state = 'ready'
+            urls = [chapter_view_url(self.book_key, self.book.href(item_id), view='section')
+                    for item_id in self.spine_order]
+            self._pager(f"initWindow({json.dumps(urls)}, {self.chapter_idx}, {target})")
             return
-            
-        elif target == 'end':
-            self.current_page_idx = max(0, self.total_pages_in_chapter - 1)
-        elif target == 'current':
-            self.current_page_idx = max(0, min(self.current_page_idx, self.total_pages_in_chapter - 1))
-        else:
-            self.current_page_idx = max(0, min(int(target), self.total_pages_in_chapter - 1))
-        
+        # The pager measures the page unless this chapter was laid out at this size before
+        self._pager(f"init({json.dumps(self.page_geometry.get(self._geometry_key()))}, {target})")
+
+    def _view_size(self):
+        return QSize(self.ui.web_view.width(), self.ui.web_view.height())
+
+    def _geometry_key(self):
+        return (self.current_item_id, self.ui.web_view.width(), self.ui.web_view.height())
+
+    # --- PAGER STATE ---
+    def on_pager_state(self, state):
+        # Coalesced report from the page: current page, plus the layout
+        # whenever it was (re)measured or the current section changed
+        tracing.end(self._show_trace)
+        self._show_trace = None
+        if self.book is None or ('pages' not in state and not self._pager_ready):
+            return  # late report from the previous document
+        spine = state.get('spine')
+        entered = spine is not None and self.spine_order[spine] != self.current_item_id
+        if entered:
+            self._enter_chapter(spine)
+        if 'pages' in state:
+            self._on_layout(state)
+        self.current_page_idx = int(state.get('page', 0))
+        if state.get('arrived'):
+            self._on_arrived()
+        elif entered:
+            self._apply_search_highlights()
+        if entered or state.get('arrived'):
+            self.prefetcher.schedule_around(self.spine_order, self.chapter_idx, context=self._snapshot())
+        self.update_page_label()
+        if self.is_ready_to_save:
+            progress_journal.record(self.book_id, **self._progress_fields())
+
+    def _enter_chapter(self, spine_idx):
+        # Continuous mode: a page turn crossed into a neighbouring section
+        self.chapter_idx = spine_idx
+        self.current_item_id = self.spine_order[spine_idx]
+        self._select_toc_row()
+
+    def _on_layout(self, state):
+        self._pager_ready = True
+        self.total_pages_in_chapter = max(1, int(state['pages']))
+        self.scroll_stride = float(state.get('stride', 0))
+        self.page_starts = [int(x) for x in state.get('starts') or [0]]
+        if state.get('layout_ms'):
+            tracing.record("js.page_geometry", state['layout_ms'])
+        if 'spine' not in state:
+            # Sections of the continuous document are re-measured as they come and go
+            self.page_geometry[self._geometry_key()] = {
+                'pages': self.total_pages_in_chapter, 'stride': self.scroll_stride, 'starts': self.page_starts,
+            }
+        if self.paginator:
+            size = self._view_size()
+            if 'spine' in state:
+                # Every section in the window is a measured chapter
+                for spine_idx, pages in state.get('sections') or []:
+                    if 0 <= spine_idx < len(self.spine_order):
+                        self.paginator.record(size, self.spine_order[spine_idx], max(1, int(pages)))
+            elif self._current_spine_idx() >= 0:
+                self.paginator.record(size, self.current_item_id, self.total_pages_in_chapter)
+            # The rest of the book is laid out once the visible chapter is done
+            self.paginator.start(size)
+
+    def _on_arrived(self):
+        # The pager reached the target it was opened (or sent) with
+        self._pending_target_page = 0
         self.is_ready_to_save = True
-        self._pending_target_page = 'current'
-        self.update_view_position()
+        self._apply_search_highlights()
+        self._end_open_trace()
+        startup.first_page()
+
+    def _end_open_trace(self):
+        tracing.end(self._open_trace)
+        self._open_trace = None
 
     def update_view_position(self):
-        target_x = round(self.current_page_idx * self.scroll_stride)
-        self.ui.web_view.page().runJavaScript(f"var e=document.getElementById('book-content'); if(e) e.scrollLeft={target_x};")
-        self.ui.lbl_progress.setText(f"Chap {self.chapter_idx + 1} • Page {self.current_page_idx + 1} / {self.total_pages_in_chapter}")
+        # The pager scrolls and reports back; progress is recorded from its report
+        if self._show_trace is None:
+            self._show_trace = tracing.begin("pager.show")
+        self._pager(f"show({int(self.current_page_idx)})")
+        self.update_page_label()
+
+    def _global_position(self):
+        # (global page index, total pages) once the whole book is paginated
+        if not self.paginator or self._current_spine_idx() < 0:
+            return None
+        return self.paginator.global_position(self._view_size(), self.chapter_idx, self.current_page_idx)
+
+    def update_page_label(self):
+        position = self._global_position()
+        if position:
+            page, total = position
+            self.ui.lbl_progress.setText(f"Chap {self.chapter_idx + 1} • Page {page + 1} / {total}")
+        else:
+            self.ui.lbl_progress.setText(f"Chap {self.chapter_idx + 1} • Page {self.current_page_idx + 1} / {self.total_pages_in_chapter}")
 
     def next_page(self):
-        if self.current_page_idx < self.total_pages_in_chapter - 1:
-            self.current_page_idx += 1
-            self.update_view_position()
-        elif self.chapter_idx < len(self.spine_order) - 1:
-            self.chapter_idx += 1
-            self.load_chapter_content(target_page=0)
+        # Buttons and keys outside the page; the pager reports back if the
+        # turn leaves the chapter
+        if self._pager_ready:
+            self._pager("turn(1)")
 
     def prev_page(self):
-        if self.current_page_idx > 0:
-            self.current_page_idx -= 1
-            self.update_view_position()
-        elif self.chapter_idx > 0:
+        if self._pager_ready:
+            self._pager("turn(-1)")
+
+    def on_turned_past_end(self, direction):
+        if not self._pager_ready:
+            return
+        if direction > 0 and self.chapter_idx < len(self.spine_order) - 1:
+            self.chapter_idx += 1
+            self.load_chapter_content(target_page=0)
+        elif direction < 0 and self.chapter_idx > 0:
             self.chapter_idx -= 1
             self.load_chapter_content(target_page='end')
+        else:
+            self._pager("stay()")  # first or last page of the book
+
+    def on_section_failed(self, spine_idx, error):
+        print(f"DEBUG: Section {spine_idx} failed to load ({error}); reading chapter by chapter")
+        if self._window_state != 'ready' or self._window_failed:
+            return
+        self._window_failed = True
+        # A failed target was never shown; otherwise stay on the current page
+        target = self._pending_target_page if spine_idx == self.chapter_idx else self.current_page_idx
+        self.load_chapter_content(target_page=target)
+
+    # --- IN-BOOK SEARCH ---
+    def open_find_bar(self):
+        if not self.book_text: return
+        self.ui.find_bar.show()
+        self.ui.find_input.setFocus()
+        self.ui.find_input.selectAll()
+        if not self.book_text.is_complete() and not self._text_pending:
+            self._text_pending = True
+            self.ui.lbl_find.setText("Indexing...")
+            book_text = self.book_text
+            self.book_text.load_async(lambda: self.text_ready.emit(book_text))
+        self.resize_timer.start()
+
+    def close_find_bar(self):
+        if not self.ui.find_bar.isVisible(): return
+        self.ui.find_bar.hide()
+        self.find_timer.stop()
+        self.search_query = ""
+        self.search_hits = []
+        self.hit_idx = -1
+        self._apply_search_highlights()
+        self.ui.web_view.setFocus()
+        self.resize_timer.start()
+
+    def on_text_ready(self, book_text):
+        if book_text is not self.book_text:
+            return  # extraction for a book that has been unbound since
+        self._text_pending = False
+        if self.ui.find_bar.isVisible():
+            self.run_book_search()
+
+    def run_book_search(self):
+        self.find_timer.stop()
+        if self._text_pending:
+            self.ui.lbl_find.setText("Indexing...")
+            return
+        self.search_query = self.ui.find_input.text()
+        with tracing.span("reader.find_all"):
+            self.search_hits = self.book_text.find_all(self.search_query)
+        self.hit_idx = -1
+        if not self.search_hits:
+            self.ui.lbl_find.setText("No matches" if self.search_query else "")
+            self._apply_search_highlights()
+            return
+
+        # Start from the first match at or after the current page
+        here = (self.chapter_idx, self.page_starts[min(self.current_page_idx, len(self.page_starts) - 1)])
+        idx = bisect_left([(h[0], h[1]) for h in self.search_hits], here)
+        self.goto_hit(idx % len(self.search_hits))
+
+    def goto_hit(self, idx):
+        if not self.search_hits: return
+        self.hit_idx = idx % len(self.search_hits)
+        spine_idx, start, _ = self.search_hits[self.hit_idx]
+        self.ui.lbl_find.setText(f"{self.hit_idx + 1} / {len(self.search_hits)}")
+
+        if spine_idx != self._current_spine_idx():
+            self.chapter_idx = spine_idx
+            self.load_chapter_content(target_page=f"@{start}")
+            return
+        self.current_page_idx = self.page_for_offset(start)
+        self.update_view_position()
+        self._apply_search_highlights()
+
+    def find_next(self):
+        if self.find_timer.isActive() or self.ui.find_input.text() != self.search_query:
+            self.run_book_search()
+        else:
+            self.goto_hit(self.hit_idx + 1)
+
+    def find_previous(self):
+        if self.find_timer.isActive() or self.ui.find_input.text() != self.search_query:
+            self.run_book_search()
+        else:
+            self.goto_hit(self.hit_idx - 1)
+
+    def on_find_return(self):
+        if QApplication.keyboardModifiers() & Qt.KeyboardModifier.ShiftModifier:
+            self.find_previous()
+        else:
+            self.find_next()
+
+    def _apply_search_highlights(self):
+        # All hits of the shown chapter are marked by a single script; moving
+        # between hits of the same chapter only moves the 'current' class.
+        spine_idx = self._current_spine_idx()
+        lo = bisect_left(self.search_hits, (spine_idx, -1, 0))
+        hi = bisect_left(self.search_hits, (spine_idx + 1, -1, 0))
+        current = self.hit_idx - lo if lo <= self.hit_idx < hi else -1
+
+        state = (self.current_item_id, self.search_query)
+        if state == self._highlighted:
+            js = f"document.querySelectorAll('mark.search-hit').forEach(function(m) {{ m.classList.toggle('current', m.getAttribute('data-hit') == '{current}'); }});"
+        elif hi > lo or self._highlighted is not None:
+            ranges = [[start, start + length] for _, start, length in self.search_hits[lo:hi]]
+            js = f"{HIGHLIGHT_JS}({json.dumps(self._content_selector())}, {json.dumps(ranges)}, {current});"
+        else:
+            return
+        self._highlighted = state if hi > lo else None
+        if tracing.is_enabled():
+            token = tracing.begin("js.highlight", hits=hi - lo)
+            self.ui.web_view.page().runJavaScript(js, lambda _: tracing.end(token))
+        else:
+            self.ui.web_view.page().runJavaScript(js)
+
+    def _content_selector(self):
+        # The shown chapter's element: a section of the continuous document or #book-content
+        if self._window_state == 'ready':
+            return f'section.book-section[data-spine="{self.chapter_idx}"]'
+        return '#book-content'
+
+    # --- TRACING ---
+    def toggle_profile(self):
+        if tracing.is_profiling():
+            path = tracing.stop_profile(PROFILE_DIR)
+            print(f"DEBUG: Profile written to {path}")
+        else:
+            tracing.set_enabled(True)
+            tracing.start_profile()
+            print("DEBUG: Profiling started (Ctrl+Shift+P again to stop)")
+        if self.overlay.isVisible():
+            self.overlay.refresh()
+
+    def export_trace(self):
+        jsonl_path, chrome_path = tracing.export_all(TRACE_DIR)
+        print(f"DEBUG: Trace exported to {jsonl_path} and {chrome_path}")
+
+    def _progress_fields(self):
+        fields = {
+            'last_chapter_index': self.chapter_idx,
+            'last_page_index': self.current_page_idx,
+        }
+        
+        total_chapters = len(self.spine_order)
+        position = self._global_position()
+        if position:
+            page, total = position
+            fields['progress_percent'] = min(100, max(0, int((page + 1) * 100 / max(1, total))))
+        elif total_chapters > 0:
+            # Estimate until every chapter has been paginated
+            cur_chap = self.chapter_idx / total_chapters
+            weight = 1 / total_chapters
+            pg_frac = self.current_page_idx / max(1, self.total_pages_in_chapter)
+            total_percent = int((cur_chap + (pg_frac * weight)) * 100)
+            fields['progress_percent'] = min(100, max(0, total_percent))
+        return fields
 
     def save_progress(self):
         if not self.is_ready_to_save: return
-
-        lib = load_library()
-        if 'books' in lib and self.book_id in lib['books']:
-            book_entry = lib['books'][self.book_id]
-            book_entry['last_chapter_index'] = self.chapter_idx
-            book_entry['last_page_index'] = self.current_page_idx
-            
-            total_chapters = len(self.spine_order)
-            if total_chapters > 0:
-                cur_chap = self.chapter_idx / total_chapters
-                weight = 1 / total_chapters
-                pg_frac = self.current_page_idx / max(1, self.total_pages_in_chapter)
-                total_percent = int((cur_chap + (pg_frac * weight)) * 100)
-                book_entry['progress_percent'] = min(100, max(0, total_percent))
-            
-            save_library(lib)
+        progress_journal.record(self.book_id, **self._progress_fields())
+        progress_journal.commit()
 
     def go_back_to_library(self):
         self.is_returning_to_library = True
         self.close()
 
+    def _page_has_focus(self):
+        focus = QApplication.focusWidget()
+        return focus is not None and (focus is self.ui.web_view or self.ui.web_view.isAncestorOf(focus))
+
+    def _cursor_over(self, widget):
+        return widget.rect().contains(widget.mapFromGlobal(QCursor.pos()))
+
     def eventFilter(self, source, event):
         if source == self.ui.web_view and event.type() == QEvent.Type.Resize:
             self.resize_timer.start()
 
-        if event.type() == QEvent.Type.KeyPress and self.isActiveWindow():
+        if event.type() == QEvent.Type.KeyPress and self.isActiveWindow() and not self.ui.find_input.hasFocus():
+            if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+                 if event.key() in [Qt.Key.Key_Plus, Qt.Key.Key_Equal, Qt.Key.Key_Minus, Qt.Key.Key_0]: return True
+            if self._pager_ready and self._page_has_focus():
+                # The in-page pager turns pages on its own keydown
+                return super().eventFilter(source, event)
             if event.key() == Qt.Key.Key_Left or event.key() == Qt.Key.Key_J:
                 self.prev_page(); return True
             if event.key() == Qt.Key.Key_Right or event.key() == Qt.Key.Key_L:
                 self.next_page(); return True
-            if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
-                 if event.key() in [Qt.Key.Key_Plus, Qt.Key.Key_Equal, Qt.Key.Key_Minus, Qt.Key.Key_0]: return True
         
         if event.type() == QEvent.Type.Wheel and self.isActiveWindow():
             if event.modifiers() & Qt.KeyboardModifier.ControlModifier: 
                 return True # Block zoom
 
+            if self._pager_ready and self._cursor_over(self.ui.web_view):
+                return super().eventFilter(source, event)  # handled by the pager
+
             # Check if mouse is physically over the side panel
-            if self.ui.side_panel.isVisible():
-                cursor_pos = QCursor.pos()
-                local_pos = self.ui.side_panel.mapFromGlobal(cursor_pos)
-                if self.ui.side_panel.rect().contains(local_pos):
-                    # Mouse is over sidebar, let standard processing happen (scroll the list)
-                    return super().eventFilter(source, event)
+            if self.ui.side_panel.isVisible() and self._cursor_over(self.ui.side_panel):
+                # Mouse is over sidebar, let standard processing happen (scroll the list)
+                return super().eventFilter(source, event)
 
             delta = event.angleDelta().y()
             if delta > 0: # Scroll Up -> Previous Page
@@ -349,18 +873,29 @@ class ReaderWindow(QMainWindow):
 
     def resizeEvent(self, event):
         self.resize_timer.start()
+        if self.overlay.isVisible():
+            self.overlay.refresh()
         super().resizeEvent(event)
 
     def closeEvent(self, event):
-        self.save_progress()
-        QApplication.instance().removeEventFilter(self)
-        self.ui.web_view.removeEventFilter(self)
-        if os.path.exists(self.temp_dir):
-            try: shutil.rmtree(self.temp_dir)
-            except: pass 
+        self.unbind_book()
+        if tracing.is_profiling():
+            tracing.stop_profile(PROFILE_DIR)
+        if tracing.is_enabled():
+            print(f"DEBUG: Chapter cache {chapter_cache.stats()}")
             
         if self.is_returning_to_library:
+            # Hidden, not destroyed: the library binds the next book to it
             self.on_close_callback()
         else:
+            self.shutdown()
             QApplication.instance().quit()
-        event.accept()
\ No newline at end of file
+        event.accept()
+
+    def shutdown(self):
+        if self._shut_down:
+            return
+        self._shut_down = True
+        QApplication.instance().removeEventFilter(self)
+        self.ui.web_view.removeEventFilter(self)
+        self.prefetcher.shutdown()
\ No newline at end of file
@@ -1,11 +1,12 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                             QLabel, QListWidget, QFrame)
+                             QLabel, QListWidget, QFrame, QLineEdit)
 from PyQt6.QtWebEngineWidgets import QWebEngineView
 from PyQt6.QtWebEngineCore import QWebEnginePage
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QColor
 
 from .ui_components import ThemeToggleButton, BackButton
+from .resources import reader_profile
 
 # --- UI CONFIGURATION CONSTANTS ---
 SIDEBAR_WIDTH = 180
@@ -15,13 +16,15 @@ ICON_FONT_SIZE = 20  # px
 SCROLL_WIDTH = "8px"
 SCROLL_HANDLE_MIN_H = "10px"
 SCROLL_RADIUS = "4px"
+FIND_BAR_HEIGHT = 44
+FIND_INPUT_WIDTH = 280
 
 class InterceptingWebPage(QWebEnginePage):
     """
     Custom WebPage to intercept navigation requests (clicks).
     """
     def __init__(self, parent, handle_link_cb):
-        super().__init__(parent)
+        super().__init__(reader_profile(), parent)
         self.handle_link_cb = handle_link_cb
 
     def acceptNavigationRequest(self, url, _type, isMainFrame):
@@ -58,6 +61,7 @@ class ReaderUI:
         # Chapter List
         self.toc_list = QListWidget()
         self.toc_list.setFrameShape(QFrame.Shape.NoFrame)
+        self.toc_list.setMouseTracking(True)  # itemEntered drives hover prefetch
         side_layout.addWidget(self.toc_list)
         
         self.main_layout.addWidget(self.side_panel)
@@ -75,6 +79,13 @@ class ReaderUI:
         self._init_top_bar()
         self.content_layout.addWidget(self.top_bar, 0)
 
+        # In-book search, hidden until Ctrl+F
+        self.find_bar = QWidget()
+        self.find_bar.setFixedHeight(FIND_BAR_HEIGHT)
+        self.find_bar.hide()
+        self._init_find_bar()
+        self.content_layout.addWidget(self.find_bar, 0)
+
         self.web_view = QWebEngineView()
         
         self.custom_page = InterceptingWebPage(self.web_view, self.main_window.handle_internal_link)
@@ -112,6 +123,37 @@ class ReaderUI:
         layout.addStretch()
         layout.addWidget(self.btn_theme)
 
+    def _init_find_bar(self):
+        layout = QHBoxLayout(self.find_bar)
+        layout.setContentsMargins(15, 0, 15, 0)
+
+        self.find_input = QLineEdit()
+        self.find_input.setPlaceholderText("Find in book...")
+        self.find_input.setFixedWidth(FIND_INPUT_WIDTH)
+        self.find_input.setClearButtonEnabled(True)
+
+        self.lbl_find = QLabel("")
+
+        self.btn_find_prev = QPushButton("‹")
+        self.btn_find_next = QPushButton("›")
+        self.btn_find_close = QPushButton("✕")
+        for btn in (self.btn_find_prev, self.btn_find_next, self.btn_find_close):
+            btn.setFixedSize(32, 32)
+            btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.btn_find_prev.setToolTip("Previous match (Shift+Enter)")
+        self.btn_find_next.setToolTip("Next match (Enter)")
+        self.btn_find_prev.clicked.connect(self.main_window.find_previous)
+        self.btn_find_next.clicked.connect(self.main_window.find_next)
+        self.btn_find_close.clicked.connect(self.main_window.close_find_bar)
+
+        layout.addWidget(self.find_input)
+        layout.addWidget(self.btn_find_prev)
+        layout.addWidget(self.btn_find_next)
+        layout.addSpacing(10)
+        layout.addWidget(self.lbl_find)
+        layout.addStretch()
+        layout.addWidget(self.btn_find_close)
+
     def _init_bottom_bar(self):
         layout = QHBoxLayout(self.nav_container)
         layout.setContentsMargins(20, 0, 20, 0)
@@ -149,6 +191,14 @@ class ReaderUI:
         self.top_bar.setStyleSheet(f"background-color: {bar_bg}; border-bottom: 1px solid {bar_border};")
         self.btn_toc.setStyleSheet(f"color: {win_fg}; font-size: {ICON_FONT_SIZE}px; border: none; background: transparent; font-weight: bold;")
 
+        self.find_bar.setStyleSheet(f"""
+            QWidget {{ background-color: {bar_bg}; border-bottom: 1px solid {bar_border}; }}
+            QLineEdit {{ background-color: {btn_bg}; color: {btn_fg}; border: 1px solid {bar_border}; border-radius: 4px; padding: 4px 8px; }}
+            QPushButton {{ background-color: {btn_bg}; color: {btn_fg}; border: 1px solid {bar_border}; border-radius: 4px; font-size: 16px; }}
+            QPushButton:hover {{ background-color: {btn_hover}; }}
+            QLabel {{ color: {btn_fg}; border: none; }}
+        """)
+
         self.side_panel.setStyleSheet(f"background-color: {list_bg}; border-right: 1px solid {bar_border};")
         self.toc_header.setStyleSheet(f"border-bottom: 1px solid {bar_border}; font-weight: bold; color: {win_fg};")
         
@@ -0,0 +1,246 @@
+import os
+import mimetypes
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, parse_qs
+from PyQt6.QtCore import QCoreApplication, QBuffer, QIODevice, QByteArray, pyqtSignal
+from PyQt6.QtWebEngineCore import (QWebEngineUrlScheme, QWebEngineUrlSchemeHandler,
+                                   QWebEngineUrlRequestJob, QWebEngineProfile)
+from .database import CACHE_DIR
+from .images import ImageDerivatives, can_derive
+from . import disk_cache
+
+# --- BOOK RESOURCE SCHEME ---
+# Chapters are rendered with a base URL of epub://<book key>/<path in zip>,
+# so images, fonts and stylesheets are streamed straight out of the archive
+# instead of being extracted to a temp dir before the first page shows.
+SCHEME_NAME = b"epub"
+
+# Reader-owned assets live under their own host, shared by every book
+READER_HOST = "reader"
+THEME_PATH = "theme.css"
+
+# Every reader page (the reader view, the paginator, the pre-warm view)
+# runs on one named, disk-backed profile rather than the off-the-record
+# default one, so its HTTP and code caches outlive a book and the session.
+PROFILE_NAME = "dorky-reader"
+WEBENGINE_DIR = os.path.join(CACHE_DIR, "webengine")
+HTTP_CACHE_BYTES = 64 * 1024 * 1024
+
+# Chapters are prepared off the GUI thread; the reader and the background
+# paginator both load them through this handler
+CHAPTER_WORKERS = 2
+
+_handler = None
+_profile = None
+
+def fetch_supported():
+    # Pages can only fetch() epub:// URLs with FetchApiAllowed (Qt 6.6+)
+    return hasattr(QWebEngineUrlScheme.Flag, 'FetchApiAllowed')
+
+def register_scheme():
+    # Must run before the QApplication is created
+    scheme = QWebEngineUrlScheme(SCHEME_NAME)
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Host)
+    flags = (QWebEngineUrlScheme.Flag.SecureScheme |
+             QWebEngineUrlScheme.Flag.LocalAccessAllowed |
+             QWebEngineUrlScheme.Flag.CorsEnabled)
+    if fetch_supported():
+        # The continuous reading mode fetch()es its sections
+        flags |= QWebEngineUrlScheme.Flag.FetchApiAllowed
+    scheme.setFlags(flags)
+    QWebEngineUrlScheme.registerScheme(scheme)
+
+def book_key(structure):
+    return disk_cache.book_key(structure['hash'])
+
+def book_url(key, href):
+    return f"{SCHEME_NAME.decode()}://{key}/{quote(href)}"
+
+# ?view= values answered by the chapter provider: the whole prepared
+# chapter, only its body (inserted into a continuous document), or an
+# empty themed document for sections to be inserted into
+CHAPTER_VIEWS = ('chapter', 'section', 'shell')
+
+def chapter_view_url(key, href, is_dark=False, view='chapter'):
+    # Same path as the source document so relative links still resolve
+    theme = "dark" if is_dark else "light"
+    return f"{book_url(key, href)}?view={view}&theme={theme}"
+
+def theme_url(version):
+    # Versioned, so the engine can keep it for the whole session
+    return f"{SCHEME_NAME.decode()}://{READER_HOST}/{THEME_PATH}?v={version}"
+
+class BookResourceHandler(QWebEngineUrlSchemeHandler):
+    _chapter_ready = pyqtSignal(int, object)  # reply token, HTML or None
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._books = {}  # key -> (archive, {href: media_type}, {href: item_id}, chapter_provider)
+        self.theme_css = None
+        self.images = ImageDerivatives(self)
+        self._pool = ThreadPoolExecutor(max_workers=CHAPTER_WORKERS, thread_name_prefix="chapters")
+        self._tokens = itertools.count()
+        self._waiting = {}  # reply token -> job answered after requestStarted returned
+        self._chapter_ready.connect(self._on_chapter_ready)
+        app = QCoreApplication.instance()
+        if app:
+            app.aboutToQuit.connect(lambda: self._pool.shutdown(wait=False, cancel_futures=True))
+
+    def set_theme(self, css):
+        self.theme_css = css.encode('utf-8')
+
+    def register_book(self, key, archive, structure, chapter_provider=None):
+        """
+        `chapter_provider(item_id, is_dark, view)` is called on the GUI thread
+        for `?view=` requests (see chapter_view_url). It returns a function
+        that builds the HTML on a worker thread, or None for unknown items.
+        """
+        media_types = {}
+        item_ids = {}
+        for item_id, entry in structure['items'].items():
+            media_types[entry['href']] = entry['media_type']
+            item_ids[entry['href']] = item_id
+        self._books[key] = (archive, media_types, item_ids, chapter_provider)
+
+    def unregister_book(self, key):
+        self._books.pop(key, None)
+
+    def prefetch_images(self, key, hrefs, spec):
+        # Builds derivatives ahead of a chapter being shown
+        book = self._books.get(key)
+        if book:
+            for href in hrefs:
+                if can_derive(book[1].get(href)):
+                    self.images.request(key, href, spec, book[0])
+
+    def _reply_later(self, job):
+        """
+        Token for a job answered after requestStarted returns. WebEngine
+        deletes the job on its side when the request is cancelled (the page
+        navigated away); the token is dropped then and the answer discarded.
+        """
+        token = next(self._tokens)
+        self._waiting[token] = job
+        job.destroyed.connect(lambda *_: self._waiting.pop(token, None))
+        return token
+
+    def _reply(self, job, mime, data, headers=None):
+        if headers:
+            job.setAdditionalResponseHeaders({QByteArray(k): [QByteArray(v)] for k, v in headers.items()})
+        buf = QBuffer(job)  # parented to the job so it is freed with it
+        buf.setData(data)
+        buf.open(QIODevice.OpenModeFlag.ReadOnly)
+        job.reply(mime, buf)
+
+    def _serve_theme(self, job, url):
+        if self.theme_css is None or url.path().lstrip('/') != THEME_PATH:
+            job.fail(QWebEngineUrlRequestJob.Error.UrlNotFound)
+            return
+        self._reply(job, b"text/css", self.theme_css, {
+            b"Cache-Control": b"public, max-age=31536000, immutable",
+        })
+
+    def _serve_chapter(self, job, item_id, provider, query):
+        is_dark = query.get('theme', [''])[0] == 'dark'
+        build = provider(item_id, is_dark, query['view'][0]) if item_id else None
+        if build is None:
+            job.fail(QWebEngineUrlRequestJob.Error.UrlNotFound)
+            return
+        self._pool.submit(self._build_chapter, self._reply_later(job), build)
+
+    def _build_chapter(self, token, build):
+        # Worker thread
+        html = None
+        try:
+            html = build()
+        except Exception as e:
+            print(f"DEBUG: Chapter build failed: {e}")
+        self._chapter_ready.emit(token, html)
+
+    def _on_chapter_ready(self, token, html):
+        job = self._waiting.pop(token, None)
+        if job is None:
+            return  # cancelled while it was being built
+        if html is None:
+            job.fail(QWebEngineUrlRequestJob.Error.UrlNotFound)
+            return
+        # Built fresh per request (the chapter cache makes that cheap); a
+        # scheme handler sees no conditional requests to revalidate against
+        self._reply(job, b"text/html;charset=utf-8", html.encode('utf-8'))
+
+    def requestStarted(self, job):
+        url = job.requestUrl()
+        if url.host() == READER_HOST:
+            self._serve_theme(job, url)
+            return
+
+        book = self._books.get(url.host())
+        if not book:
+            job.fail(QWebEngineUrlRequestJob.Error.UrlNotFound)
+            return
+
+        archive, media_types, item_ids, provider = book
+        href = url.path().lstrip('/')
+        query = parse_qs(url.query())
+        if provider and query.get('view', [None])[0] in CHAPTER_VIEWS:
+            self._serve_chapter(job, item_ids.get(href), provider, query)
+            return
+
+        mime = media_types.get(href) or mimetypes.guess_type(href)[0] or "application/octet-stream"
+        fit = query.get('fit', [None])[0]
+        if fit and can_derive(mime):
+            self._serve_image(job, url.host(), archive, href, mime, fit)
+            return
+        self._serve_resource(job, archive, href, mime)
+
+    def _serve_resource(self, job, archive, href, mime):
+        try:
+            data = archive.read(href)
+        except KeyError:
+            job.fail(QWebEngineUrlRequestJob.Error.UrlNotFound)
+            return
+        except Exception as e:
+            print(f"DEBUG: Failed to read '{href}': {e}")
+            job.fail(QWebEngineUrlRequestJob.Error.RequestFailed)
+            return
+
+        # Archive members never change under a given book key
+        self._reply(job, mime.encode('ascii'), data, {
+            b"Cache-Control": b"public, max-age=31536000, immutable",
+        })
+
+    def _serve_image(self, job, key, archive, href, mime, fit):
+        # Answered from the image workers; the job may be gone by then
+        # (navigated away), in which case the result only stays on disk.
+        token = self._reply_later(job)
+
+        def done(data, derived_mime):
+            job = self._waiting.pop(token, None)
+            if job is None:
+                return
+            if data is None:
+                self._serve_resource(job, archive, href, mime)
+            else:
+                self._reply(job, derived_mime.encode('ascii'), data, {
+                    b"Cache-Control": b"public, max-age=31536000, immutable",
+                })
+        self.images.request(key, href, fit, archive, done)
+
+def reader_profile():
+    global _profile
+    if _profile is None:
+        # Parented to the application so it outlives every page using it
+        _profile = QWebEngineProfile(PROFILE_NAME, QCoreApplication.instance())
+        _profile.setPersistentStoragePath(os.path.join(WEBENGINE_DIR, "storage"))
+        _profile.setCachePath(os.path.join(WEBENGINE_DIR, "cache"))
+        _profile.setHttpCacheType(QWebEngineProfile.HttpCacheType.DiskHttpCache)
+        _profile.setHttpCacheMaximumSize(HTTP_CACHE_BYTES)
+    return _profile
+
+def resource_handler():
+    global _handler
+    if _handler is None:
+        _handler = BookResourceHandler()
+        reader_profile().installUrlSchemeHandler(SCHEME_NAME, _handler)
+    return _handler
@@ -0,0 +1,233 @@
+import os
+import re
+import html
+import queue
+import sqlite3
+import threading
+from .database import ROOT_DIR, get_book
+from .storage import resolve_path
+
+# --- FULL-TEXT SEARCH ---
+# Every spine item is split into passages stored in an FTS5 table together
+# with a locator (spine index + character offset into the chapter text).
+# A book's passages take one contiguous rowid range, recorded in
+# indexed_books, so in-book queries and deletes never scan other books.
+SEARCH_DB = os.path.join(ROOT_DIR, "search.db")
+INDEX_VERSION = 2       # bumped when SCHEMA changes; older indexes are rebuilt
+PASSAGE_CHARS = 800
+RESULT_LIMIT = 50
+# bm25 costs a few microseconds per matching passage. A term found in most
+# of a large library only has the RANK_CANDIDATES most recently indexed
+# matches ranked; selective queries rank every match.
+RANK_CANDIDATES = 2000
+MIN_PREFIX_CHARS = 2    # the last term is prefix-matched from this length
+MAX_ROWID = 2 ** 63 - 1
+MATCH_START = "\x02"  # snippet() markers, turned into <b> after escaping
+MATCH_END = "\x03"
+
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS passages USING fts5(
+    text,
+    book_id UNINDEXED,
+    spine_idx UNINDEXED,
+    char_offset UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3 4 5 6'
+);
+CREATE TABLE IF NOT EXISTS indexed_books (
+    book_id TEXT PRIMARY KEY,
+    passages INTEGER NOT NULL,
+    first_rowid INTEGER NOT NULL,
+    last_rowid INTEGER NOT NULL
+);
+"""
+
+_local = threading.local()  # one connection per thread; WAL lets readers run during indexing
+
+def get_connection():
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(SEARCH_DB)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if conn.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            # Emptied indexed_books makes index_missing queue every book again
+            conn.executescript("DROP TABLE IF EXISTS passages; DROP TABLE IF EXISTS indexed_books;")
+            conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+        conn.executescript(SCHEMA)
+        _local.conn = conn
+    return conn
+
+def split_passages(text, size=PASSAGE_CHARS):
+    # Cut at whitespace near `size` so words are not split between passages
+    start = 0
+    while start < len(text):
+        end = min(len(text), start + size)
+        if end < len(text):
+            space = text.rfind(' ', start + size // 2, end)
+            if space != -1:
+                end = space + 1
+        chunk = text[start:end]
+        if chunk.strip():
+            yield start, chunk
+        start = end
+
+def index_book(book_id, filename):
+    # The EPUB/HTML stack is only needed here; the library imports this
+    # module at startup for the indexer thread and queries
+    from .archive import EpubArchive
+    from .book_cache import load_book_structure
+    from .book_text import BookText
+    path = resolve_path(filename)
+    structure = load_book_structure(path)
+    archive = EpubArchive(path)
+    rows = []
+    try:
+        # Goes through the text cache, so the reader's in-book search reuses it
+        book_text = BookText(structure, archive)
+        book_text.load_all()
+        for spine_idx in range(len(structure['spine'])):
+            for offset, chunk in split_passages(book_text.chapter(spine_idx)['text']):
+                rows.append((chunk, spine_idx, offset))
+    finally:
+        archive.close()
+
+    conn = get_connection()
+    with conn:
+        # Take the write lock before checking the library: a delete that
+        # happens now runs remove_book after us and clears what we insert
+        conn.execute("BEGIN IMMEDIATE")
+        if get_book(book_id) is None:
+            # Deleted while it was queued or being extracted
+            _delete_passages(conn, book_id)
+            return 0
+        write_passages(conn, book_id, rows)
+    return len(rows)
+
+def _book_range(conn, book_id):
+    return conn.execute("SELECT first_rowid, last_rowid FROM indexed_books WHERE book_id = ?",
+                        (book_id,)).fetchone()
+
+def _delete_passages(conn, book_id):
+    span = _book_range(conn, book_id)
+    if span:
+        conn.execute("DELETE FROM passages WHERE rowid BETWEEN ? AND ?", span)
+        conn.execute("DELETE FROM indexed_books WHERE book_id = ?", (book_id,))
+
+def write_passages(conn, book_id, rows):
+    """
+    Replaces a book's passages with `rows` of (text, spine_idx, char_offset).
+    Runs inside the caller's write transaction, which keeps the rowids the
+    book gets contiguous.
+    """
+    _delete_passages(conn, book_id)
+    last = conn.execute("SELECT rowid FROM passages ORDER BY rowid DESC LIMIT 1").fetchone()
+    first = (last[0] if last else 0) + 1
+    conn.executemany("INSERT INTO passages (rowid, text, book_id, spine_idx, char_offset) VALUES (?, ?, ?, ?, ?)",
+                     ((first + i, text, book_id, spine_idx, offset) for i, (text, spine_idx, offset) in enumerate(rows)))
+    conn.execute("INSERT INTO indexed_books (book_id, passages, first_rowid, last_rowid) VALUES (?, ?, ?, ?)",
+                 (book_id, len(rows), first, first + len(rows) - 1))
+
+def remove_book(book_id):
+    conn = get_connection()
+    with conn:
+        _delete_passages(conn, book_id)
+
+def indexed_book_ids():
+    return {row[0] for row in get_connection().execute("SELECT book_id FROM indexed_books")}
+
+def _match_query(text):
+    # Quote every term so user input can't hit FTS5 syntax; prefix-match the last one
+    terms = re.findall(r"\w+", text, flags=re.UNICODE)
+    if not terms:
+        return None, []
+    quoted = [f'"{t}"' for t in terms]
+    if len(terms[-1]) >= MIN_PREFIX_CHARS:
+        quoted[-1] += "*"
+    return " ".join(quoted), terms
+
+def _snippet_html(snippet):
+    return html.escape(snippet).replace(MATCH_START, "<b>").replace(MATCH_END, "</b>")
+
+def search(text, limit=RESULT_LIMIT, book_id=None):
+    """
+    Ranked passages for `text`. Each result carries book_id, spine_idx and
+    char_offset (of the first matching term in the chapter text), plus an
+    HTML snippet with the matches in <b>.
+    """
+    query, terms = _match_query(text)
+    if not query:
+        return []
+    conn = get_connection()
+    if book_id:
+        span = _book_range(conn, book_id)
+        if not span:
+            return []
+    else:
+        # Rowid constraints are applied inside FTS5, so only the window is scored
+        newest = conn.execute("SELECT min(rowid) FROM (SELECT rowid FROM passages WHERE passages MATCH ? "
+                              "ORDER BY rowid DESC LIMIT ?)", (query, RANK_CANDIDATES)).fetchone()[0]
+        span = (newest or 0, MAX_ROWID)
+    sql = ("SELECT book_id, spine_idx, char_offset, text, "
+           f"snippet(passages, 0, '{MATCH_START}', '{MATCH_END}', '…', 16), bm25(passages) "
+           "FROM passages WHERE passages MATCH ? AND rowid BETWEEN ? AND ? "
+           "ORDER BY bm25(passages) LIMIT ?")
+
+    first_term = re.compile(re.escape(terms[0]), re.IGNORECASE)
+    results = []
+    for b_id, spine_idx, offset, passage, snippet, score in conn.execute(sql, (query, *span, limit)):
+        hit = first_term.search(passage)
+        results.append({
+            'book_id': b_id,
+            'spine_idx': int(spine_idx),
+            'char_offset': int(offset) + (hit.start() if hit else 0),
+            'snippet': _snippet_html(snippet),
+            'score': score,
+        })
+    return results
+
+class SearchIndexer:
+    """
+    Background indexing thread. Books are queued after import (or when
+    found missing at startup) and indexed one at a time.
+    """
+    def __init__(self, on_indexed=None):
+        self.on_indexed = on_indexed
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def enqueue(self, book_id, filename):
+        self._queue.put((book_id, filename))
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="search-indexer", daemon=True)
+            self._thread.start()
+
+    def index_missing(self, books):
+        done = indexed_book_ids()
+        for book_id, data in books.items():
+            if book_id not in done and data.get('filename'):
+                self.enqueue(book_id, data['filename'])
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            book_id, filename = job
+            if get_book(book_id) is None:
+                continue  # deleted before its turn came
+            try:
+                count = index_book(book_id, filename)
+                if self.on_indexed: self.on_indexed(book_id, count)
+            except Exception as e:
+                print(f"DEBUG: Indexing '{book_id}' failed: {e}")
+
+    def stop(self):
+        if self._thread:
+            # Drop queued books; they are picked up again by index_missing
+            while not self._queue.empty():
+                try: self._queue.get_nowait()
+                except queue.Empty: break
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,84 @@
+import html
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QLineEdit, QListWidget, QListWidgetItem,
+                             QLabel, QFrame)
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from .search_index import search
+
+SEARCH_DELAY_MS = 200
+
+class SearchDialog(QDialog):
+    """
+    Library-wide search. Double-clicking (or Enter on) a result emits
+    result_chosen(book_id, spine_idx, char_offset).
+    """
+    result_chosen = pyqtSignal(str, int, int)
+
+    def __init__(self, books, is_dark=False, parent=None):
+        super().__init__(parent)
+        self.books = books
+        self.setWindowTitle("Search Library")
+        self.resize(640, 480)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(15, 15, 15, 15)
+        layout.setSpacing(10)
+
+        self.input = QLineEdit()
+        self.input.setPlaceholderText("Search all books...")
+        self.input.textChanged.connect(lambda _: self.search_timer.start())
+        self.input.returnPressed.connect(self.open_current)
+        layout.addWidget(self.input)
+
+        self.lbl_status = QLabel("")
+        self.lbl_status.setStyleSheet("color: #888; font-size: 12px;")
+        layout.addWidget(self.lbl_status)
+
+        self.results = QListWidget()
+        self.results.setFrameShape(QFrame.Shape.NoFrame)
+        self.results.itemActivated.connect(self.open_item)
+        layout.addWidget(self.results)
+
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.run_search)
+
+        if is_dark:
+            self.setStyleSheet("QDialog, QListWidget, QLineEdit { background-color: #1e1e1e; color: #e0e0e0; }"
+                               "QListWidget::item:selected { background-color: #37373d; }")
+
+    def run_search(self):
+        self.results.clear()
+        text = self.input.text().strip()
+        if not text:
+            self.lbl_status.setText("")
+            return
+
+        hits = search(text)
+        self.lbl_status.setText(f"{len(hits)} result(s)")
+        for hit in hits:
+            title = self.books.get(hit['book_id'], {}).get('title', hit['book_id'])
+            label = QLabel(f"<b>{html.escape(title)}</b> · Chapter {hit['spine_idx'] + 1}<br>"
+                           f"<span style='color:#888'>{hit['snippet'].replace(chr(10), ' ')}</span>")
+            label.setWordWrap(True)
+            label.setContentsMargins(6, 6, 6, 6)
+            label.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+
+            item = QListWidgetItem()
+            item.setData(Qt.ItemDataRole.UserRole, (hit['book_id'], hit['spine_idx'], hit['char_offset']))
+            item.setSizeHint(label.sizeHint())
+            self.results.addItem(item)
+            self.results.setItemWidget(item, label)
+
+    def open_current(self):
+        self.search_timer.stop()
+        if self.results.count() == 0:
+            self.run_search()
+        item = self.results.currentItem() or self.results.item(0)
+        if item:
+            self.open_item(item)
+
+    def open_item(self, item):
+        book_id, spine_idx, offset = item.data(Qt.ItemDataRole.UserRole)
+        self.result_chosen.emit(book_id, spine_idx, offset)
+        self.accept()
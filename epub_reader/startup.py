@@ -0,0 +1,54 @@
+import os
+import sys
+import json
+import time
+from . import tracing
+
+# --- STARTUP TIMING ---
+# Marks are relative to the moment this module is first imported, which
+# main.py does before anything else. One line per session is appended to
+# STARTUP_LOG so time-to-library and time-to-first-page can be tracked;
+# they are only printed when tracing is on.
+_T0 = time.perf_counter()
+STARTUP_LOG_NAME = "startup.jsonl"
+# QtWebEngineCore is expected here: the epub:// scheme must be registered
+# (main.py) before the QApplication exists, and that needs the core library
+HEAVY_MODULES = ('PyQt6.QtWebEngineCore', 'PyQt6.QtWebEngineWidgets', 'ebooklib', 'bs4', 'lxml')
+
+_marks = {}
+_heavy_at_library = None
+
+def mark(name):
+    # Only the first occurrence of a mark counts
+    if name not in _marks:
+        _marks[name] = round((time.perf_counter() - _T0) * 1000, 1)
+
+def elapsed(name):
+    return _marks.get(name)
+
+def library_visible():
+    global _heavy_at_library
+    mark("library visible")
+    # Anything listed here was imported too early
+    _heavy_at_library = [m for m in HEAVY_MODULES if m in sys.modules]
+    if tracing.is_enabled():
+        print(f"DEBUG: Library visible after {_marks['library visible']} ms"
+              + (f" (already loaded: {', '.join(_heavy_at_library)})" if _heavy_at_library else ""))
+
+def first_page():
+    if "first page" in _marks:
+        return
+    mark("first page")
+    if tracing.is_enabled():
+        print(f"DEBUG: First page after {_marks['first page']} ms "
+              f"({_marks['first page'] - _marks.get('book opened', 0):.1f} ms after opening the book)")
+    write_report()
+
+def write_report():
+    from .database import CACHE_DIR
+    entry = {'time': time.time(), 'marks': _marks, 'heavy_modules_before_library': _heavy_at_library}
+    try:
+        with open(os.path.join(CACHE_DIR, STARTUP_LOG_NAME), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + "\n")
+    except OSError as e:
+        print(f"DEBUG: Could not write startup report: {e}")
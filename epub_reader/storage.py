@@ -0,0 +1,89 @@
+import os
+import hashlib
+import tempfile
+from .database import STORAGE_DIR
+
+# --- CONTENT-ADDRESSED STORAGE ---
+# Imported books live under library_storage/objects/<aa>/<sha256>.epub, so
+# re-importing the same file is free and two books that happen to share a
+# basename can no longer overwrite each other. Books imported before this
+# layout keep their plain filenames in STORAGE_DIR and still resolve.
+OBJECTS_DIR = "objects"
+COPY_CHUNK_SIZE = 1024 * 1024
+
+try:
+    import fcntl
+    FICLONE = 0x40049409  # linux/fs.h
+except ImportError:
+    fcntl = None
+
+def object_relpath(content_hash):
+    # Stored in the library with forward slashes on every platform
+    return f"{OBJECTS_DIR}/{content_hash[:2]}/{content_hash}.epub"
+
+def resolve_path(filename):
+    return os.path.join(STORAGE_DIR, *filename.split('/'))
+
+def object_hash(filename):
+    # Content hash for object-store paths, None for legacy filenames
+    parts = filename.replace(os.sep, '/').split('/')
+    if len(parts) >= 3 and parts[-3] == OBJECTS_DIR and parts[-1].endswith('.epub'):
+        return parts[-1][:-len('.epub')]
+    return None
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(COPY_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _copy_and_hash(src, dest):
+    # One streaming pass: every chunk is hashed as it is written
+    digest = hashlib.sha256()
+    with open(src, 'rb') as fin, open(dest, 'wb') as fout:
+        for chunk in iter(lambda: fin.read(COPY_CHUNK_SIZE), b""):
+            digest.update(chunk)
+            fout.write(chunk)
+    return digest.hexdigest()
+
+def _try_reflink(src, dest):
+    if fcntl is None:
+        return False
+    try:
+        with open(src, 'rb') as fin, open(dest, 'wb') as fout:
+            fcntl.ioctl(fout.fileno(), FICLONE, fin.fileno())
+        return True
+    except OSError:
+        return False
+
+def store_file(src):
+    """
+    Adds `src` to the object store. Returns (content_hash, filename,
+    was_already_stored) where filename is relative to STORAGE_DIR.
+    Prefers a reflink and copies bytes otherwise. Never hardlinks: the
+    object would share an inode with the user's file, change when that
+    file is edited in place and no longer match the hash in its name.
+    """
+    objects_root = os.path.join(STORAGE_DIR, OBJECTS_DIR)
+    os.makedirs(objects_root, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix="import-", suffix=".epub", dir=objects_root)
+    os.close(fd)
+    try:
+        if _try_reflink(src, tmp):
+            # Copy-on-write: later edits to `src` do not reach the object
+            content_hash = hash_file(tmp)
+        else:
+            content_hash = _copy_and_hash(src, tmp)
+
+        filename = object_relpath(content_hash)
+        dest = resolve_path(filename)
+        if os.path.exists(dest):
+            return content_hash, filename, True
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        os.replace(tmp, dest)
+        return content_hash, filename, False
+    finally:
+        if os.path.exists(tmp):
+            try: os.remove(tmp)
+            except: pass
@@ -0,0 +1,112 @@
+import os
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, QSize, QBuffer, QByteArray, QIODevice, Qt, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader, QPixmap
+from .disk_cache import THUMB_DIR, DiskBudget, thumbnail_key
+from .metadata import read_metadata
+from .storage import resolve_path
+
+# --- COVER THUMBNAILS ---
+THUMB_SIZE = QSize(96, 140)            # stored at 2x the card's icon column
+THUMB_DISK_BUDGET = 64 * 1024 * 1024   # bytes of thumbnails kept on disk
+THUMB_MEMORY_ENTRIES = 500             # decoded pixmaps kept for painting
+THUMB_WORKERS = 2
+NO_COVER_SUFFIX = ".none"              # marker so cover-less books are not retried
+
+if not os.path.exists(THUMB_DIR):
+    os.makedirs(THUMB_DIR)
+
+def _thumb_base(filename):
+    return os.path.join(THUMB_DIR, thumbnail_key(filename))
+
+def _decode_cover(book_path):
+    meta = read_metadata(book_path)
+    if not meta['cover']:
+        return None
+    with zipfile.ZipFile(book_path) as zf:
+        data = zf.read(meta['cover'])
+
+    buf = QBuffer()
+    buf.setData(QByteArray(data))
+    buf.open(QIODevice.OpenModeFlag.ReadOnly)
+    reader = QImageReader(buf)
+    size = reader.size()
+    if size.isValid():
+        # Let the decoder downsample (JPEG can decode at 1/2, 1/4, 1/8 scale)
+        reader.setScaledSize(size.scaled(THUMB_SIZE, Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        return None
+    if image.width() > THUMB_SIZE.width() or image.height() > THUMB_SIZE.height():
+        image = image.scaled(THUMB_SIZE, Qt.AspectRatioMode.KeepAspectRatio,
+                             Qt.TransformationMode.SmoothTransformation)
+    return image
+
+class ThumbnailService(QObject):
+    """
+    Produces cover thumbnails on a worker pool. `pixmap()` never blocks:
+    it returns None and schedules the work, then `thumbnail_ready(book_id)`
+    fires once the thumbnail can be painted.
+    """
+    thumbnail_ready = pyqtSignal(str)
+    _image_loaded = pyqtSignal(str, QImage)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pool = ThreadPoolExecutor(max_workers=THUMB_WORKERS, thread_name_prefix="thumbs")
+        self._pixmaps = OrderedDict()
+        self._pending = {}  # book_id -> future
+        self._missing = set()
+        self._disk = DiskBudget(THUMB_DIR, THUMB_DISK_BUDGET)
+        self._image_loaded.connect(self._on_image_loaded)
+
+    def pixmap(self, book_id, filename):
+        pix = self._pixmaps.get(book_id)
+        if pix is not None:
+            self._pixmaps.move_to_end(book_id)
+            return pix
+        if book_id not in self._pending and book_id not in self._missing:
+            self._pending[book_id] = self._pool.submit(self._load, book_id, filename)
+        return None
+
+    def _load(self, book_id, filename):
+        # Worker thread: QImage (unlike QPixmap) is safe to use here
+        base = _thumb_base(filename)
+        thumb_path = base + ".png"
+        image = None
+        try:
+            if os.path.exists(thumb_path):
+                os.utime(thumb_path)  # recently used, for eviction
+                image = QImage(thumb_path)
+            elif not os.path.exists(base + NO_COVER_SUFFIX):
+                image = _decode_cover(resolve_path(filename))
+                if image is None:
+                    open(base + NO_COVER_SUFFIX, 'w').close()
+                else:
+                    image.save(thumb_path, "PNG")
+                    self._disk.account(os.path.getsize(thumb_path))
+        except Exception as e:
+            print(f"DEBUG: Thumbnail for '{book_id}' failed: {e}")
+            image = None
+        self._image_loaded.emit(book_id, image if image is not None else QImage())
+
+    def _on_image_loaded(self, book_id, image):
+        self._pending.pop(book_id, None)
+        if image.isNull():
+            self._missing.add(book_id)
+            return
+        self._pixmaps[book_id] = QPixmap.fromImage(image)
+        while len(self._pixmaps) > THUMB_MEMORY_ENTRIES:
+            self._pixmaps.popitem(last=False)
+        self.thumbnail_ready.emit(book_id)
+
+    def forget(self, book_id):
+        self._pixmaps.pop(book_id, None)
+        self._missing.discard(book_id)
+
+    def shutdown(self):
+        for future in self._pending.values():
+            future.cancel()
+        self._pool.shutdown(wait=True)
@@ -0,0 +1,48 @@
+import html
+from PyQt6.QtWidgets import QLabel
+from PyQt6.QtCore import Qt, QTimer
+from . import tracing
+
+# --- PERFORMANCE OVERLAY ---
+OVERLAY_REFRESH_MS = 500
+OVERLAY_ROWS = 14
+OVERLAY_MARGIN = 12
+
+class TraceOverlay(QLabel):
+    """
+    Semi-transparent table of recent span latencies, pinned to the top
+    right of its parent. Mouse events pass through to the page below.
+    """
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setTextFormat(Qt.TextFormat.RichText)
+        self.setStyleSheet("background-color: rgba(0, 0, 0, 170); color: #e0e0e0; "
+                           "font-family: monospace; font-size: 11px; padding: 8px; border-radius: 6px;")
+        self.timer = QTimer(self)
+        self.timer.setInterval(OVERLAY_REFRESH_MS)
+        self.timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def toggle(self):
+        if self.isVisible():
+            self.timer.stop()
+            self.hide()
+        else:
+            tracing.set_enabled(True)
+            self.refresh()
+            self.show()
+            self.raise_()
+            self.timer.start()
+
+    def refresh(self):
+        stats = sorted(tracing.stats().items(), key=lambda kv: -kv[1]['p95_ms'])[:OVERLAY_ROWS]
+        rows = ["<tr><th align='left'>span</th><th>n</th><th>last</th><th>p50</th><th>p95</th><th>max</th></tr>"]
+        for name, s in stats:
+            rows.append(f"<tr><td>{html.escape(name)}</td><td align='right'>{s['count']}</td>"
+                        f"<td align='right'>{s['last_ms']:.1f}</td><td align='right'>{s['p50_ms']:.1f}</td>"
+                        f"<td align='right'>{s['p95_ms']:.1f}</td><td align='right'>{s['max_ms']:.1f}</td></tr>")
+        footer = "profiling…" if tracing.is_profiling() else "Ctrl+Shift+P profile · Ctrl+Shift+E export"
+        self.setText(f"<table cellspacing='4'>{''.join(rows)}</table><div style='color:#999'>ms · {footer}</div>")
+        self.adjustSize()
+        self.move(self.parentWidget().width() - self.width() - OVERLAY_MARGIN, OVERLAY_MARGIN)
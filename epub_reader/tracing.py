@@ -0,0 +1,173 @@
+import os
+import json
+import time
+import threading
+import functools
+from collections import deque, defaultdict
+
+# --- TRACING ---
+# Span-based timing for the reader pipeline. Disabled, `span()` returns a
+# shared no-op object and `traced` functions run a single bool check, so
+# the hooks can stay in hot paths. Enable with DORKY_TRACE=1 or at runtime
+# (the reader's overlay does this).
+TRACE_ENV = "DORKY_TRACE"
+MAX_EVENTS = 20000        # ring buffer kept for export
+STATS_WINDOW = 200        # recent durations per span name used for percentiles
+
+_enabled = os.environ.get(TRACE_ENV) == "1"
+_events = deque(maxlen=MAX_EVENTS)
+_durations = defaultdict(lambda: deque(maxlen=STATS_WINDOW))
+_lock = threading.Lock()
+_pid = os.getpid()
+_profiler = None
+
+def is_enabled():
+    return _enabled
+
+def set_enabled(enabled):
+    global _enabled
+    _enabled = bool(enabled)
+
+def _record(name, start_ns, end_ns, args):
+    dur_ns = end_ns - start_ns
+    with _lock:
+        _events.append((name, start_ns // 1000, dur_ns // 1000, threading.get_ident(), args))
+        _durations[name].append(dur_ns / 1e6)
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ('name', 'args', 'start')
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        _record(self.name, self.start, time.perf_counter_ns(), self.args)
+        return False
+
+def span(name, **args):
+    """`with span("name"):` times the block when tracing is on."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+def traced(name):
+    """Decorator form of span()."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            if not _enabled:
+                return fn(*a, **kw)
+            start = time.perf_counter_ns()
+            try:
+                return fn(*a, **kw)
+            finally:
+                _record(name, start, time.perf_counter_ns(), None)
+        return wrapper
+    return decorate
+
+def begin(name, **args):
+    """
+    Start of an operation that finishes in a callback (loadFinished, a
+    runJavaScript result). Returns a token for end(), or None when off.
+    """
+    if not _enabled:
+        return None
+    return (name, time.perf_counter_ns(), args)
+
+def end(token):
+    if token is not None:
+        name, start, args = token
+        _record(name, start, time.perf_counter_ns(), args)
+
+def record(name, duration_ms, **args):
+    """Adds a duration measured elsewhere (inside the page, for instance)."""
+    if _enabled:
+        end_ns = time.perf_counter_ns()
+        _record(name, end_ns - int(duration_ms * 1e6), end_ns, args)
+
+def stats():
+    """{name: {count, last_ms, p50_ms, p95_ms, max_ms}} over recent spans."""
+    with _lock:
+        snapshot = {name: list(values) for name, values in _durations.items() if values}
+    result = {}
+    for name, values in snapshot.items():
+        ordered = sorted(values)
+        pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+        result[name] = {'count': len(values), 'last_ms': values[-1], 'p50_ms': pick(0.5),
+                        'p95_ms': pick(0.95), 'max_ms': ordered[-1]}
+    return result
+
+def clear():
+    with _lock:
+        _events.clear()
+        _durations.clear()
+
+def _snapshot():
+    with _lock:
+        return list(_events)
+
+def export_jsonl(path):
+    events = _snapshot()
+    with open(path, 'w', encoding='utf-8') as f:
+        for name, ts, dur, tid, args in events:
+            f.write(json.dumps({'name': name, 'ts_us': ts, 'dur_us': dur, 'tid': tid, 'args': args or {}}) + "\n")
+    return len(events)
+
+def export_chrome_trace(path):
+    # Loadable in chrome://tracing and Perfetto
+    events = [{'name': name, 'ph': 'X', 'ts': ts, 'dur': dur, 'pid': _pid, 'tid': tid, 'args': args or {}}
+              for name, ts, dur, tid, args in _snapshot()]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+    return len(events)
+
+def export_all(directory):
+    """Writes trace-<time>.jsonl and trace-<time>.json into `directory`."""
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    base = os.path.join(directory, f"trace-{stamp}")
+    export_jsonl(base + ".jsonl")
+    export_chrome_trace(base + ".json")
+    return base + ".jsonl", base + ".json"
+
+# --- CPROFILE CAPTURE ---
+def is_profiling():
+    return _profiler is not None
+
+def start_profile():
+    global _profiler
+    if _profiler is None:
+        import cProfile
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+def stop_profile(directory, top=25):
+    """Stops the capture, writes a .prof file and prints the top entries."""
+    global _profiler
+    if _profiler is None:
+        return None
+    import io
+    import pstats
+    profiler, _profiler = _profiler, None
+    profiler.disable()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, time.strftime("profile-%Y%m%d-%H%M%S.prof"))
+    profiler.dump_stats(path)
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(top)
+    print(out.getvalue())
+    return path
@@ -7,6 +7,7 @@ from PyQt6.QtSvg import QSvgRenderer
 MOON_SVG = """<svg viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg"><path d="M21 12.79A9 9 0 1 1 11.21 3 7 7 0 0 0 21 12.79z" fill="{color}"/></svg>"""
 SUN_SVG = """<svg viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg"><circle cx="12" cy="12" r="5" fill="{color}"/><path d="M12 1v2M12 21v2M4.22 4.22l1.42 1.42M18.36 18.36l1.42 1.42M1 12h2M21 12h2M4.22 19.78l1.42-1.42M18.36 5.64l1.42-1.42" stroke="{color}" stroke-width="2" stroke-linecap="round"/></svg>"""
 BACK_SVG = """<svg viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg"><path d="M21 12H3M8 7L3 12L8 17" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/></svg>"""
+SEARCH_SVG = """<svg viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg"><circle cx="11" cy="11" r="7" stroke="{color}" stroke-width="2"/><path d="M20 20L16 16" stroke="{color}" stroke-width="2" stroke-linecap="round"/></svg>"""
 IMPORT_SVG = """<svg viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg"><path d="M12 5V19M5 12H19" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/></svg>"""
 
 def create_icon(svg_data, color="#333", size=24):
@@ -120,4 +121,40 @@ class ImportButton(QPushButton):
             ImportButton:hover {{
                 background-color: {hover_bg};
             }}
+        """)
+
+class SearchButton(QPushButton):
+    def __init__(self, is_dark=False, parent=None):
+        super().__init__(" Search", parent)
+        
+        self.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.setIconSize(QSize(24, 24))
+        self.setToolTip("Search all books (Ctrl+F)")
+        
+        self.refresh_style(is_dark)
+
+    def refresh_style(self, is_dark):
+        if is_dark:
+            color = "#eee"
+            hover_bg = "rgba(255, 255, 255, 0.1)"
+        else:
+            color = "#333"
+            hover_bg = "rgba(0, 0, 0, 0.05)"
+
+        self.setIcon(create_icon(SEARCH_SVG, color, 24))
+        
+        self.setStyleSheet(f"""
+            SearchButton {{
+                background: transparent; 
+                border: none; 
+                color: {color};
+                font-weight: bold;
+                font-size: 16px;
+                text-align: left;
+                padding: 6px 12px;
+                border-radius: 6px;
+            }}
+            SearchButton:hover {{
+                background-color: {hover_bg};
+            }}
         """)
\ No newline at end of file
@@ -1,7 +1,8 @@
-import os
-import copy
-from bs4 import BeautifulSoup
-from PyQt6.QtCore import QUrl
+import html
+import hashlib
+import posixpath
+from html.parser import HTMLParser
+from .tracing import traced
 
 # --- THEME CSS ---
 # We use CSS variables so we can switch themes instantly
@@ -12,6 +13,8 @@ THEME_CSS = """
         --text-color: #2a2a2a;
         --link-color: #0056b3;
         --img-opacity: 1.0;
+        --hit-color: #fff176;
+        --hit-current-color: #ffb74d;
     }
     
     /* DARK MODE CLASS */
@@ -20,6 +23,8 @@ THEME_CSS = """
         --text-color: #e0e0e0;
         --link-color: #64b5f6;
         --img-opacity: 0.85; /* Slightly dim images in dark mode */
+        --hit-color: #6d5d00;
+        --hit-current-color: #a15c00;
     }
 
     html, body {
@@ -79,42 +84,188 @@ THEME_CSS = """
         color: var(--link-color);
         text-decoration: none;
     }
+
+    /* Double-clicked image at full resolution (click to zoom, again to close) */
+    #image-zoom {
+        position: fixed; top: 0; left: 0; right: 0; bottom: 0; z-index: 100;
+        overflow: hidden; background-color: rgba(0, 0, 0, 0.92); cursor: zoom-in;
+    }
+    #image-zoom img {
+        max-width: 100vw; max-height: 100vh; margin: 0 auto; opacity: 1;
+        position: relative; top: 50%; transform: translateY(-50%);
+    }
+    #image-zoom.natural { cursor: zoom-out; }
+    #image-zoom.natural img { max-width: none; max-height: none; top: 0; transform: none; }
+
+    /* Continuous reading: every spine item starts on a page of its own */
+    section.book-section { break-before: column; }
+    section.book-section:first-child { break-before: auto; }
+
+    /* In-book search hits */
+    mark.search-hit { background-color: var(--hit-color); color: inherit; }
+    mark.search-hit.current { background-color: var(--hit-current-color); }
 </style>
 """
 
-def extract_images_and_fix_html(book, temp_dir):
-    if not os.path.exists(temp_dir):
-        os.makedirs(temp_dir)
-    for item in book.get_items():
-        if item.get_type() == 9: 
-            name = os.path.basename(item.file_name)
-            file_path = os.path.join(temp_dir, name)
-            with open(file_path, 'wb') as f:
-                f.write(item.get_content())
-    return temp_dir
-
-def prepare_chapter_html(raw_html, temp_img_dir):
+# The same rules without the <style> wrapper, served as a shared stylesheet
+THEME_STYLESHEET = THEME_CSS.replace("<style>", "").replace("</style>", "")
+
+# Bump when prepare_chapter_html changes its output so cached chapters are rebuilt
+TRANSFORM_VERSION = 4
+THEME_VERSION = hashlib.sha1(THEME_CSS.encode('utf-8')).hexdigest()[:12]
+
+CONTENT_OPEN = '<div id="book-content">'
+CONTENT_CLOSE = "</div></body></html>"
+
+def resolve_url(base_url, src):
+    # Absolute URLs (data:, http:, epub:) and pure fragments are left alone
+    if not src or src.startswith('#') or ':' in src.split('/')[0]:
+        return src
+    scheme, _, rest = base_url.partition('://')
+    host, _, base_path = rest.partition('/')
+    if src.startswith('/'):
+        path = src
+    else:
+        path = posixpath.join(posixpath.dirname('/' + base_path), src)
+    path, sep, suffix = path.partition('#')
+    return f"{scheme}://{host}{posixpath.normpath(path)}{sep}{suffix}"
+
+class _ChapterTransformer(HTMLParser):
+    """
+    Streams a chapter through once: everything inside <body> is copied out
+    as-is (raw tag text, entities untouched) except <img src>, which is
+    resolved against the chapter URL, and <a href>, so links keep pointing at
+    the right document when the body is shown inside another one (see
+    chapter_body). No tree is built.
+    With `image_fit`, book images point at their viewport-sized derivative
+    and keep the original URL in data-original (used for zooming).
+    """
+    def __init__(self, base_url, image_fit=None):
+        super().__init__(convert_charrefs=False)
+        self.base_url = base_url
+        self.image_fit = image_fit
+        self.book_prefix = "/".join(base_url.split('/', 3)[:3]) + "/"
+        self.out = []          # before <body>: the whole document, in case there is none
+        self.body = None       # body contents once <body> is seen
+        self.body_closed = False
+
+    def _emit(self, text):
+        if self.body_closed:
+            return
+        (self.body if self.body is not None else self.out).append(text)
+
+    def _start(self, tag, attrs, self_closing):
+        if tag == 'body' and self.body is None:
+            self.body = []
+            return
+        if tag == 'img':
+            parts = ["<img"]
+            for name, value in attrs:
+                if name == 'src' and value:
+                    value = resolve_url(self.base_url, value)
+                    if self.image_fit and value.startswith(self.book_prefix):
+                        parts.append(f' data-original="{html.escape(value)}"')
+                        path, sep, fragment = value.partition('#')
+                        value = f"{path}?fit={self.image_fit}{sep}{fragment}"
+                parts.append(f" {name}" if value is None else f' {name}="{html.escape(value)}"')
+            parts.append("/>" if self_closing else ">")
+            self._emit("".join(parts))
+        elif tag == 'a' and any(name == 'href' for name, _ in attrs):
+            parts = ["<a"]
+            for name, value in attrs:
+                if name == 'href' and value:
+                    # Fragments name this chapter explicitly
+                    if value.startswith('#'):
+                        value = self.base_url + value
+                    else:
+                        value = resolve_url(self.base_url, value)
+                parts.append(f" {name}" if value is None else f' {name}="{html.escape(value)}"')
+            parts.append("/>" if self_closing else ">")
+            self._emit("".join(parts))
+        else:
+            self._emit(self.get_starttag_text())
+
+    def handle_starttag(self, tag, attrs):
+        self._start(tag, attrs, False)
+
+    def handle_startendtag(self, tag, attrs):
+        self._start(tag, attrs, True)
+
+    def handle_endtag(self, tag):
+        if tag == 'body' and self.body is not None:
+            self.body_closed = True
+            return
+        self._emit(f"</{tag}>")
+
+    def handle_data(self, data):
+        self._emit(data)
+
+    def handle_entityref(self, name):
+        self._emit(f"&{name};")
+
+    def handle_charref(self, name):
+        self._emit(f"&#{name};")
+
+    def handle_comment(self, data):
+        self._emit(f"<!--{data}-->")
+
+    def unknown_decl(self, data):
+        self._emit(f"<![{data}]>")
+
+    def handle_decl(self, decl):
+        pass  # doctype: the wrapper below decides the document mode
+
+    def handle_pi(self, data):
+        pass
+
+    def content(self):
+        return "".join(self.body if self.body is not None else self.out)
+
+@traced("utils.prepare_chapter_html")
+def prepare_chapter_html(raw_html, base_url, theme_href=None, image_fit=None):
+    parser = _ChapterTransformer(base_url, image_fit)
+    parser.feed(raw_html)
+    parser.close()
+
+    if theme_href:
+        # Linked rather than inlined so the engine parses it once per session
+        theme = f'<link href="{html.escape(theme_href)}" rel="stylesheet"/>'
+    else:
+        theme = f"<style>{THEME_STYLESHEET}</style>"
+
+    # No doctype, like the XML-serialised output this replaced (same quirks-mode layout)
+    return ("<html><head>" + theme + "</head><body>" + CONTENT_OPEN
+            + parser.content() + CONTENT_CLOSE)
+
+def chapter_body(chapter_html):
+    """The inside of #book-content of a prepare_chapter_html result."""
+    start = chapter_html.find(CONTENT_OPEN)
+    if start < 0:
+        return ""
+    start += len(CONTENT_OPEN)
+    end = chapter_html.rfind(CONTENT_CLOSE)
+    return chapter_html[start:end if end >= start else len(chapter_html)]
+
+@traced("utils.extract_text")
+def extract_text(raw_html):
+    """
+    Returns (text, anchors). `text` has the same characters, in the same
+    order, as the text nodes of #book-content; `anchors` maps element ids to
+    the character offset where that element's text starts.
+    """
+    from bs4 import BeautifulSoup, Tag, NavigableString, CData  # only used for search text
     soup = BeautifulSoup(raw_html, 'html.parser')
-    
-    body_content = soup.body
-    if not body_content:
-        body_content = soup
-        
-    for img in body_content.find_all('img'):
-        src = img.get('src')
-        if src:
-            fname = os.path.basename(src)
-            local = os.path.join(temp_img_dir, fname)
-            img['src'] = QUrl.fromLocalFile(local).toString()
-
-    new_soup = BeautifulSoup("<html><head></head><body><div id='book-content'></div></body></html>", 'xml')
-    
-    style_tag = new_soup.new_tag("style")
-    style_tag.string = THEME_CSS.replace("<style>", "").replace("</style>", "")
-    new_soup.head.append(style_tag)
-    
-    content_children = [copy.copy(c) for c in body_content.children]
-    for child in content_children:
-        new_soup.find(id="book-content").append(child)
-        
-    return str(new_soup)
\ No newline at end of file
+    body = soup.body or soup
+    parts = []
+    anchors = {}
+    length = 0
+    for el in body.descendants:
+        if isinstance(el, Tag):
+            el_id = el.get('id')
+            if el_id and el_id not in anchors:
+                anchors[el_id] = length
+        elif type(el) in (NavigableString, CData):
+            # Exact types: comments, doctypes and <script>/<style> strings are skipped
+            parts.append(str(el))
+            length += len(el)
+    return "".join(parts), anchors
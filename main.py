@@ -1,9 +1,24 @@
+from epub_reader import startup  # first, so its clock starts before the imports
 import sys
+import multiprocessing
 from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import Qt, QTimer
 from epub_reader.library import LibraryWindow
+from epub_reader.resources import register_scheme
+from epub_reader.journal import progress_journal
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # import workers in the frozen EXE
+    startup.mark("imports done")
+    register_scheme()
+    # QtWebEngineWidgets is imported after the application exists (when the
+    # first book opens), which Qt only allows with shared GL contexts
+    QApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
     app = QApplication(sys.argv)
     window = LibraryWindow()
     window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    QTimer.singleShot(0, startup.library_visible)  # runs after the first paint
+    exit_code = app.exec()
+    window.shutdown()
+    progress_journal.close()
+    sys.exit(exit_code)
\ No newline at end of file